@@ -1,5 +1,6 @@
 # transcriber_app/config.py
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 from transcriber_app.modules.logging.logging_config import setup_logging
 
@@ -8,19 +9,140 @@ logger = setup_logging("transcribeapp")
 
 load_dotenv()
 
-AVAILABLE_MODES = ["default", "tecnico", "refinamiento", "ejecutivo", "bullet"]
+# Un modo por fichero <modo>.md en PROMPTS_DIR (ver gemini/agent_registry.py).
+# Los cambios en el directorio se detectan como mucho cada PROMPTS_RELOAD_SECONDS
+PROMPTS_DIR = Path(os.getenv(
+    "PROMPTS_DIR", Path(__file__).resolve().parent / "modules" / "ai" / "gemini" / "prompts"
+))
+PROMPTS_RELOAD_SECONDS = float(os.getenv("PROMPTS_RELOAD_SECONDS", "2"))
+
+# Modos al arrancar; la lista actualizada la da agent_registry.available_modes()
+AVAILABLE_MODES = sorted(p.stem for p in PROMPTS_DIR.glob("*.md"))
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 USE_MODEL = os.getenv("USE_MODEL", "gemini-2.5-flash-lite")
 LANGUAGE = os.getenv("LANGUAGE", "es")
 
-AVAILABLE_MODES_DICT = {
-    "default": "default",
-    "tecnico": "tecnico",
-    "refinamiento": "refinamiento",
-    "ejecutivo": "ejecutivo",
-    "bullet": "bullet",
+# Transcripción por trozos: audios más largos que TRANSCRIBE_CHUNK_SECONDS
+# se dividen y se transcriben en paralelo (0 desactiva el troceado)
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "600"))
+TRANSCRIBE_CHUNK_OVERLAP = float(os.getenv("TRANSCRIBE_CHUNK_OVERLAP", "2"))
+TRANSCRIBE_MAX_WORKERS = int(os.getenv("TRANSCRIBE_MAX_WORKERS", "4"))
+TRANSCRIBE_SPLIT_ON_SILENCE = os.getenv("TRANSCRIBE_SPLIT_ON_SILENCE", "true").lower() == "true"
+
+# Envío del audio: en streaming desde ffmpeg (sin fichero temporal) y en un
+# códec compacto: "flac" (sin pérdidas), "opus" o "wav"
+TRANSCRIBE_STREAM_UPLOAD = os.getenv("TRANSCRIBE_STREAM_UPLOAD", "true").lower() == "true"
+TRANSCRIBE_AUDIO_CODEC = os.getenv("TRANSCRIBE_AUDIO_CODEC", "flac")
+
+# Motor de transcripción: "groq" (API), "local" (faster-whisper en CPU,
+# pip install ".[local]") o "router" (ambos, ver ROUTER_*)
+TRANSCRIBER_BACKEND = os.getenv("TRANSCRIBER_BACKEND", "groq")
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")
+LOCAL_WHISPER_DEVICE = os.getenv("LOCAL_WHISPER_DEVICE", "cpu")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_BATCH_SIZE = int(os.getenv("LOCAL_WHISPER_BATCH_SIZE", "8"))
+LOCAL_WHISPER_WORKERS = int(os.getenv("LOCAL_WHISPER_WORKERS", "2"))
+LOCAL_WHISPER_CPU_THREADS = int(os.getenv("LOCAL_WHISPER_CPU_THREADS", "0"))
+
+# Los proveedores (SDK de Gemini, agentes, transcriptores) se cargan al
+# primer uso; con AI_WARM_UP=true la web los prepara en segundo plano al
+# arrancar, sin retrasar el momento en que el worker acepta peticiones
+AI_WARM_UP = os.getenv("AI_WARM_UP", "true").lower() == "true"
+
+# TRANSCRIBER_BACKEND=router reparte entre ROUTER_BACKENDS según latencia,
+# carga y errores; si el elegido supera el percentil ROUTER_HEDGE_PERCENTILE
+# de su latencia se lanza la misma petición en otro motor
+ROUTER_BACKENDS = [b.strip() for b in os.getenv("ROUTER_BACKENDS", "groq,local").split(",") if b.strip()]
+ROUTER_HEDGE_PERCENTILE = float(os.getenv("ROUTER_HEDGE_PERCENTILE", "0.95"))
+ROUTER_HEDGE_MIN_SECONDS = float(os.getenv("ROUTER_HEDGE_MIN_SECONDS", "20"))
+ROUTER_STATS_WINDOW = int(os.getenv("ROUTER_STATS_WINDOW", "50"))
+
+# Cuotas de los proveedores: las llamadas esperan su turno en vez de fallar
+# con 429 (0 = sin límite). RATE_LIMIT_STORE=sqlite comparte el saldo entre workers
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_STORE_PATH = os.getenv("RATE_LIMIT_STORE_PATH", "jobs/rate_limits.db")
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "300"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "8"))
+PROVIDER_LIMITS = {
+    "groq": {
+        "requests_per_minute": int(os.getenv("GROQ_RPM", "20")),
+        "tokens_per_minute": int(os.getenv("GROQ_TPM", "0")),
+        "audio_seconds_per_hour": int(os.getenv("GROQ_AUDIO_SECONDS_PER_HOUR", "7200")),
+    },
+    "gemini": {
+        "requests_per_minute": int(os.getenv("GEMINI_RPM", "15")),
+        "tokens_per_minute": int(os.getenv("GEMINI_TPM", "250000")),
+    },
 }
 
+# Pool de conexiones HTTP por proveedor (keep-alive y HTTP/2 si h2 está instalado)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# Subidas de audio: tamaño máximo y tamaño de bloque al copiarlas a disco
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", "500")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+# Subidas por trozos desde el grabador: cada tramo completo de
+# UPLOAD_SEGMENT_SECONDS se transcribe mientras sigue la grabación (0 lo desactiva)
+UPLOAD_SESSION_DIR = os.getenv("UPLOAD_SESSION_DIR", "audios/uploads")
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "21600"))
+UPLOAD_SEGMENT_SECONDS = float(os.getenv("UPLOAD_SEGMENT_SECONDS", "120"))
+# Modo en vivo: cada cuánto se retranscribe la ventana de audio aún sin tramo cerrado (0 lo desactiva)
+UPLOAD_LIVE_INTERVAL_SECONDS = float(os.getenv("UPLOAD_LIVE_INTERVAL_SECONDS", "5"))
+# La ventana en vivo cubre como mucho los últimos UPLOAD_LIVE_WINDOW_SECONDS y todas las sesiones
+# comparten un presupuesto de UPLOAD_LIVE_RPM peticiones/minuto, aparte de la cuota de los jobs
+UPLOAD_LIVE_WINDOW_SECONDS = float(os.getenv("UPLOAD_LIVE_WINDOW_SECONDS", "30"))
+UPLOAD_LIVE_RPM = float(os.getenv("UPLOAD_LIVE_RPM", "6"))
+
+# Caché de transcripciones por contenido del audio (LRU en disco)
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_CACHE_DIR = os.getenv("TRANSCRIPTION_CACHE_DIR", "cache/transcriptions")
+TRANSCRIPTION_CACHE_MAX_MB = int(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "200"))
+TRANSCRIPTION_CACHE_FINGERPRINT = os.getenv("TRANSCRIPTION_CACHE_FINGERPRINT", "false").lower() == "true"
+
+# Resumen map-reduce: transcripciones de más de SUMMARY_CHUNK_TOKENS tokens se
+# resumen por fragmentos en paralelo y después se combinan
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "30000"))
+SUMMARY_MAP_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "4"))
+
+# Caché de resúmenes: "tiered" (memoria + SQLite), "memory", "sqlite" o "none"
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE", "tiered")
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "cache/summaries.db")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "256"))
+
+# Estado de los jobs web: "sqlite" (compartido entre workers) o "memory"
+JOB_STORE_BACKEND = os.getenv("JOB_STORE", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs/jobs.db")
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "86400"))
+
+# Reintentos de las etapas del pipeline (espera exponencial con jitter; en los
+# jobs web no, el job entero se reintenta hasta JOB_MAX_ATTEMPTS) y puntos de
+# control por job para continuar desde la última etapa terminada
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+
+# Planificador de jobs: workers concurrentes y tamaño máximo de la cola
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+
+# Descargas de URLs y playlists en paralelo (audio_downloader.download_many)
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))
+# Máximo de vídeos (playlists expandidas) por petición a /api/ingest-urls
+INGEST_MAX_ENTRIES = int(os.getenv("INGEST_MAX_ENTRIES", "50"))
+
+# Procesamiento por lotes desde el CLI (python -m transcriber_app.main batch)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_REPORT_DIR = os.getenv("BATCH_REPORT_DIR", "outputs/batch")
+
+AVAILABLE_MODES_DICT = {mode: mode for mode in AVAILABLE_MODES}
+
 logger.info("[CONFIG] Configuración cargada correctamente")
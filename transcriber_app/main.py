@@ -6,7 +6,8 @@ from transcriber_app.modules.audio_receiver import AudioReceiver
 from transcriber_app.modules.transcriber_cli import Transcriber
 from transcriber_app.modules.output_formatter import OutputFormatter
 from transcriber_app.runner.orchestrator import Orchestrator
-from transcriber_app.config import AVAILABLE_MODES
+from transcriber_app.runner import batch
+from transcriber_app.modules.ai.gemini.agent_registry import available_modes
 
 
 def mostrar_ayuda():
@@ -14,16 +15,17 @@ def mostrar_ayuda():
     print("Procesa audios (.mp3, .webm) o textos (.txt) y genera resúmenes con distintos modos.\n")
 
     print("USO:")
-    print("  python -m transcriber_app.main [audio|texto] [nombre] [modo]\n")
+    print("  python -m transcriber_app.main [audio|texto] [nombre] [modo]")
+    print("  python -m transcriber_app.main batch [directorio|glob|manifiesto] [modo] [--workers N] [--force]\n")
 
     print("PARÁMETROS:")
     print("  audio        Procesa un archivo .mp3 o .webm desde la carpeta 'audios/'")
     print("  texto        Procesa un archivo .txt desde la carpeta 'transcripts/'")
     print("  nombre       Nombre del archivo SIN extensión")
-    print("  modo         Tipo de resumen a generar\n")
+    print("  modo         Tipo de resumen a generar (o varios separados por comas)\n")
 
     print("MODOS DISPONIBLES:")
-    for m in AVAILABLE_MODES:
+    for m in available_modes():
         print(f"  - {m}")
     print()
 
@@ -36,13 +38,27 @@ def mostrar_ayuda():
     print("    python -m transcriber_app.main texto sprint1 refinamiento")
     print("    (usa transcripts/sprint1.txt)\n")
 
+    print("  Varios modos con una sola transcripción:")
+    print("    python -m transcriber_app.main audio reunion1 tecnico,ejecutivo,bullet\n")
+
+    print("  Lote de audios en paralelo (salta los que ya están al día):")
+    print("    python -m transcriber_app.main batch archivo/ tecnico,bullet --workers 8")
+    print("    python -m transcriber_app.main batch 'archivo/**/*.mp3' default --report informe.json\n")
+
     print("SALIDA:")
     print("  - La transcripción (si es audio) se guarda en: transcripts/<nombre>.txt")
-    print("  - El resumen final se guarda en: outputs/<nombre>_<modo>.md\n")
+    print("  - El resumen final se guarda en: outputs/<nombre>_<modo>.md")
+    print("  - El informe de un lote se guarda en: outputs/batch/batch_<fecha>.json\n")
 
 
 def main():
 
+    # ============================
+    #   SUBCOMANDO BATCH
+    # ============================
+    if len(sys.argv) > 1 and sys.argv[1].lower() == "batch":
+        sys.exit(batch.main(sys.argv[2:]))
+
     # ============================
     #   VALIDACIÓN DE ARGUMENTOS
     # ============================
@@ -52,10 +68,11 @@ def main():
 
     input_type = sys.argv[1].lower()
     base_name = sys.argv[2]
-    mode = sys.argv[3].lower()
+    modes = [m.strip() for m in sys.argv[3].lower().split(",") if m.strip()]
+    invalid = [m for m in modes if m not in available_modes()]
 
-    if mode not in AVAILABLE_MODES:
-        print(f"❌ Modo no válido: {mode}\n")
+    if not modes or invalid:
+        print(f"❌ Modo no válido: {', '.join(invalid) or sys.argv[3]}\n")
         mostrar_ayuda()
         return
 
@@ -103,12 +120,23 @@ def main():
     #   EJECUTAR PIPELINE
     # ============================
     try:
-        if input_type == "audio":
-            output_file, text, summary = orchestrator.run_audio(path, mode)
-        else:
-            output_file, text, summary = orchestrator.run_text(path, mode)
+        if len(modes) == 1:
+            if input_type == "audio":
+                output_file, text, summary = orchestrator.run_audio(path, modes[0])
+            else:
+                output_file, text, summary = orchestrator.run_text(path, modes[0])
 
-        output = f"✅ Transcripción guardada: {text[:100]}...\n✅ Resumen guardado en: {output_file}"
+            output = f"✅ Transcripción guardada: {text[:100]}...\n✅ Resumen guardado en: {output_file}"
+        else:
+            # Una transcripción y todos los modos en paralelo
+            if input_type == "audio":
+                output_files, text, summaries = orchestrator.run_audio_multi(path, modes)
+            else:
+                output_files, text, summaries = orchestrator.run_text_multi(path, modes)
+
+            output = f"✅ Transcripción guardada: {text[:100]}..."
+            for m, output_file in output_files.items():
+                output += f"\n✅ Resumen {m} guardado en: {output_file}"
 
     except ValueError as e:
         print(f"[BAD_AUDIO] {e}")
@@ -1,9 +1,12 @@
 # transcriber_app/modules/ai/ai_manager.py
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from transcriber_app.modules.logging.logging_config import setup_logging
-from transcriber_app.modules.ai.gemini.client import GeminiModel
-from transcriber_app.modules.ai.groq.model import GroqModel
-from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+from transcriber_app.modules.ai.registry import LazyRegistry
+from transcriber_app.config import TRANSCRIBER_BACKEND
+from transcriber_app.modules.ai.summary_cache import agent_version, get_summary_cache, make_key
 
 logger = setup_logging("transcribeapp")
 
@@ -33,33 +36,91 @@ def log_agent_result(result):
         logger.error(f"[AGENT RESULT] Error registrando resultado: {e}")
 
 
+def _gemini_model():
+    from transcriber_app.modules.ai.gemini.client import GeminiModel
+    return GeminiModel()
+
+
+def _groq_model():
+    from transcriber_app.modules.ai.groq.model import GroqModel
+    return GroqModel()
+
+
+def _groq_transcriber():
+    from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+    return GroqTranscriber()
+
+
+def _local_transcriber():
+    # El modelo de faster-whisper se carga aún más tarde, en la primera transcripción
+    from transcriber_app.modules.ai.local.transcriber import LocalWhisperTranscriber
+    return LocalWhisperTranscriber()
+
+
+def _router_transcriber():
+    # Reparte entre los anteriores (ROUTER_BACKENDS) con hedging y failover
+    from transcriber_app.modules.ai.transcriber_router import RoutingTranscriber
+    return RoutingTranscriber(AIManager.transcribers)
+
+
 class AIManager:
     """
     Router central de modelos de IA.
-    Actualmente solo usa Gemini + Groq Whisper.
+    Resúmenes con Gemini o Groq; transcripción con Groq Whisper o Whisper
+    local (TRANSCRIBER_BACKEND elige el motor por defecto).
+    Modelos, transcriptores y agentes se construyen la primera vez que se
+    piden (ver registry.py); warm_up los adelanta.
     """
 
-    models = {
-        "gemini": GeminiModel(),
-        "groq": GroqModel(),
-    }
+    models = LazyRegistry({
+        "gemini": _gemini_model,
+        "groq": _groq_model,
+    })
+
+    transcribers = LazyRegistry({
+        "groq": _groq_transcriber,
+        "local": _local_transcriber,
+        "router": _router_transcriber,
+    })
 
-    transcribers = {
-        "groq": GroqTranscriber(),
-    }
+    @staticmethod
+    def warm_up(modes=None):
+        """
+        Construye el modelo de Gemini con sus agentes (importa el SDK y lee
+        los prompts) y el transcriptor por defecto, para no pagarlo en el
+        primer job. El modelo de Whisper local se calienta aparte.
+        """
+        start = time.time()
+        try:
+            gemini = AIManager.get_model("gemini")
+            for mode in modes or list(gemini.agents):
+                gemini.get_agent(mode).model  # crea el cliente del SDK
+            AIManager.get_transcriber()
+        except Exception as e:
+            # Solo es una optimización: el primer job lo volverá a intentar
+            logger.warning(f"[AI MANAGER] No se pudieron preparar los proveedores: {e}")
+            return
+        logger.info(f"[AI MANAGER] Proveedores preparados en {time.time() - start:.2f}s")
 
     @staticmethod
     def get_model(name="gemini"):
         return AIManager.models.get(name)
 
     @staticmethod
-    def get_transcriber(name="groq"):
-        return AIManager.transcribers.get(name)
+    def get_transcriber(name=None):
+        return AIManager.transcribers.get(name or TRANSCRIBER_BACKEND)
 
     @staticmethod
     def summarize(text: str, mode: str, model_name: str = "gemini"):
         model = AIManager.get_model(model_name)
 
+        cache, key = AIManager._cache_key(text, mode, model_name)
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"[AI MANAGER] Resumen reutilizado de caché (modo={mode}, modelo={model_name})")
+                return cached
+
         if model_name == "gemini":
             result = model.run_agent(mode, text)
         elif model_name == "groq":
@@ -68,20 +129,115 @@ class AIManager:
             raise RuntimeError(f"Modelo desconocido: {model_name}")
 
         log_agent_result(result)
+
+        if key is not None and isinstance(result, str):
+            cache.set(key, result)
+        return result
+
+    @staticmethod
+    async def summarize_async(text: str, mode: str, model_name: str = "gemini"):
+        """Versión asíncrona de summarize: usa los clientes async de cada proveedor."""
+        model = AIManager.get_model(model_name)
+
+        cache, key = AIManager._cache_key(text, mode, model_name)
+        if key is not None:
+            # La caché puede tocar SQLite: fuera del event loop
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                logger.info(f"[AI MANAGER] Resumen reutilizado de caché (modo={mode}, modelo={model_name})")
+                return cached
+
+        if model_name == "gemini":
+            result = await model.run_agent_async(mode, text)
+        elif model_name == "groq":
+            result = await model.run_async(text)
+        else:
+            raise RuntimeError(f"Modelo desconocido: {model_name}")
+
+        log_agent_result(result)
+
+        if key is not None and isinstance(result, str):
+            await asyncio.to_thread(cache.set, key, result)
         return result
 
+    @staticmethod
+    def _cache_key(text: str, mode: str, model_name: str):
+        """Devuelve (caché, clave) o (None, None) si la caché está desactivada."""
+        cache = get_summary_cache()
+        if cache is None:
+            return None, None
+        return cache, make_key(text, mode, model_name, AIManager.prompt_version(mode, model_name))
+
+    @staticmethod
+    def summarize_many(text: str, modes: list, model_name: str = "gemini") -> dict:
+        """
+        Ejecuta varios modos sobre el mismo texto a la vez.
+        Devuelve {modo: resumen} en el orden pedido; la latencia total es la
+        del modo más lento, no la suma.
+        """
+        modes = list(dict.fromkeys(modes))  # sin duplicados, conservando el orden
+        if len(modes) == 1:
+            return {modes[0]: AIManager.summarize(text, modes[0], model_name)}
+
+        logger.info(f"[AI MANAGER] Ejecutando {len(modes)} modos en paralelo: {modes}")
+        with ThreadPoolExecutor(max_workers=len(modes), thread_name_prefix="summary") as pool:
+            futures = {mode: pool.submit(AIManager.summarize, text, mode, model_name) for mode in modes}
+            return {mode: future.result() for mode, future in futures.items()}
+
+    @staticmethod
+    async def summarize_many_async(text: str, modes: list, model_name: str = "gemini") -> dict:
+        """Versión asíncrona de summarize_many (asyncio.gather en lugar de hilos)."""
+        modes = list(dict.fromkeys(modes))
+        results = await asyncio.gather(*(AIManager.summarize_async(text, mode, model_name) for mode in modes))
+        return dict(zip(modes, results))
+
+    @staticmethod
+    def prompt_version(mode: str, model_name: str = "gemini") -> str:
+        """Identifica el prompt y la configuración que producirán el resumen."""
+        if model_name == "gemini":
+            return agent_version(AIManager.get_agent(mode, model_name))
+        return model_name
+
+    @staticmethod
+    def summary_cache_stats() -> dict:
+        cache = get_summary_cache()
+        return cache.stats() if cache is not None else {"hits": 0, "misses": 0, "hit_rate": 0.0}
+
     @staticmethod
     def summarize_stream(text: str, mode: str = "default", model_name: str = "gemini"):
+        """
+        Generador con el resumen según llegan los tokens del modelo.
+        Al terminar guarda el texto completo en la caché de resúmenes.
+        """
+        cache, key = AIManager._cache_key(text, mode, model_name)
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"[AI MANAGER] Resumen reutilizado de caché (modo={mode}, modelo={model_name})")
+                yield cached
+                return
+
         model = AIManager.get_model(model_name)
-        result = model.run_agent(mode, text)
+        if model_name == "gemini":
+            result = model.run_agent(mode, text, stream=True)
+        elif model_name == "groq":
+            result = model.run(text)
+        else:
+            raise RuntimeError(f"Modelo desconocido: {model_name}")
 
-        full_text = result.text if hasattr(result, "text") else str(result)
+        parts = []
+        # Un str (modelo sin streaming o resultado de map-reduce) llega de una vez
+        for chunk in ([result] if isinstance(result, str) else result):
+            if chunk:
+                parts.append(chunk)
+                yield chunk
 
-        chunk_size = 200
-        for i in range(0, len(full_text), chunk_size):
-            yield full_text[i:i + chunk_size]
+        output = "".join(parts)
+        log_agent_result(output)
+        if key is not None and output:
+            cache.set(key, output)
 
     @staticmethod
     def get_agent(mode: str, model_name: str = "gemini"):
         model = AIManager.get_model(model_name)
-        return model.agents.get(mode, model.agents["default"])
+        return model.get_agent(mode)
@@ -5,3 +5,10 @@ class TranscriberInterface(ABC):
     @abstractmethod
     def transcribe(self, audio_path: str):
         pass
+
+    @property
+    def engine_id(self) -> str:
+        """Motor y modelo que transcriben; la caché de transcripciones los separa por este valor."""
+        engine = getattr(self, "ENGINE", type(self).__name__)
+        model = getattr(self, "MODEL", None) or getattr(self, "model_size", None)
+        return f"{engine}:{model}" if model else engine
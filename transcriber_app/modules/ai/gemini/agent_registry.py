@@ -0,0 +1,245 @@
+# transcriber_app/modules/ai/gemini/agent_registry.py
+"""
+Agentes de Gemini declarados en los ficheros de PROMPTS_DIR.
+
+Cada <modo>.md es un modo: el nombre del fichero es el modo y el contenido
+su system prompt. Una cabecera opcional ajusta el agente:
+
+    ---
+    label: Técnico
+    order: 2
+    model: gemini-2.5-flash
+    temperature: 0.2
+    top_p: 0.9
+    top_k: 40
+    max_output_tokens: 4096
+    ---
+    Eres un asistente...
+
+Un '#' al principio de la línea o tras un espacio empieza un comentario; un
+valor que lo necesite (label: "C# y .NET") va entre comillas.
+
+Los agentes se crean al pedirlos y se guardan en memoria. Como mucho cada
+PROMPTS_RELOAD_SECONDS se revisa el directorio: un prompt nuevo aparece
+como modo y uno editado se vuelve a cargar en la siguiente petición, sin
+redesplegar. La caché de resúmenes usa el hash del prompt y su
+configuración, así que un cambio invalida sus entradas.
+"""
+import re
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+
+from transcriber_app.config import USE_MODEL, PROMPTS_DIR, PROMPTS_RELOAD_SECONDS
+from transcriber_app.modules.ai.gemini.model import GeminiAgent
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+# Cabecera → argumento de GeminiAgent, con su tipo
+AGENT_SETTINGS = {
+    "model": ("model_name", str),
+    "temperature": ("temperature", float),
+    "top_p": ("top_p", float),
+    "top_k": ("top_k", int),
+    "max_output_tokens": ("max_output_tokens", int),
+    "max_tokens": ("max_output_tokens", int),
+}
+# Claves de la cabecera que describen el modo para la interfaz
+DISPLAY_SETTINGS = {"label": str, "order": int}
+
+
+# Comentario: '#' tras un espacio (al principio de la línea se descarta antes)
+COMMENT_RE = re.compile(r"\s#.*$")
+
+
+class PromptError(ValueError):
+    """Fichero de prompt con una cabecera que no se puede interpretar."""
+
+
+def _header_value(value: str) -> str:
+    """Valor de una línea de cabecera: entre comillas tal cual; si no, sin el comentario final."""
+    value = value.strip()
+    if value[:1] in ("'", '"'):
+        end = value.find(value[0], 1)
+        if end == -1:
+            raise PromptError(f"Comillas sin cerrar: {value!r}")
+        return value[1:end]
+    return COMMENT_RE.sub("", value).strip()
+
+
+def parse_prompt(raw: str) -> tuple:
+    """Separa la cabecera ('clave: valor' entre líneas '---') del prompt. Devuelve (ajustes, prompt)."""
+    if not raw.startswith("---"):
+        return {}, raw
+
+    lines = raw.splitlines(keepends=True)
+    try:
+        end = next(i for i, line in enumerate(lines[1:], start=1) if line.strip() == "---")
+    except StopIteration:
+        raise PromptError("La cabecera no está cerrada con '---'")
+
+    settings = {}
+    for line in lines[1:end]:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise PromptError(f"Línea de cabecera sin ':': {line!r}")
+        key, value = key.strip().lower(), _header_value(value)
+        kind = AGENT_SETTINGS[key][1] if key in AGENT_SETTINGS else DISPLAY_SETTINGS.get(key)
+        if kind is None:
+            logger.warning(f"[AGENT REGISTRY] Clave de cabecera desconocida ignorada: {key}")
+            continue
+        try:
+            settings[key] = kind(value)
+        except ValueError:
+            raise PromptError(f"Valor inválido para {key}: {value!r}")
+
+    return settings, "".join(lines[end + 1:]).lstrip("\n")
+
+
+def build_agent(settings: dict, prompt: str) -> GeminiAgent:
+    kwargs = {"model_name": USE_MODEL}
+    for key, value in settings.items():
+        if key in AGENT_SETTINGS:
+            kwargs[AGENT_SETTINGS[key][0]] = value
+    return GeminiAgent(system_prompt=prompt, **kwargs)
+
+
+class AgentRegistry(MutableMapping):
+    """
+    {modo: GeminiAgent} leído de un directorio de prompts.
+    Asignar registry[modo] = agente fija ese agente (no se recarga del disco).
+    """
+
+    def __init__(self, prompts_dir=None, reload_seconds: float = None):
+        self.prompts_dir = Path(PROMPTS_DIR if prompts_dir is None else prompts_dir)
+        self.reload_seconds = PROMPTS_RELOAD_SECONDS if reload_seconds is None else reload_seconds
+        self._files = {}      # modo -> (mtime_ns, tamaño) del último escaneo
+        self._settings = {}   # modo -> ajustes de la cabecera
+        self._agents = {}     # modo -> (firma del fichero, agente)
+        self._pinned = {}
+        self._scanned_at = None
+        self._lock = threading.RLock()
+
+    # --- Mapping ---
+    def __getitem__(self, mode):
+        if mode in self._pinned:
+            return self._pinned[mode]
+        with self._lock:
+            self._refresh()
+            if mode not in self._files:
+                raise KeyError(mode)
+            signature = self._files[mode]
+            cached = self._agents.get(mode)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            return self._load(mode, signature, cached)
+
+    def __setitem__(self, mode, agent):
+        with self._lock:
+            self._pinned[mode] = agent
+
+    def __delitem__(self, mode):
+        with self._lock:
+            if self._pinned.pop(mode, None) is None:
+                raise KeyError(mode)
+
+    def __contains__(self, mode):
+        if mode in self._pinned:
+            return True
+        with self._lock:
+            self._refresh()
+            return mode in self._files
+
+    def __iter__(self):
+        return iter(self.modes() + [m for m in self._pinned if m not in self._files])
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    # --- API ---
+    def modes(self) -> list:
+        """Modos disponibles según los ficheros, por 'order' y luego por nombre."""
+        with self._lock:
+            self._refresh()
+            return sorted(self._files, key=lambda m: (self._display(m).get("order", 100), m))
+
+    def describe(self) -> list:
+        """[{mode, label}] para mostrar los modos en la interfaz."""
+        return [{"mode": m, "label": self._display(m).get("label", m.capitalize())} for m in self.modes()]
+
+    def reload(self):
+        """Fuerza a revisar el directorio en la próxima consulta."""
+        with self._lock:
+            self._scanned_at = None
+
+    # --- Interno ---
+    def _display(self, mode: str) -> dict:
+        if mode not in self._settings:
+            try:
+                self._settings[mode] = parse_prompt(self._read(mode))[0]
+            except (OSError, PromptError):
+                self._settings[mode] = {}
+        return self._settings[mode]
+
+    def _read(self, mode: str) -> str:
+        return (self.prompts_dir / f"{mode}.md").read_text(encoding="utf-8")
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._scanned_at is not None and now - self._scanned_at < self.reload_seconds:
+            return
+        self._scanned_at = now
+
+        files = {}
+        for path in self.prompts_dir.glob("*.md"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files[path.stem] = (stat.st_mtime_ns, stat.st_size)
+
+        if self._files and files != self._files:
+            added = files.keys() - self._files.keys()
+            removed = self._files.keys() - files.keys()
+            changed = {m for m in files.keys() & self._files.keys() if files[m] != self._files[m]}
+            logger.info(
+                f"[AGENT REGISTRY] Prompts actualizados: nuevos={sorted(added)}, "
+                f"modificados={sorted(changed)}, eliminados={sorted(removed)}"
+            )
+            for mode in removed | changed:
+                self._settings.pop(mode, None)
+            for mode in removed:
+                self._agents.pop(mode, None)
+        self._files = files
+
+    def _load(self, mode: str, signature: tuple, cached):
+        try:
+            settings, prompt = parse_prompt(self._read(mode))
+            agent = build_agent(settings, prompt)
+        except (OSError, PromptError) as e:
+            if cached is None:
+                raise KeyError(mode) from e
+            # Un prompt a medio editar no deja el modo sin servicio: se sigue
+            # con el agente anterior hasta que el fichero vuelva a cambiar
+            logger.error(f"[AGENT REGISTRY] Error cargando el prompt '{mode}', se mantiene el anterior: {e}")
+            self._agents[mode] = (signature, cached[1])
+            return cached[1]
+
+        self._settings[mode] = settings
+        self._agents[mode] = (signature, agent)
+        logger.info(f"[AGENT REGISTRY] Agente '{mode}' cargado ({agent.model_name})")
+        return agent
+
+
+# Registro compartido: lo usan GeminiModel, las rutas y el CLI
+agent_registry = AgentRegistry()
+
+
+def available_modes() -> list:
+    return agent_registry.modes()
@@ -1,20 +1,7 @@
-# transcriber_app/modules/ai/agents/tecnico_agent.py
+# transcriber_app/modules/ai/gemini/agents/tecnico_agent.py
+# Compatibilidad: los agentes se declaran en prompts/tecnico.md (ver agent_registry.py).
+# Este objeto es el cargado al importar; tras editar el prompt, usar agent_registry["tecnico"]
 
-from transcriber_app.config import USE_MODEL, AVAILABLE_MODES_DICT
-from transcriber_app.modules.ai.gemini.model import GeminiAgent
+from transcriber_app.modules.ai.gemini.agent_registry import agent_registry
 
-
-def load_prompt(name: str) -> str:
-    with open(
-        f"transcriber_app/modules/ai/gemini/prompts/{name}.md",
-        "r",
-        encoding="utf-8"
-    ) as f:
-        return f.read()
-
-
-# Creamos el agente usando tu propio cliente Gemini
-tecnico_agent = GeminiAgent(
-    model_name=USE_MODEL,
-    system_prompt=load_prompt(AVAILABLE_MODES_DICT["tecnico"])
-)
+tecnico_agent = agent_registry["tecnico"]
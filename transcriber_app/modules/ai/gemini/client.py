@@ -1,20 +1,12 @@
 # transcriber_app/modules/ai/gemini/client.py
-import os
-import google.generativeai as genai
+from transcriber_app.config import SUMMARY_CHUNK_TOKENS
 from transcriber_app.modules.ai.base.model_interface import AIModel
-from transcriber_app.modules.logging.logging_config import setup_logging
-from .agents import (
-    tecnico_agent,
-    ejecutivo_agent,
-    refinamiento_agent,
-    bullet_agent,
-    default_agent,
-)
+from transcriber_app.modules.ai.map_reduce import estimate_tokens, map_reduce_summarize, map_reduce_summarize_async
+from transcriber_app.modules.ai.gemini.agent_registry import agent_registry
+from transcriber_app.modules.logging.logging_config import setup_logging, preview
 
 # Logging
 logger = setup_logging("transcribeapp")
-# Configuración de API Key
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 
 class GeminiModel(AIModel):
@@ -24,25 +16,54 @@ class GeminiModel(AIModel):
     - Solo ejecuta agentes y prompts
     """
 
-    def __init__(self):
-        # Diccionario de agentes
-        self.agents = {
-            "tecnico": tecnico_agent,
-            "ejecutivo": ejecutivo_agent,
-            "refinamiento": refinamiento_agent,
-            "bullet": bullet_agent,
-            "default": default_agent,
-        }
+    def __init__(self, agents=None):
+        # Agentes por modo, leídos de los prompts al usarlos (ver agent_registry.py)
+        self.agents = agent_registry if agents is None else agents
+
+    def get_agent(self, mode: str):
+        return self.agents[mode] if mode in self.agents else self.agents["default"]
 
     def run_agent(self, mode: str, text: str, stream: bool = False):
-        agent = self.agents.get(mode, default_agent)
+        """Devuelve el texto generado o, con stream=True, un generador de trozos."""
+        agent = self.get_agent(mode)
+
+        if estimate_tokens(text) > SUMMARY_CHUNK_TOKENS:
+            # Transcripción demasiado larga para una sola petición: map-reduce.
+            # Con stream solo la pasada final llega a trozos.
+            def run(prompt):
+                return self._validate_result(agent.run(prompt))
+            final_run = (lambda prompt: agent.run(prompt, stream=True)) if stream else None
+            return map_reduce_summarize(run, text, max_tokens=SUMMARY_CHUNK_TOKENS, final_run=final_run)
 
         result = agent.run(text, stream=stream)
-        logger.info(f"[GEMINI MODEL] Tipo bruto: {type(result)} - {repr(result)[:200]}")
+        if stream:
+            return result
+        return self._validate_result(result)
+
+    async def run_agent_async(self, mode: str, text: str, stream: bool = False):
+        agent = self.get_agent(mode)
+
+        if estimate_tokens(text) > SUMMARY_CHUNK_TOKENS:
+            async def run(prompt):
+                return self._validate_result(await agent.run_async(prompt))
+
+            async def run_stream(prompt):
+                return await agent.run_async(prompt, stream=True)
+            return await map_reduce_summarize_async(
+                run, text, max_tokens=SUMMARY_CHUNK_TOKENS, final_run=run_stream if stream else None
+            )
+
+        result = await agent.run_async(text, stream=stream)
+        if stream:
+            return result
+        return self._validate_result(result)
+
+    def _validate_result(self, result):
+        logger.debug("[GEMINI MODEL] Tipo bruto: %s - %s", type(result), preview(result))
 
         # Solo aceptamos dos cosas: str o Response
         if isinstance(result, str):
-            logger.info(f"[GEMINI MODEL] Resultado (str): {result[:100]}...")
+            logger.debug("[GEMINI MODEL] Resultado (str): %s...", preview(result, 100))
             return result
 
         # Soporte para starlette.responses.Response sin dependencia directa fuerte
@@ -50,7 +71,7 @@ class GeminiModel(AIModel):
             try:
                 # Intentar acceder a .body
                 body = result.body.decode(getattr(result, "charset", None) or "utf-8")
-                logger.info(f"[GEMINI MODEL] Resultado (Response): {body[:100]}...")
+                logger.debug("[GEMINI MODEL] Resultado (Response): %s...", preview(body, 100))
                 return body
             except Exception as e:
                 logger.warn(f"[GEMINI MODEL] No se pudo decodificar el cuerpo de la respuesta: {e}")
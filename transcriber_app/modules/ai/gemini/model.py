@@ -1,13 +1,28 @@
 # transcriber_app/modules/ai/gemini/model.py
 
-import google.generativeai as genai
+import threading
 from transcriber_app.config import GOOGLE_API_KEY
-from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.ai.map_reduce import estimate_tokens
+from transcriber_app.modules.ai.rate_limiter import governed_call, governed_call_async
+from transcriber_app.modules.logging.logging_config import setup_logging, preview
 
 # Logging
 logger = setup_logging("transcribeapp")
 
-genai.configure(api_key=GOOGLE_API_KEY)
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def load_genai():
+    """Importa y configura google.generativeai la primera vez que hace falta (tarda ~1s)."""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GOOGLE_API_KEY)
+                _genai = genai
+    return _genai
 
 
 def normalize_gemini_output(response):
@@ -59,18 +74,28 @@ class GeminiAgent:
             "max_output_tokens": max_output_tokens,
         }
 
-        self._model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=self.generation_config
-        )
+        self._model = None
 
-    def run(self, text: str, stream: bool = False):
-        logger.info(f"[GEMINI AGENT] stream recibido: {stream}")
-        logger.info(f"[GEMINI AGENT] Texto recibido: {text[:100]}...")
+    @property
+    def model(self):
+        """Cliente del SDK, creado en la primera petición."""
+        if self._model is None:
+            self._model = load_genai().GenerativeModel(
+                model_name=self.model_name,
+                generation_config=self.generation_config
+            )
+        return self._model
 
-        response = self._model.generate_content(
-            self.system_prompt + "\n\n" + text,
-            stream=stream
+    def run(self, text: str, stream: bool = False):
+        logger.debug("[GEMINI AGENT] stream recibido: %s", stream)
+        logger.debug("[GEMINI AGENT] Texto recibido: %s", preview(text, 100))
+
+        prompt = self.system_prompt + "\n\n" + text
+        # Dentro de la cuota de Gemini: los 429 esperan y se reintentan
+        response = governed_call(
+            "gemini", self.model_name,
+            lambda: self.model.generate_content(prompt, stream=stream),
+            stream=stream, tokens=estimate_tokens(prompt)
         )
 
         if stream:
@@ -80,5 +105,26 @@ class GeminiAgent:
                         yield chunk.text
             return generator()
 
-        logger.info(f"[GEMINI AGENT] Respuesta bruta recibida: {repr(response)[:200]}. Tipo: {type(response)}")
+        logger.debug("[GEMINI AGENT] Respuesta bruta recibida: %s. Tipo: %s", preview(response), type(response))
+        return normalize_gemini_output(response)
+
+    async def run_async(self, text: str, stream: bool = False):
+        """Versión asíncrona de run con generate_content_async del SDK."""
+        logger.debug("[GEMINI AGENT] (async) stream recibido: %s", stream)
+
+        prompt = self.system_prompt + "\n\n" + text
+        response = await governed_call_async(
+            "gemini", self.model_name,
+            lambda: self.model.generate_content_async(prompt, stream=stream),
+            stream=stream, tokens=estimate_tokens(prompt)
+        )
+
+        if stream:
+            async def generator():
+                async for chunk in response:
+                    if hasattr(chunk, "text") and chunk.text:
+                        yield chunk.text
+            return generator()
+
+        logger.debug("[GEMINI AGENT] (async) Respuesta bruta recibida: %s", preview(response))
         return normalize_gemini_output(response)
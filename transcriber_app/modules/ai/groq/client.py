@@ -1,17 +1,52 @@
 # transcriber_app/modules/ai/groq/client.py
 
 import requests
+import httpx
 from transcriber_app.config import GROQ_API_KEY
+from transcriber_app.modules.ai.http_pool import get_session, get_async_client
+from transcriber_app.modules.ai.map_reduce import estimate_tokens
+from transcriber_app.modules.ai.rate_limiter import governed_call, governed_call_async
 
 
 class GroqClient:
     URL = "https://api.groq.com/openai/v1/chat/completions"
 
+    def __init__(self, session: requests.Session = None, async_client: httpx.AsyncClient = None):
+        # Sin inyección se usan las conexiones compartidas del proveedor
+        self._session = session
+        self._async_client = async_client
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_session("groq")
+
+    def _payload(self, prompt: str, model: str) -> dict:
+        return {"model": model, "messages": [{"role": "user", "content": prompt}]}
+
     def chat(self, prompt: str, model="llama3-70b"):
-        resp = requests.post(
-            self.URL,
-            headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
-            json={"model": model, "messages": [{"role": "user", "content": prompt}]}
+        # Dentro de la cuota de Groq: los 429 esperan y se reintentan
+        resp = governed_call(
+            "groq", model,
+            lambda: self.session.post(
+                self.URL,
+                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                json=self._payload(prompt, model)
+            ),
+            tokens=estimate_tokens(prompt)
+        )
+        resp.raise_for_status()
+        return resp.json()["choices"][0]["message"]["content"]
+
+    async def chat_async(self, prompt: str, model="llama3-70b"):
+        client = self._async_client or get_async_client("groq")
+        resp = await governed_call_async(
+            "groq", model,
+            lambda: client.post(
+                self.URL,
+                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                json=self._payload(prompt, model)
+            ),
+            tokens=estimate_tokens(prompt)
         )
         resp.raise_for_status()
         return resp.json()["choices"][0]["message"]["content"]
@@ -10,3 +10,6 @@ class GroqModel(AIModel):
 
     def run(self, prompt: str):
         return self.client.chat(prompt)
+
+    async def run_async(self, prompt: str):
+        return await self.client.chat_async(prompt)
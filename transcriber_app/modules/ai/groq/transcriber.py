@@ -2,51 +2,435 @@
 
 import os
 import time
+import uuid
+import asyncio
 import tempfile
 import subprocess
+import httpx
 import requests
-from typing import Tuple, Dict, Any
-from transcriber_app.config import GROQ_API_KEY
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, Dict, Any, Iterator, AsyncIterator
+from transcriber_app.config import (
+    GROQ_API_KEY,
+    TRANSCRIBE_CHUNK_SECONDS,
+    TRANSCRIBE_CHUNK_OVERLAP,
+    TRANSCRIBE_MAX_WORKERS,
+    TRANSCRIBE_SPLIT_ON_SILENCE,
+    TRANSCRIBE_STREAM_UPLOAD,
+    TRANSCRIBE_AUDIO_CODEC,
+)
 from transcriber_app.modules.ai.base.transcriber_interface import TranscriberInterface
+from transcriber_app.modules.ai.http_pool import get_session, get_async_client
+from transcriber_app.modules.ai.rate_limiter import governed_call, governed_call_async
+from transcriber_app.modules.checkpoints import checkpointed_chunk, current_checkpoint
+from transcriber_app.modules.audio_chunker import (
+    probe_duration,
+    detect_silences,
+    probe_duration_async,
+    detect_silences_async,
+    plan_chunks,
+    stitch_texts,
+)
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import time_stage
+from transcriber_app.modules.progress import report_progress
 
+# Logging
+logger = setup_logging("transcribeapp")
 
-def ensure_wav(input_path: str) -> str:
-    tmp = tempfile.mktemp(suffix=".wav")
-    cmd = ["ffmpeg", "-y", "-nostdin", "-loglevel", "error",
-           "-i", input_path, "-vn", "-acodec", "pcm_s16le",
-           "-ar", "16000", "-ac", "1", tmp]
-    subprocess.run(cmd, check=True)
-    return tmp
+# Códec -> (argumentos de ffmpeg, nombre de fichero, content-type)
+# FLAC y Opus ocupan entre 2 y 10 veces menos que el PCM de 16 kHz
+AUDIO_FORMATS = {
+    "wav": (["-acodec", "pcm_s16le", "-f", "wav"], "audio.wav", "audio/wav"),
+    "flac": (["-acodec", "flac", "-f", "flac"], "audio.flac", "audio/flac"),
+    "opus": (["-acodec", "libopus", "-b:a", "32k", "-f", "ogg"], "audio.ogg", "audio/ogg"),
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def ffmpeg_command(input_path: str, output: str, start: float = None, duration: float = None,
+                   codec: str = "wav") -> list:
+    """Comando ffmpeg que convierte (un tramo de) el audio a 16 kHz mono en el códec pedido."""
+    codec_args = AUDIO_FORMATS[codec][0]
+    cmd = ["ffmpeg", "-y", "-nostdin", "-loglevel", "error"]
+    if start is not None:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", input_path]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += ["-vn", "-ar", "16000", "-ac", "1"] + codec_args + [output]
+    return cmd
+
+
+def encode_audio(input_path: str, start: float = None, duration: float = None, codec: str = "wav") -> str:
+    """Convierte el audio a un fichero temporal y devuelve su ruta."""
+    suffix = os.path.splitext(AUDIO_FORMATS[codec][1])[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        path = tmp.name
+    with time_stage("ffmpeg"):
+        subprocess.run(ffmpeg_command(input_path, path, start, duration, codec), check=True)
+    return path
+
+
+def ensure_wav(input_path: str, start: float = None, duration: float = None) -> str:
+    return encode_audio(input_path, start, duration, codec="wav")
+
+
+def stream_encoded(input_path: str, start: float = None, duration: float = None,
+                   codec: str = "flac") -> Iterator[bytes]:
+    """
+    Generador con la salida de ffmpeg leída de su stdout.
+    ffmpeg solo se lanza cuando se empieza a consumir el generador.
+    """
+    cmd = ffmpeg_command(input_path, "pipe:1", start, duration, codec)
+    # ffmpeg y la subida que consume su salida van en paralelo y no se pueden medir
+    # por separado: la etapa es encode_upload, no ffmpeg
+    with time_stage("encode_upload"):
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            while True:
+                chunk = proc.stdout.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            stderr = proc.stderr.read()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+
+
+async def encode_audio_async(input_path: str, start: float = None, duration: float = None,
+                             codec: str = "wav") -> str:
+    """Versión asíncrona de encode_audio."""
+    suffix = os.path.splitext(AUDIO_FORMATS[codec][1])[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        path = tmp.name
+    cmd = ffmpeg_command(input_path, path, start, duration, codec)
+    with time_stage("ffmpeg"):
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        os.unlink(path)
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    return path
+
+
+async def stream_encoded_async(input_path: str, start: float = None, duration: float = None,
+                               codec: str = "flac") -> AsyncIterator[bytes]:
+    """Versión asíncrona de stream_encoded (asyncio.create_subprocess_exec)."""
+    cmd = ffmpeg_command(input_path, "pipe:1", start, duration, codec)
+    with time_stage("encode_upload"):
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            while True:
+                chunk = await proc.stdout.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            stderr = await proc.stderr.read()
+            if await proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+
+def _multipart_head(fields: Dict[str, str], file_field: str, filename: str, content_type: str,
+                    boundary: str) -> bytes:
+    parts = [
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n"
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    )
+    return "".join(parts).encode("utf-8")
+
+
+def _multipart_tail(boundary: str) -> bytes:
+    return f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+def multipart_stream(fields: Dict[str, str], file_field: str, filename: str, content_type: str,
+                     chunks: Iterator[bytes], boundary: str) -> Iterator[bytes]:
+    """Cuerpo multipart/form-data generado al vuelo (se envía con Transfer-Encoding: chunked)."""
+    yield _multipart_head(fields, file_field, filename, content_type, boundary)
+    yield from chunks
+    yield _multipart_tail(boundary)
+
+
+async def multipart_stream_async(fields: Dict[str, str], file_field: str, filename: str, content_type: str,
+                                 chunks: AsyncIterator[bytes], boundary: str) -> AsyncIterator[bytes]:
+    """Versión asíncrona de multipart_stream, para httpx.AsyncClient."""
+    yield _multipart_head(fields, file_field, filename, content_type, boundary)
+    async for chunk in chunks:
+        yield chunk
+    yield _multipart_tail(boundary)
 
 
 class GroqTranscriber(TranscriberInterface):
     URL = "https://api.groq.com/openai/v1/audio/transcriptions"
+    ENGINE = "groq-whisper"
     MODEL = "whisper-large-v3"
 
+    def __init__(self, chunk_seconds: float = None, overlap_seconds: float = None,
+                 max_workers: int = None, split_on_silence: bool = None,
+                 stream_upload: bool = None, audio_codec: str = None,
+                 session: requests.Session = None, async_client: httpx.AsyncClient = None):
+        # chunk_seconds=0 desactiva el troceado
+        self.chunk_seconds = TRANSCRIBE_CHUNK_SECONDS if chunk_seconds is None else chunk_seconds
+        self.overlap_seconds = TRANSCRIBE_CHUNK_OVERLAP if overlap_seconds is None else overlap_seconds
+        self.max_workers = TRANSCRIBE_MAX_WORKERS if max_workers is None else max_workers
+        self.split_on_silence = TRANSCRIBE_SPLIT_ON_SILENCE if split_on_silence is None else split_on_silence
+        # stream_upload: ffmpeg escribe en la petición HTTP sin pasar por disco
+        self.stream_upload = TRANSCRIBE_STREAM_UPLOAD if stream_upload is None else stream_upload
+        self.audio_codec = (audio_codec or TRANSCRIBE_AUDIO_CODEC).lower()
+        if self.audio_codec not in AUDIO_FORMATS:
+            raise ValueError(f"Códec no soportado: {self.audio_codec}")
+        # Conexiones keep-alive; sin inyección se usan las compartidas del proveedor
+        self._session = session
+        self._async_client = async_client
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_session("groq")
+
     def transcribe(self, audio_path: str) -> Tuple[str, Dict[str, Any]]:
         if not GROQ_API_KEY:
             raise RuntimeError("Falta GROQ_API_KEY")
 
-        wav = ensure_wav(audio_path)
         start = time.time()
+        report_progress("converting")
+        duration = self._probe_duration(audio_path)
+
+        if self._needs_chunking(duration):
+            text, chunks = self._transcribe_chunked(audio_path, duration)
+        else:
+            report_progress("transcribing", chunk=0, chunks=1)
+            text, chunks = self._transcribe_segment(audio_path, audio_seconds=duration), 1
+            report_progress("transcribing", chunk=1, chunks=1)
+
+        return text, self._metadata(time.time() - start, duration, chunks)
+
+    async def transcribe_async(self, audio_path: str) -> Tuple[str, Dict[str, Any]]:
+        """Igual que transcribe, pero con ffmpeg y HTTP asíncronos: no bloquea el event loop."""
+        if not GROQ_API_KEY:
+            raise RuntimeError("Falta GROQ_API_KEY")
+
+        start = time.time()
+        report_progress("converting")
+        try:
+            duration = await probe_duration_async(audio_path)
+        except Exception as e:
+            logger.warning(f"[GROQ TRANSCRIBER] No se pudo obtener la duración de {audio_path}: {e}")
+            duration = None
+
+        client = self._async_client or get_async_client("groq")
+        if self._needs_chunking(duration):
+            text, chunks = await self._transcribe_chunked_async(client, audio_path, duration)
+        else:
+            report_progress("transcribing", chunk=0, chunks=1)
+            text, chunks = await self._transcribe_segment_async(client, audio_path, audio_seconds=duration), 1
+            report_progress("transcribing", chunk=1, chunks=1)
+
+        return text, self._metadata(time.time() - start, duration, chunks)
 
-        with open(wav, "rb") as f:
-            resp = requests.post(
+    def transcribe_range(self, audio_path: str, start: float = None, duration: float = None) -> str:
+        """Transcribe solo un tramo del audio (duration=None llega hasta el final)."""
+        if not GROQ_API_KEY:
+            raise RuntimeError("Falta GROQ_API_KEY")
+        return self._transcribe_segment(audio_path, start, duration)
+
+    def _needs_chunking(self, duration) -> bool:
+        return bool(self.chunk_seconds and duration and duration > self.chunk_seconds + self.overlap_seconds)
+
+    def _metadata(self, elapsed: float, duration, chunks: int) -> Dict[str, Any]:
+        return {
+            "engine": self.ENGINE,
+            "model": self.MODEL,
+            "transcription_time": elapsed,
+            "audio_duration": duration,
+            "chunks": chunks,
+        }
+
+    def _probe_duration(self, audio_path: str):
+        try:
+            return probe_duration(audio_path)
+        except Exception as e:
+            logger.warning(f"[GROQ TRANSCRIBER] No se pudo obtener la duración de {audio_path}: {e}")
+            return None
+
+    def _transcribe_chunked(self, audio_path: str, duration: float) -> Tuple[str, int]:
+        silences = []
+        if self.split_on_silence:
+            try:
+                silences = detect_silences(audio_path)
+            except Exception as e:
+                logger.warning(f"[GROQ TRANSCRIBER] Detección de silencios fallida, se usan ventanas fijas: {e}")
+
+        chunks = plan_chunks(duration, self.chunk_seconds, self.overlap_seconds, silences)
+        logger.info(f"[GROQ TRANSCRIBER] Audio de {duration:.0f}s dividido en {len(chunks)} trozos")
+
+        report_progress("transcribing", chunk=0, chunks=len(chunks))
+        workers = max(1, min(self.max_workers, len(chunks)))
+        texts = [None] * len(chunks)
+        # Los trozos ya transcritos en un intento anterior del job se reutilizan
+        checkpoint = current_checkpoint()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq-chunk") as pool:
+            futures = {
+                pool.submit(self._transcribe_chunk, checkpoint, audio_path, chunk[0], chunk[1] - chunk[0]): i
+                for i, chunk in enumerate(chunks)
+            }
+            # El progreso se notifica desde este hilo, que es el que tiene el oyente
+            for finished, future in enumerate(as_completed(futures), 1):
+                texts[futures[future]] = future.result()
+                report_progress("transcribing", chunk=finished, chunks=len(chunks))
+
+        return stitch_texts(texts, [c[2] for c in chunks]), len(chunks)
+
+    async def _transcribe_chunked_async(self, client: httpx.AsyncClient, audio_path: str,
+                                        duration: float) -> Tuple[str, int]:
+        silences = []
+        if self.split_on_silence:
+            try:
+                silences = await detect_silences_async(audio_path)
+            except Exception as e:
+                logger.warning(f"[GROQ TRANSCRIBER] Detección de silencios fallida, se usan ventanas fijas: {e}")
+
+        chunks = plan_chunks(duration, self.chunk_seconds, self.overlap_seconds, silences)
+        logger.info(f"[GROQ TRANSCRIBER] Audio de {duration:.0f}s dividido en {len(chunks)} trozos")
+
+        # El semáforo limita las subidas simultáneas igual que el pool del modo síncrono
+        semaphore = asyncio.Semaphore(max(1, self.max_workers))
+        finished = 0
+        report_progress("transcribing", chunk=0, chunks=len(chunks))
+        checkpoint = current_checkpoint()
+
+        async def run(chunk):
+            nonlocal finished
+            start, length = chunk[0], chunk[1] - chunk[0]
+            saved = await asyncio.to_thread(checkpoint.load_chunk, _chunk_key(start, length)) if checkpoint else None
+            if saved is not None:
+                text = saved
+            else:
+                async with semaphore:
+                    text = await self._transcribe_segment_async(client, audio_path, start, length)
+                if checkpoint is not None:
+                    await asyncio.to_thread(checkpoint.save_chunk, _chunk_key(start, length), text)
+            finished += 1
+            report_progress("transcribing", chunk=finished, chunks=len(chunks))
+            return text
+
+        texts = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return stitch_texts(list(texts), [c[2] for c in chunks]), len(chunks)
+
+    def _transcribe_chunk(self, checkpoint, audio_path: str, start: float, duration: float) -> str:
+        return checkpointed_chunk(
+            checkpoint, _chunk_key(start, duration),
+            lambda: self._transcribe_segment(audio_path, start, duration)
+        )
+
+    async def _transcribe_segment_async(self, client: httpx.AsyncClient, audio_path: str,
+                                        start: float = None, duration: float = None,
+                                        audio_seconds: float = None) -> str:
+        # Dentro de la cuota de Groq: los 429 esperan y se reintentan
+        resp = await governed_call_async(
+            "groq", self.MODEL,
+            lambda: self._post_async(client, audio_path, start, duration),
+            audio_seconds=duration if duration is not None else (audio_seconds or 0)
+        )
+        resp.raise_for_status()
+        return resp.json().get("text", "").strip()
+
+    async def _post_async(self, client: httpx.AsyncClient, audio_path: str,
+                          start: float = None, duration: float = None) -> httpx.Response:
+        _, filename, content_type = AUDIO_FORMATS[self.audio_codec]
+        headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
+
+        if self.stream_upload:
+            boundary = uuid.uuid4().hex
+            body = multipart_stream_async(
+                {"model": self.MODEL}, "file", filename, content_type,
+                stream_encoded_async(audio_path, start, duration, self.audio_codec),
+                boundary
+            )
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+            return await client.post(self.URL, headers=headers, content=body)
+        else:
+            path = await encode_audio_async(audio_path, start, duration, self.audio_codec)
+            try:
+                data = await asyncio.to_thread(_read_bytes, path)
+            finally:
+                os.unlink(path)
+            return await client.post(
                 self.URL,
-                headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                headers=headers,
                 data={"model": self.MODEL},
-                files={"file": ("audio.wav", f, "audio/wav")},
-                timeout=300
+                files={"file": (filename, data, content_type)},
             )
 
-        os.unlink(wav)
+    def _transcribe_segment(self, audio_path: str, start: float = None, duration: float = None,
+                            audio_seconds: float = None) -> str:
+        """audio_seconds: duración del audio completo cuando no se pide un tramo (para la cuota)."""
+        post = self._post_stream if self.stream_upload else self._post_file
+        resp = governed_call(
+            "groq", self.MODEL,
+            lambda: post(audio_path, start, duration),
+            audio_seconds=duration if duration is not None else (audio_seconds or 0)
+        )
         resp.raise_for_status()
+        return resp.json().get("text", "").strip()
 
-        text = resp.json().get("text", "").strip()
-        elapsed = time.time() - start
+    def _post_stream(self, audio_path: str, start: float = None, duration: float = None):
+        _, filename, content_type = AUDIO_FORMATS[self.audio_codec]
+        boundary = uuid.uuid4().hex
+        body = multipart_stream(
+            {"model": self.MODEL}, "file", filename, content_type,
+            stream_encoded(audio_path, start, duration, self.audio_codec),
+            boundary
+        )
+        return self.session.post(
+            self.URL,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+            },
+            data=body,
+            timeout=300
+        )
 
-        return text, {
-            "engine": "groq-whisper",
-            "model": self.MODEL,
-            "transcription_time": elapsed,
-        }
+    def _post_file(self, audio_path: str, start: float = None, duration: float = None):
+        _, filename, content_type = AUDIO_FORMATS[self.audio_codec]
+        path = encode_audio(audio_path, start, duration, self.audio_codec)
+
+        try:
+            with open(path, "rb") as f:
+                return self.session.post(
+                    self.URL,
+                    headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
+                    data={"model": self.MODEL},
+                    files={"file": (filename, f, content_type)},
+                    timeout=300
+                )
+        finally:
+            os.unlink(path)
+
+
+def _chunk_key(start: float, duration: float) -> str:
+    return f"{start:.2f}+{duration:.2f}"
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
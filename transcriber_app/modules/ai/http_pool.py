@@ -0,0 +1,84 @@
+# transcriber_app/modules/ai/http_pool.py
+"""
+Conexiones HTTP compartidas por proveedor.
+
+Cada proveedor (p. ej. "groq") tiene una requests.Session con su propio pool
+keep-alive para el camino síncrono y un httpx.AsyncClient para el asíncrono,
+así las peticiones reutilizan la conexión TCP/TLS en lugar de abrir una nueva
+cada vez. httpx negocia HTTP/2 si el paquete h2 está instalado.
+
+Los clientes async están ligados a su event loop, por eso se guardan por loop.
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+from functools import lru_cache
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from transcriber_app.config import HTTP_POOL_MAXSIZE, HTTP_KEEPALIVE_SECONDS, HTTP2_ENABLED
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+_lock = threading.Lock()
+_sessions = {}
+_async_clients = weakref.WeakKeyDictionary()  # loop -> {proveedor: cliente}
+
+
+@lru_cache(maxsize=None)
+def http2_available() -> bool:
+    return HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def get_session(provider: str, pool_maxsize: int = HTTP_POOL_MAXSIZE) -> requests.Session:
+    """Sesión compartida del proveedor; pool_maxsize limita las conexiones por host."""
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+            logger.info(f"[HTTP POOL] Sesión creada para {provider} (máx. {pool_maxsize} conexiones por host)")
+        return session
+
+
+def get_async_client(provider: str, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                     timeout: float = 300) -> httpx.AsyncClient:
+    """Cliente async compartido del proveedor en el event loop actual."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=http2_available(),
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=pool_maxsize,
+                    max_keepalive_connections=pool_maxsize,
+                    keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+                ),
+            )
+            clients[provider] = client
+            logger.info(f"[HTTP POOL] Cliente async creado para {provider} (http2={http2_available()})")
+        return client
+
+
+async def close_pools():
+    """Cierra las sesiones y los clientes async del loop actual (apagado de la app)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+
+    for session in sessions:
+        session.close()
+    for client in clients:
+        await client.aclose()
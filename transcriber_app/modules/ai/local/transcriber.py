@@ -0,0 +1,151 @@
+# transcriber_app/modules/ai/local/transcriber.py
+"""
+Transcripción local en CPU con faster-whisper (CTranslate2, int8).
+
+- El modelo se carga una sola vez por proceso y se queda en memoria: todos
+  los LocalWhisperTranscriber con la misma configuración lo comparten.
+- num_workers permite que varios jobs de la cola transcriban a la vez con
+  el mismo modelo y BatchedInferencePipeline agrupa los segmentos de voz de
+  cada audio en lotes de LOCAL_WHISPER_BATCH_SIZE.
+
+Los tramos (transcribe_range) se decodifican con ffmpeg -ss/-t a PCM de
+16 kHz: solo se lee la ventana pedida, no el audio entero.
+
+faster-whisper es opcional (pip install ".[local]"); solo se importa al
+cargar el modelo, y numpy (dependencia suya) al decodificar un tramo.
+"""
+import importlib.util
+import subprocess
+import threading
+import time
+from typing import Tuple, Dict, Any
+
+from transcriber_app.config import (
+    LANGUAGE,
+    LOCAL_WHISPER_MODEL,
+    LOCAL_WHISPER_DEVICE,
+    LOCAL_WHISPER_COMPUTE_TYPE,
+    LOCAL_WHISPER_BATCH_SIZE,
+    LOCAL_WHISPER_WORKERS,
+    LOCAL_WHISPER_CPU_THREADS,
+)
+from transcriber_app.modules.ai.base.transcriber_interface import TranscriberInterface
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import time_stage
+from transcriber_app.modules.progress import report_progress
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+SAMPLE_RATE = 16000
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def local_whisper_available() -> bool:
+    return importlib.util.find_spec("faster_whisper") is not None
+
+
+def decode_command(audio_path: str, start: float = None, duration: float = None) -> list:
+    """Comando ffmpeg que decodifica solo el tramo pedido a PCM s16le de 16 kHz mono por stdout."""
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", audio_path]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    return cmd + ["-vn", "-ar", str(SAMPLE_RATE), "-ac", "1", "-f", "s16le", "-"]
+
+
+def decode_range(audio_path: str, start: float = None, duration: float = None):
+    """Muestras float32 en [-1, 1) del tramo, como las devuelve faster_whisper.decode_audio."""
+    import numpy as np
+
+    with time_stage("ffmpeg"):
+        result = subprocess.run(decode_command(audio_path, start, duration), capture_output=True, check=True)
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def load_model(model_size: str, device: str, compute_type: str, num_workers: int, cpu_threads: int):
+    """Devuelve (modelo, pipeline por lotes) cargándolos solo la primera vez."""
+    key = (model_size, device, compute_type, num_workers, cpu_threads)
+    with _models_lock:
+        if key not in _models:
+            try:
+                import faster_whisper
+            except ImportError as e:
+                raise RuntimeError(
+                    "faster-whisper no está instalado (pip install \"transcriber_app[local]\")"
+                ) from e
+
+            start = time.time()
+            model = faster_whisper.WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                num_workers=num_workers,
+                cpu_threads=cpu_threads,
+            )
+            # BatchedInferencePipeline existe desde faster-whisper 1.1
+            pipeline_cls = getattr(faster_whisper, "BatchedInferencePipeline", None)
+            pipeline = pipeline_cls(model=model) if pipeline_cls else None
+            _models[key] = (model, pipeline)
+            logger.info(
+                f"[LOCAL WHISPER] Modelo {model_size} cargado en {time.time() - start:.1f}s "
+                f"({device}, {compute_type}, lotes={'sí' if pipeline else 'no'})"
+            )
+        return _models[key]
+
+
+class LocalWhisperTranscriber(TranscriberInterface):
+    ENGINE = "local-whisper"
+
+    def __init__(self, model_size: str = None, device: str = None, compute_type: str = None,
+                 batch_size: int = None, num_workers: int = None, cpu_threads: int = None,
+                 language: str = None):
+        self.model_size = model_size or LOCAL_WHISPER_MODEL
+        self.device = device or LOCAL_WHISPER_DEVICE
+        self.compute_type = compute_type or LOCAL_WHISPER_COMPUTE_TYPE
+        self.batch_size = LOCAL_WHISPER_BATCH_SIZE if batch_size is None else batch_size
+        self.num_workers = LOCAL_WHISPER_WORKERS if num_workers is None else num_workers
+        self.cpu_threads = LOCAL_WHISPER_CPU_THREADS if cpu_threads is None else cpu_threads
+        self.language = language or LANGUAGE
+
+    def warm_up(self):
+        """Carga el modelo por adelantado (p. ej. al arrancar el servidor)."""
+        self._model()
+
+    def _model(self):
+        return load_model(self.model_size, self.device, self.compute_type, self.num_workers, self.cpu_threads)
+
+    def transcribe(self, audio_path: str) -> Tuple[str, Dict[str, Any]]:
+        start = time.time()
+        report_progress("transcribing", chunk=0, chunks=1)
+        text, info = self._run(audio_path)
+        report_progress("transcribing", chunk=1, chunks=1)
+
+        return text, {
+            "engine": self.ENGINE,
+            "model": self.model_size,
+            "transcription_time": time.time() - start,
+            "audio_duration": getattr(info, "duration", None),
+            "chunks": 1,
+        }
+
+    def transcribe_range(self, audio_path: str, start: float = None, duration: float = None) -> str:
+        """Transcribe solo un tramo del audio (duration=None llega hasta el final)."""
+        text, _ = self._run(decode_range(audio_path, start, duration))
+        return text
+
+    def _run(self, audio):
+        """audio: ruta o muestras a 16 kHz; devuelve (texto, info)."""
+        model, pipeline = self._model()
+        if pipeline is not None and self.batch_size > 1:
+            segments, info = pipeline.transcribe(audio, language=self.language, batch_size=self.batch_size)
+        else:
+            segments, info = model.transcribe(audio, language=self.language, vad_filter=True)
+
+        # segments es un generador: la transcripción ocurre al recorrerlo
+        text = " ".join(segment.text.strip() for segment in segments)
+        return text.strip(), info
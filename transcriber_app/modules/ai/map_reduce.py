@@ -0,0 +1,127 @@
+# transcriber_app/modules/ai/map_reduce.py
+"""
+Resumen jerárquico (map-reduce) para transcripciones demasiado largas para
+una sola petición.
+
+1. split_transcript corta el texto en trozos que caben en el presupuesto de
+   tokens, respetando cambios de hablante y finales de frase.
+2. Cada trozo se resume en paralelo con el mismo agente (map).
+3. Los resúmenes parciales se combinan en una pasada final (reduce). Si aún
+   no caben, se vuelven a agrupar y resumir, así que la latencia queda
+   acotada para cualquier longitud.
+"""
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from transcriber_app.config import SUMMARY_CHUNK_TOKENS, SUMMARY_MAP_WORKERS
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+CHARS_PER_TOKEN = 4
+# Líneas del tipo "Ana: ..." o "[00:12:03] Ana: ..." abren un turno de palabra
+SPEAKER_RE = re.compile(r"^\s*(?:\[[\d:.]+\]\s*)?[\w .'-]{1,40}:\s")
+SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+MAP_PROMPT = (
+    "A continuación tienes el fragmento {index} de {total} de una transcripción larga. "
+    "Resume solo este fragmento siguiendo tus instrucciones; el resultado final se "
+    "compondrá a partir de los resúmenes de todos los fragmentos.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "Estos son, en orden, los resúmenes parciales de los fragmentos de una transcripción "
+    "larga. Combínalos en un único resultado final siguiendo tus instrucciones, sin "
+    "repetir información.\n\n{text}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación barata (sin llamar a la API): ~4 caracteres por token."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _units(text: str) -> list:
+    """Divide el texto en turnos de hablante o, si no los hay, en frases."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if sum(1 for line in lines if SPEAKER_RE.match(line)) >= 2:
+        return lines
+    return [s for s in SENTENCE_RE.split(text) if s.strip()]
+
+
+def split_transcript(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> list:
+    """Agrupa turnos o frases consecutivos en trozos de como mucho max_tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+
+    for unit in _units(text):
+        # Una frase más larga que el presupuesto se corta a lo bruto
+        pieces = [unit[i:i + max_chars] for i in range(0, len(unit), max_chars)]
+        for piece in pieces:
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _reduce_input(partials: list) -> str:
+    return "\n\n".join(f"### Parte {i}\n{p}" for i, p in enumerate(partials, 1))
+
+
+def map_reduce_summarize(run, text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS,
+                         max_workers: int = SUMMARY_MAP_WORKERS, final_run=None):
+    """
+    Resume `text` con `run(prompt) -> str` (normalmente agent.run).
+    Si el texto cabe en max_tokens se hace una sola llamada.
+    `final_run` sustituye a `run` en la llamada que produce el resultado
+    (p. ej. para devolverlo en streaming); los mapeos siempre usan `run`.
+    """
+    final_run = final_run or run
+    if estimate_tokens(text) <= max_tokens:
+        return final_run(text)
+
+    chunks = split_transcript(text, max_tokens)
+    logger.info(f"[MAP REDUCE] Texto de ~{estimate_tokens(text)} tokens dividido en {len(chunks)} fragmentos")
+
+    prompts = [MAP_PROMPT.format(index=i, total=len(chunks), text=c) for i, c in enumerate(chunks, 1)]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))),
+                            thread_name_prefix="summary-map") as pool:
+        partials = list(pool.map(run, prompts))
+
+    combined = _reduce_input(partials)
+    if estimate_tokens(combined) > max_tokens:
+        # Los parciales siguen sin caber: otro nivel de map-reduce sobre ellos
+        return map_reduce_summarize(run, combined, max_tokens, max_workers, final_run)
+    return final_run(REDUCE_PROMPT.format(text=combined))
+
+
+async def map_reduce_summarize_async(run, text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS,
+                                     max_workers: int = SUMMARY_MAP_WORKERS, final_run=None):
+    """Versión asíncrona: `run` y `final_run` son corrutinas (normalmente agent.run_async)."""
+    final_run = final_run or run
+    if estimate_tokens(text) <= max_tokens:
+        return await final_run(text)
+
+    chunks = split_transcript(text, max_tokens)
+    logger.info(f"[MAP REDUCE] Texto de ~{estimate_tokens(text)} tokens dividido en {len(chunks)} fragmentos")
+
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run_map(prompt):
+        async with semaphore:
+            return await run(prompt)
+
+    partials = await asyncio.gather(*(
+        run_map(MAP_PROMPT.format(index=i, total=len(chunks), text=c)) for i, c in enumerate(chunks, 1)
+    ))
+
+    combined = _reduce_input(list(partials))
+    if estimate_tokens(combined) > max_tokens:
+        return await map_reduce_summarize_async(run, combined, max_tokens, max_workers, final_run)
+    return await final_run(REDUCE_PROMPT.format(text=combined))
@@ -0,0 +1,496 @@
+# transcriber_app/modules/ai/rate_limiter.py
+"""
+Control de cuotas de los proveedores (Groq, Gemini).
+
+Cada proveedor y modelo tiene un ProviderGovernor con:
+
+- Token buckets por dimensión de la cuota: peticiones/minuto, tokens/minuto
+  y segundos de audio/hora. Una llamada espera a que haya saldo en todas
+  las dimensiones en lugar de fallar con 429.
+- Concurrencia adaptativa AIMD: el número de llamadas simultáneas sube en
+  uno por cada "ventana" de éxitos y se reduce a la mitad con cada 429.
+  Tras un 429 con Retry-After nadie vuelve a llamar hasta que pasa ese tiempo.
+
+El saldo de los buckets y el bloqueo por Retry-After viven en un
+BucketStore: en memoria (un proceso) o SQLite (compartido entre workers,
+como el JOB_STORE). La concurrencia adaptativa es siempre por proceso.
+"""
+import asyncio
+import email.utils
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from transcriber_app.config import (
+    RATE_LIMITS_ENABLED,
+    RATE_LIMIT_STORE,
+    RATE_LIMIT_STORE_PATH,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_MAX_CONCURRENCY,
+    PROVIDER_LIMITS,
+)
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import PROVIDER_THROTTLED
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+# Periodo de cada unidad de cuota, en segundos
+PERIODS = {"requests_per_minute": 60, "tokens_per_minute": 60, "audio_seconds_per_hour": 3600}
+# Coste de una llamada por dimensión
+COST_DIMENSIONS = {"requests_per_minute": "requests", "tokens_per_minute": "tokens",
+                   "audio_seconds_per_hour": "audio_seconds"}
+# Espera tras un 429 sin Retry-After (se duplica en cada reintento)
+DEFAULT_THROTTLE_DELAY = 1.0
+POLL_SECONDS = 0.05
+
+
+class RateLimitTimeout(RuntimeError):
+    """La cuota no permite la llamada dentro de RATE_LIMIT_MAX_WAIT."""
+
+
+# --- Almacenes del saldo ---
+class MemoryBucketStore:
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._blocked = {}  # key -> blocked_until
+        self._lock = threading.Lock()
+
+    def take(self, key: str, amount: float, rate: float, capacity: float) -> float:
+        """Descuenta amount si hay saldo; si no, devuelve los segundos que faltan."""
+        return self.take_all([(key, amount, rate, capacity)])
+
+    def take_all(self, entries: list) -> float:
+        """
+        entries: [(key, amount, rate, capacity)]. Descuenta de todos los buckets
+        solo si todos tienen saldo; si no, no toca ninguno y devuelve la mayor espera.
+        """
+        now = time.time()
+        with self._lock:
+            levels = []
+            for key, _, rate, capacity in entries:
+                tokens, updated_at = self._buckets.get(key, (capacity, now))
+                levels.append(min(capacity, tokens + (now - updated_at) * rate))
+            wait = _missing_time_all(entries, levels)
+            for (key, amount, _, _), tokens in zip(entries, levels):
+                self._buckets[key] = (tokens - amount if wait == 0 else tokens, now)
+            return wait
+
+    def block(self, key: str, until: float):
+        with self._lock:
+            self._blocked[key] = max(until, self._blocked.get(key, 0.0))
+
+    def blocked_until(self, key: str) -> float:
+        with self._lock:
+            return self._blocked.get(key, 0.0)
+
+
+class SQLiteBucketStore:
+    """Saldo compartido entre procesos que usan el mismo fichero (modo WAL)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            blocked_until REAL NOT NULL DEFAULT 0
+        );
+    """
+
+    def __init__(self, path: str = None):
+        self.path = str(RATE_LIMIT_STORE_PATH if path is None else path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        logger.info(f"[RATE LIMITER] SQLite inicializado en: {self.path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, amount: float, rate: float, capacity: float) -> float:
+        return self.take_all([(key, amount, rate, capacity)])
+
+    def take_all(self, entries: list) -> float:
+        """Como MemoryBucketStore.take_all, en una sola transacción."""
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE: leer y descontar sin que otro worker se cuele en medio
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, _, rate, capacity in entries:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                levels.append(min(capacity, tokens + (now - updated_at) * rate))
+            wait = _missing_time_all(entries, levels)
+            for (key, amount, _, _), tokens in zip(entries, levels):
+                conn.execute(
+                    "INSERT INTO rate_limits (key, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens - amount if wait == 0 else tokens, now)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def block(self, key: str, until: float):
+        self._conn().execute(
+            "INSERT INTO rate_limits (key, tokens, updated_at, blocked_until) VALUES (?, 0, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)",
+            (key, time.time(), until)
+        )
+
+    def blocked_until(self, key: str) -> float:
+        row = self._conn().execute("SELECT blocked_until FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+
+
+def _missing_time(tokens: float, amount: float, rate: float, capacity: float) -> float:
+    # Una llamada mayor que el bucket entero se deja pasar con el bucket lleno
+    amount = min(amount, capacity)
+    if tokens >= amount:
+        return 0.0
+    return (amount - tokens) / rate
+
+
+def _missing_time_all(entries: list, levels: list) -> float:
+    return max((_missing_time(tokens, amount, rate, capacity)
+                for (_, amount, rate, capacity), tokens in zip(entries, levels)), default=0.0)
+
+
+def create_bucket_store(backend: str = None):
+    backend = (backend or RATE_LIMIT_STORE).lower()
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sqlite":
+        return SQLiteBucketStore()
+    raise ValueError(f"Almacén de cuotas desconocido: {backend}")
+
+
+# --- Concurrencia adaptativa ---
+class AdaptiveConcurrency:
+    """Límite de llamadas simultáneas con incremento aditivo y reducción multiplicativa."""
+
+    def __init__(self, initial: float = None, minimum: float = 1, maximum: float = None):
+        self.maximum = RATE_LIMIT_MAX_CONCURRENCY if maximum is None else maximum
+        self.minimum = minimum
+        # Se empieza a media capacidad y se sube con los éxitos
+        self.limit = float(max(minimum, self.maximum / 2) if initial is None else min(initial, self.maximum))
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.inflight >= max(self.minimum, int(self.limit)):
+                return False
+            self.inflight += 1
+            return True
+
+    def cancel(self):
+        """Devuelve una plaza que no llegó a usarse (sin contar éxito ni 429)."""
+        with self._lock:
+            self.inflight -= 1
+
+    def release(self, throttled: bool = False):
+        with self._lock:
+            self.inflight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                # +1 por cada `limit` éxitos
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+# --- Detección de 429 ---
+def throttle_delay(outcome) -> float:
+    """
+    Si outcome (respuesta o excepción) es un 429, devuelve la espera pedida
+    en Retry-After (0 si no la indica); si no, None.
+    """
+    response = outcome if hasattr(outcome, "status_code") else getattr(outcome, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # Excepciones de google.api_core (ResourceExhausted) llevan code == 429
+        status = getattr(outcome, "code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    return _parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+
+
+def _parse_retry_after(value) -> float:
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time())
+
+
+# --- Gobernador ---
+class ProviderGovernor:
+    def __init__(self, key: str, limits: dict, store=None, concurrency: AdaptiveConcurrency = None,
+                 max_wait: float = None, max_retries: int = None):
+        """limits: {"requests_per_minute": 20, "audio_seconds_per_hour": 7200, ...} (0 = sin límite)."""
+        self.key = key
+        self.provider = key.split(":", 1)[0]
+        self.buckets = {
+            COST_DIMENSIONS[name]: (value / PERIODS[name], float(value))
+            for name, value in limits.items() if value
+        }
+        self.store = store or MemoryBucketStore()
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self.max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.max_retries = RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+
+    def _try_acquire(self, cost: dict) -> float:
+        """0 si la llamada puede salir ya (y queda reservada); si no, segundos a esperar."""
+        blocked = self.store.blocked_until(self.key) - time.time()
+        if blocked > 0:
+            return blocked
+
+        # Primero la plaza: quien espera turno no gasta saldo de los buckets
+        if not self.concurrency.try_acquire():
+            return POLL_SECONDS
+
+        entries = []
+        for dimension, (rate, capacity) in self.buckets.items():
+            amount = cost.get(dimension, 1 if dimension == "requests" else 0)
+            if amount > 0:
+                entries.append((f"{self.key}:{dimension}", amount, rate, capacity))
+        # Todas las dimensiones o ninguna: si falta saldo en una, no se descuenta de las demás
+        wait = self.store.take_all(entries) if entries else 0.0
+        if wait > 0:
+            self.concurrency.cancel()
+        return wait
+
+    def saturated(self) -> bool:
+        """True si una llamada ahora tendría que esperar: 429 reciente o sin plazas libres."""
+        if self.store.blocked_until(self.key) > time.time():
+            return True
+        return self.concurrency.inflight >= max(self.concurrency.minimum, int(self.concurrency.limit))
+
+    def acquire(self, cost: dict):
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_acquire(cost)
+            if wait == 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"Cuota de {self.key} agotada: habría que esperar {wait:.0f}s")
+            time.sleep(min(wait, 1.0))
+
+    async def acquire_async(self, cost: dict):
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, cost)
+            if wait == 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"Cuota de {self.key} agotada: habría que esperar {wait:.0f}s")
+            await asyncio.sleep(min(wait, 1.0))
+
+    def _release(self, delay, attempt: int) -> bool:
+        """Libera la plaza; devuelve True si la llamada fue un 429 que hay que reintentar."""
+        throttled = delay is not None
+        self.concurrency.release(throttled=throttled)
+        if not throttled:
+            return False
+
+        PROVIDER_THROTTLED.inc(provider=self.provider)
+        delay = delay or DEFAULT_THROTTLE_DELAY * 2 ** attempt
+        self.store.block(self.key, time.time() + delay)
+        logger.warning(
+            f"[RATE LIMITER] 429 de {self.key}: pausa de {delay:.1f}s, "
+            f"concurrencia {self.concurrency.limit:.1f} (intento {attempt + 1})"
+        )
+        return attempt < self.max_retries
+
+    def call(self, fn, cost: dict = None, stream: bool = False):
+        """
+        Ejecuta fn() dentro de la cuota; los 429 se reintentan tras la espera indicada.
+        stream=True: fn devuelve un iterable que se sigue leyendo del proveedor;
+        la plaza se mantiene hasta agotarlo o cerrarlo.
+        """
+        cost = cost or {}
+        for attempt in range(self.max_retries + 1):
+            self.acquire(cost)
+            try:
+                result = fn()
+            except Exception as e:
+                if self._release(throttle_delay(e), attempt):
+                    continue
+                raise
+            delay = throttle_delay(result)
+            if stream and delay is None:
+                return HeldStream(self, result)
+            if self._release(delay, attempt):
+                continue
+            return result
+
+    async def call_async(self, fn, cost: dict = None, stream: bool = False):
+        """Como call, con fn una función que devuelve un awaitable (un iterable asíncrono si stream=True)."""
+        cost = cost or {}
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(cost)
+            try:
+                result = await fn()
+            except Exception as e:
+                if self._release(throttle_delay(e), attempt):
+                    continue
+                raise
+            delay = throttle_delay(result)
+            if stream and delay is None:
+                return HeldAsyncStream(self, result)
+            if self._release(delay, attempt):
+                continue
+            return result
+
+
+class HeldStream:
+    """Iterador que conserva la plaza del gobernador hasta que el stream se agota, falla o se cierra."""
+
+    def __init__(self, governor: ProviderGovernor, stream):
+        self._governor = governor
+        self._stream = stream
+        self._iterator = None
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._released:
+            raise StopIteration
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._stream)
+            return next(self._iterator)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception as e:
+            self.close(throttle_delay(e))
+            raise
+
+    def close(self, delay=None):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        # A mitad de stream no se puede reintentar: un 429 solo pausa y reduce la concurrencia
+        self._governor._release(delay, self._governor.max_retries)
+
+    def __del__(self):
+        self.close()
+
+
+class HeldAsyncStream(HeldStream):
+    """HeldStream para iterables asíncronos."""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._released:
+            raise StopAsyncIteration
+        try:
+            if self._iterator is None:
+                self._iterator = self._stream.__aiter__()
+            return await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self.close()
+            raise
+        except Exception as e:
+            self.close(throttle_delay(e))
+            raise
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+_store = None
+
+
+def _shared_store():
+    global _store
+    with _governors_lock:
+        if _store is None:
+            _store = create_bucket_store()
+        return _store
+
+
+def get_governor(provider: str, model: str = None):
+    """Gobernador compartido del proveedor y modelo; None si RATE_LIMITS_ENABLED=false."""
+    if not RATE_LIMITS_ENABLED:
+        return None
+    key = f"{provider}:{model}" if model else provider
+    store = _shared_store()
+    with _governors_lock:
+        if key not in _governors:
+            _governors[key] = ProviderGovernor(key, PROVIDER_LIMITS.get(provider, {}), store)
+        return _governors[key]
+
+
+def provider_saturated(provider: str) -> bool:
+    """True si algún modelo de provider tiene las llamadas en espera (ver ProviderGovernor.saturated)."""
+    with _governors_lock:
+        governors = [g for g in _governors.values() if g.provider == provider]
+    return any(governor.saturated() for governor in governors)
+
+
+def try_take_budget(name: str, per_minute: float) -> bool:
+    """
+    Gasta una unidad del presupuesto propio name (p. ej. las vistas previas en
+    vivo) sin esperar; False si está agotado. per_minute=0 no pone límite.
+    Se guarda en el mismo almacén que las cuotas, así que con RATE_LIMIT_STORE=sqlite
+    lo comparten todos los workers.
+    """
+    if per_minute <= 0:
+        return True
+    return _shared_store().take(f"budget:{name}", 1, per_minute / 60, per_minute) == 0
+
+
+def governed_call(provider: str, model: str, fn, stream: bool = False, **cost):
+    """stream=True si fn devuelve un iterable que sigue leyendo del proveedor (ver ProviderGovernor.call)."""
+    governor = get_governor(provider, model)
+    if governor is not None:
+        return governor.call(fn, cost, stream=stream)
+    try:
+        result = fn()
+    except Exception as e:
+        _count_throttle(provider, e)
+        raise
+    _count_throttle(provider, result)
+    return result
+
+
+async def governed_call_async(provider: str, model: str, fn, stream: bool = False, **cost):
+    governor = get_governor(provider, model)
+    if governor is not None:
+        return await governor.call_async(fn, cost, stream=stream)
+    try:
+        result = await fn()
+    except Exception as e:
+        _count_throttle(provider, e)
+        raise
+    _count_throttle(provider, result)
+    return result
+
+
+def _count_throttle(provider: str, outcome):
+    # Sin gobernador los 429 no se reintentan aquí, pero se siguen contando
+    if throttle_delay(outcome) is not None:
+        PROVIDER_THROTTLED.inc(provider=provider)
@@ -0,0 +1,65 @@
+# transcriber_app/modules/ai/registry.py
+"""
+Registro perezoso de modelos, transcriptores y agentes.
+
+Se declara con fábricas ({nombre: función sin argumentos}) y cada entrada
+se construye la primera vez que se pide. Así importar AIManager no carga
+los SDK (google.generativeai tarda casi un segundo) ni lee los prompts:
+el CLI, los tests y el arranque de cada worker solo pagan lo que usan.
+"""
+import threading
+from collections.abc import MutableMapping
+
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+
+class LazyRegistry(MutableMapping):
+    def __init__(self, factories: dict = None):
+        self._factories = dict(factories or {})
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories[name]  # KeyError si no existe, como un dict
+                logger.debug("[REGISTRY] Construyendo %s", name)
+                self._instances[name] = factory()
+            return self._instances[name]
+
+    def __setitem__(self, name, instance):
+        """Registra una instancia ya construida (sustituye a la fábrica)."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def __delitem__(self, name):
+        with self._lock:
+            found = self._instances.pop(name, None) is not None
+            found = self._factories.pop(name, None) is not None or found
+        if not found:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._instances or name in self._factories
+
+    def __iter__(self):
+        return iter(dict.fromkeys([*self._factories, *self._instances]))
+
+    def __len__(self):
+        return len(set(self._factories) | set(self._instances))
+
+    def register(self, name, factory):
+        """Añade una fábrica; la instancia se construye al pedirla."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def loaded(self) -> list:
+        """Nombres ya construidos."""
+        return list(self._instances)
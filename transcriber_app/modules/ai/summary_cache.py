@@ -0,0 +1,170 @@
+# transcriber_app/modules/ai/summary_cache.py
+"""
+Caché de resúmenes para AIManager.summarize.
+
+La clave combina el hash del texto, el modo, el modelo y la "versión" del
+agente (hash de su system prompt y su configuración de generación). Si se
+edita un prompts/*.md, el agente cargado con el nuevo prompt produce otra
+clave y las entradas antiguas dejan de usarse sin invalidarlas a mano.
+
+Backends:
+- MemoryLRUBackend: LRU en memoria del proceso.
+- SQLiteBackend: persistente y compartido entre workers.
+- Ambos encadenados ("tiered"): primero memoria, luego SQLite.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from transcriber_app.config import SUMMARY_CACHE_BACKEND, SUMMARY_CACHE_PATH, SUMMARY_CACHE_MAX_ENTRIES
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import record_cache_lookup
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def agent_version(agent) -> str:
+    """Hash del prompt y la configuración de un agente."""
+    config = getattr(agent, "generation_config", {})
+    raw = "\n".join([
+        getattr(agent, "system_prompt", ""),
+        getattr(agent, "model_name", ""),
+        json.dumps(config, sort_keys=True, default=str),
+    ])
+    return _sha256(raw)
+
+
+def make_key(text: str, mode: str, model_name: str, version: str) -> str:
+    return _sha256("\x1f".join([_sha256(text), mode, model_name, version]))
+
+
+class MemoryLRUBackend:
+    def __init__(self, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class SQLiteBackend:
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES * 20):
+        self.path = str(path)
+        self.max_entries = max_entries
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key: str, value: str):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO summaries (key, value, last_used) VALUES (?, ?, ?)",
+            (key, value, time.time())
+        )
+        # Expulsar las entradas menos usadas por encima del máximo
+        conn.execute(
+            "DELETE FROM summaries WHERE key IN ("
+            "SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+
+class SummaryCache:
+    """Encadena backends (del más rápido al más lento) y cuenta aciertos y fallos."""
+
+    def __init__(self, backends: list):
+        self.backends = backends
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        for i, backend in enumerate(self.backends):
+            value = backend.get(key)
+            if value is not None:
+                # Promocionar a los niveles más rápidos
+                for upper in self.backends[:i]:
+                    upper.set(key, value)
+                with self._lock:
+                    self.hits += 1
+                record_cache_lookup("summary", hit=True)
+                return value
+        with self._lock:
+            self.misses += 1
+        record_cache_lookup("summary", hit=False)
+        return None
+
+    def set(self, key: str, value: str):
+        for backend in self.backends:
+            backend.set(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Caché compartida del proceso según SUMMARY_CACHE ('tiered', 'memory', 'sqlite' o 'none')."""
+    backend = SUMMARY_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return SummaryCache([MemoryLRUBackend()])
+    if backend == "sqlite":
+        return SummaryCache([SQLiteBackend()])
+    if backend == "tiered":
+        return SummaryCache([MemoryLRUBackend(), SQLiteBackend()])
+    raise ValueError(f"Backend de caché de resúmenes desconocido: {backend}")
@@ -0,0 +1,204 @@
+# transcriber_app/modules/ai/transcriber_router.py
+"""
+Transcriptor que reparte el trabajo entre varios motores (Groq, Whisper local...).
+
+- Elección: para cada audio se estima cuánto tardaría cada motor a partir
+  de su factor de tiempo real reciente (segundos de proceso por segundo de
+  audio), la duración del audio, los trabajos que ya tiene en curso y su
+  tasa de errores reciente.
+- Hedging: si el motor elegido supera el percentil ROUTER_HEDGE_PERCENTILE
+  de sus latencias recientes, se lanza la misma petición en el siguiente
+  motor y gana la primera respuesta válida.
+- Failover: ante 429, 5xx o errores de red se pasa al siguiente motor. Un
+  4xx distinto de 429 (audio inválido) se propaga sin reintentar.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import httpx
+import requests
+
+from transcriber_app.config import (
+    ROUTER_BACKENDS,
+    ROUTER_HEDGE_PERCENTILE,
+    ROUTER_HEDGE_MIN_SECONDS,
+    ROUTER_STATS_WINDOW,
+)
+from transcriber_app.modules.ai.base.transcriber_interface import TranscriberInterface
+from transcriber_app.modules.audio_chunker import probe_duration
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+# Factor de tiempo real supuesto mientras un motor no tiene historial
+DEFAULT_RTF = {"groq": 0.05, "local": 0.5}
+# Duración supuesta si ffprobe no sabe leer el audio
+DEFAULT_DURATION = 60.0
+# Cuánto penaliza la tasa de errores la estimación de un motor
+ERROR_PENALTY = 4.0
+
+
+def is_retryable(error: Exception) -> bool:
+    """429, 5xx y errores de red merecen otro motor; el resto de 4xx no."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)) and status is not None:
+        return status == 429 or status >= 500
+    return True
+
+
+class BackendStats:
+    """Latencias, errores y trabajos en curso recientes de un motor."""
+
+    def __init__(self, prior_rtf: float = 0.1, window: int = None):
+        window = ROUTER_STATS_WINDOW if window is None else window
+        self.prior_rtf = prior_rtf
+        self.rtfs = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True = éxito
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.inflight += 1
+
+    def finish(self, elapsed: float, duration: float, ok: bool):
+        with self._lock:
+            self.inflight -= 1
+            self.outcomes.append(ok)
+            if ok and duration:
+                self.rtfs.append(elapsed / duration)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def rtf(self, percentile: float = 0.5) -> float:
+        with self._lock:
+            values = sorted(self.rtfs)
+        if not values:
+            return self.prior_rtf
+        return values[min(len(values) - 1, int(percentile * len(values)))]
+
+    def estimate(self, duration: float) -> float:
+        """Segundos estimados hasta tener el resultado."""
+        base = self.rtf() * duration * (1 + self.inflight)
+        return base * (1 + ERROR_PENALTY * self.error_rate)
+
+
+class RoutingTranscriber(TranscriberInterface):
+    ENGINE = "router"
+
+    def __init__(self, transcribers: dict, backends: list = None, hedge_percentile: float = None,
+                 hedge_min_seconds: float = None):
+        """
+        transcribers: {nombre: transcriptor}; backends: nombres a usar, en
+        orden de preferencia ante empate (por defecto ROUTER_BACKENDS).
+        """
+        self.transcribers = transcribers
+        self.backends = list(backends or ROUTER_BACKENDS)
+        self.hedge_percentile = ROUTER_HEDGE_PERCENTILE if hedge_percentile is None else hedge_percentile
+        self.hedge_min_seconds = ROUTER_HEDGE_MIN_SECONDS if hedge_min_seconds is None else hedge_min_seconds
+        self.stats = {name: BackendStats(DEFAULT_RTF.get(name, 0.1)) for name in self.backends}
+        self._executor = ThreadPoolExecutor(max_workers=2 * max(1, len(self.backends)),
+                                            thread_name_prefix="router")
+
+    @property
+    def engine_id(self) -> str:
+        # Cualquiera de los motores puede dar el resultado
+        return "router:" + "+".join(getattr(self.transcribers[name], "engine_id", name)
+                                    for name in self.backends if name in self.transcribers)
+
+    def transcribe(self, audio_path: str):
+        duration = self._duration(audio_path)
+        (text, metadata), name, hedged = self._route(duration, "transcribe", audio_path)
+        if not isinstance(metadata, dict):
+            metadata = {}
+        return text, {**metadata, "backend": name, "hedged": hedged}
+
+    def transcribe_range(self, audio_path: str, start: float = None, duration: float = None) -> str:
+        length = duration if duration is not None else DEFAULT_DURATION
+        text, _, _ = self._route(length, "transcribe_range", audio_path, start, duration)
+        return text
+
+    def ranked_backends(self, duration: float) -> list:
+        """Motores disponibles ordenados por tiempo estimado."""
+        names = [name for name in self.backends if name in self.transcribers]
+        return sorted(names, key=lambda name: self.stats[name].estimate(duration))
+
+    def _duration(self, audio_path: str) -> float:
+        try:
+            return probe_duration(audio_path)
+        except Exception as e:
+            logger.warning(f"[TRANSCRIBER ROUTER] No se pudo obtener la duración de {audio_path}: {e}")
+            return DEFAULT_DURATION
+
+    def _hedge_after(self, name: str, duration: float) -> float:
+        return max(self.hedge_min_seconds, self.stats[name].rtf(self.hedge_percentile) * duration)
+
+    def _route(self, duration: float, method: str, *args):
+        """
+        Devuelve (resultado, motor, hedged). Las peticiones que pierden el
+        hedging siguen en su hilo hasta acabar y cuentan en las estadísticas.
+        """
+        candidates = self.ranked_backends(duration)
+        if not candidates:
+            raise RuntimeError("No hay motores de transcripción configurados")
+
+        primary = candidates.pop(0)
+        pending = {self._submit(primary, duration, method, *args): primary}
+        hedged = False
+        last_error = None
+
+        while pending:
+            timeout = self._hedge_after(primary, duration) if candidates and not hedged else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # El motor va lento: lanzar la misma petición en el siguiente
+                backup = candidates.pop(0)
+                logger.info(f"[TRANSCRIBER ROUTER] {primary} supera {timeout:.0f}s; hedging con {backup}")
+                pending[self._submit(backup, duration, method, *args)] = backup
+                hedged = True
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    logger.warning(f"[TRANSCRIBER ROUTER] {name} falló ({e}); probando otro motor")
+                    if not pending and candidates:
+                        primary = candidates.pop(0)
+                        pending[self._submit(primary, duration, method, *args)] = primary
+                    continue
+
+                logger.info(f"[TRANSCRIBER ROUTER] Transcripción servida por {name}")
+                return result, name, hedged
+
+        raise last_error
+
+    def _submit(self, name: str, duration: float, method: str, *args):
+        # Copiar el contexto para que report_progress llegue al listener del job
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, self._call, name, duration, method, *args)
+
+    def _call(self, name: str, duration: float, method: str, *args):
+        stats = self.stats[name]
+        stats.start()
+        start = time.time()
+        try:
+            result = getattr(self.transcribers[name], method)(*args)
+        except Exception:
+            stats.finish(time.time() - start, duration, ok=False)
+            raise
+        stats.finish(time.time() - start, duration, ok=True)
+        return result
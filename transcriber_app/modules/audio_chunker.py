@@ -0,0 +1,154 @@
+# transcriber_app/modules/audio_chunker.py
+"""
+Utilidades para trocear audios largos y recomponer sus transcripciones.
+
+- plan_chunks: decide los cortes (en silencios si es posible, si no en
+  ventanas fijas con solape).
+- stitch_texts: une los textos de cada trozo en orden quitando las palabras
+  repetidas por el solape.
+"""
+import asyncio
+import json
+import re
+import subprocess
+from difflib import SequenceMatcher
+
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+SILENCE_RE = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+
+
+def _probe_command(path: str) -> list:
+    return ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", path]
+
+
+def _silence_command(path: str, noise_db: int, min_silence: float) -> list:
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-i", path,
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-"
+    ]
+
+
+def _parse_silences(stderr: str) -> list:
+    silences = []
+    start = None
+    for kind, value in SILENCE_RE.findall(stderr):
+        if kind == "start":
+            start = float(value)
+        elif start is not None:
+            silences.append((max(start, 0.0), float(value)))
+            start = None
+    return silences
+
+
+def probe_duration(path: str) -> float:
+    """Devuelve la duración en segundos usando ffprobe."""
+    result = subprocess.run(_probe_command(path), capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    return float(info["format"]["duration"])
+
+
+def detect_silences(path: str, noise_db: int = -35, min_silence: float = 0.5) -> list:
+    """Devuelve una lista de (inicio, fin) de los silencios detectados por ffmpeg."""
+    result = subprocess.run(_silence_command(path, noise_db, min_silence), capture_output=True, text=True, check=True)
+    return _parse_silences(result.stderr)
+
+
+async def _run_async(cmd: list) -> tuple:
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr)
+    return stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
+
+
+async def probe_duration_async(path: str) -> float:
+    """Versión asíncrona de probe_duration (no bloquea el event loop)."""
+    stdout, _ = await _run_async(_probe_command(path))
+    return float(json.loads(stdout)["format"]["duration"])
+
+
+async def detect_silences_async(path: str, noise_db: int = -35, min_silence: float = 0.5) -> list:
+    """Versión asíncrona de detect_silences."""
+    _, stderr = await _run_async(_silence_command(path, noise_db, min_silence))
+    return _parse_silences(stderr)
+
+
+def plan_chunks(duration: float, window: float, overlap: float, silences: list = None,
+                search: float = None) -> list:
+    """
+    Planifica los trozos como tuplas (inicio, fin, solapa_con_anterior).
+
+    Si hay un silencio en los últimos `search` segundos de la ventana se corta
+    en mitad del silencio y el siguiente trozo empieza ahí, sin solape.
+    Si no, se corta en el límite de la ventana y el siguiente trozo empieza
+    `overlap` segundos antes para no perder palabras partidas.
+    """
+    if window <= 0 or duration <= window:
+        return [(0.0, duration, False)]
+
+    search = window * 0.2 if search is None else search
+    chunks = []
+    start = 0.0
+    overlapped = False
+
+    while start < duration:
+        target = start + window
+        if target >= duration:
+            chunks.append((start, duration, overlapped))
+            break
+
+        cut = None
+        for s_start, s_end in silences or []:
+            middle = (s_start + s_end) / 2
+            if target - search <= middle <= target and middle > start:
+                cut = middle  # nos quedamos con el último silencio de la zona
+
+        if cut is not None:
+            chunks.append((start, cut, overlapped))
+            start, overlapped = cut, False
+        else:
+            chunks.append((start, target, overlapped))
+            start, overlapped = target - overlap, True
+
+    return chunks
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def stitch_texts(texts: list, overlapped: list = None, max_overlap_words: int = 40, min_match_words: int = 2) -> str:
+    """
+    Une los textos de los trozos en orden.
+    Para los trozos que solapan con el anterior se busca la secuencia de
+    palabras común más larga entre el final del texto acumulado y el principio
+    del trozo, y se descarta la parte repetida.
+    """
+    overlapped = overlapped or [True] * len(texts)
+    words = []
+
+    for text, has_overlap in zip(texts, overlapped):
+        new_words = text.split()
+        if not new_words:
+            continue
+
+        if words and has_overlap:
+            tail = words[-max_overlap_words:]
+            head = new_words[:max_overlap_words]
+            matcher = SequenceMatcher(
+                None, [_normalize(w) for w in tail], [_normalize(w) for w in head], autojunk=False
+            )
+            a, b, size = matcher.find_longest_match(0, len(tail), 0, len(head))
+            if size >= min_match_words:
+                # Cortamos el acumulado al final de la coincidencia y seguimos desde ahí
+                words = words[:len(words) - len(tail) + a + size]
+                new_words = new_words[b + size:]
+
+        words.extend(new_words)
+
+    return " ".join(words)
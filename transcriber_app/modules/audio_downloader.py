@@ -1,10 +1,25 @@
 # transcriber_app/modules/audio_downloader.py
+"""
+Descarga del audio de vídeos (YouTube, TikTok, Vimeo...) con yt-dlp.
+
+- download_audio(url): un vídeo. Los metadatos se extraen una sola vez y la
+  descarga parte de ellos (antes se extraían dos veces, con dos YoutubeDL).
+- download_many(urls): muchas URLs o playlists. probe_urls consulta los
+  metadatos de todas a la vez y expande las playlists a sus vídeos sin
+  resolverlos uno a uno; después se descargan en paralelo con un máximo de
+  DOWNLOAD_WORKERS. on_result recibe cada DownloadResult según termina, para
+  encolar su transcripción sin esperar al resto de la lista.
+"""
 import yt_dlp
 import os
 import re
 import uuid
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+from transcriber_app.config import DOWNLOAD_WORKERS
 from transcriber_app.modules.logging.logging_config import setup_logging
 from pathlib import Path
 import sys
@@ -38,9 +53,28 @@ def get_audio_duration(path: str) -> float:
     return float(info["format"]["duration"])
 
 
-def download_audio(url: str, output_dir: str = "./audios", max_duration: int = 9000) -> str:
+@dataclass
+class DownloadResult:
+    url: str
+    path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _check_duration(duration: float, max_duration: int):
+    if duration > max_duration:
+        raise ValueError(
+            f"❌ El audio dura {duration/60:.1f} min, supera el límite de {max_duration/60} min."
+        )
+
+
+def download_audio(url: str, output_dir: str = "./audios", max_duration: int = 9000, info: dict = None) -> str:
     """
     Descarga solo el audio de un vídeo y lo convierte a MP3.
+    info: metadatos ya extraídos (p. ej. por probe_urls) para no volver a pedirlos.
     Devuelve la ruta final del archivo.
     """
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -53,19 +87,6 @@ def download_audio(url: str, output_dir: str = "./audios", max_duration: int = 9
         logger.info(f"[AUDIO] Ya existe en caché: {final_path}")
         return final_path
 
-    # 1. Extraer metadata primero
-    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-        info = ydl.extract_info(url, download=False)
-        duration = info.get("duration")
-
-        if duration:
-            logger.info(f"[AUDIO] Duración detectada: {duration/60:.1f} min")
-            if duration > max_duration:
-                raise ValueError(
-                    f"❌ El audio dura {duration/60:.1f} min, supera el límite de {max_duration/60} min."
-                )
-
-    # 2. Descargar solo audio
     outtmpl = os.path.join(output_dir, f"{audio_id}.%(ext)s")
 
     ydl_opts = {
@@ -79,21 +100,30 @@ def download_audio(url: str, output_dir: str = "./audios", max_duration: int = 9
         }],
     }
 
-    logger.info(f"[AUDIO] Descargando audio desde: {url}")
+    # Un único YoutubeDL: extrae los metadatos (sin resolver formatos) y
+    # descarga a partir de ellos, sin repetir la extracción
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
+        # 1. Extraer metadata primero
+        if info is None:
+            info = ydl.extract_info(url, download=False, process=False)
+        if info.get("_type") in ("playlist", "multi_video"):
+            raise ValueError("❌ La URL es una playlist: usa download_many para descargar sus vídeos.")
+
+        duration = info.get("duration")
+        if duration:
+            logger.info(f"[AUDIO] Duración detectada: {duration/60:.1f} min")
+            _check_duration(duration, max_duration)
+
+        # 2. Descargar solo audio
+        logger.info(f"[AUDIO] Descargando audio desde: {url}")
+        ydl.process_ie_result(info, download=True)
 
     # 3. Si no había duración, comprobar ahora
     if duration is None:
         try:
             duration = get_audio_duration(final_path)
             logger.info(f"[AUDIO] Duración: {duration/60:.1f} min")
-
-            if duration > max_duration:
-                os.remove(final_path)
-                raise ValueError(
-                    f"❌ El audio dura {duration/60:.1f} min, supera el límite de {max_duration/60} min."
-                )
+            _check_duration(duration, max_duration)
 
         except Exception as e:
             logger.error(f"[AUDIO] No se pudo determinar la duración: {e}")
@@ -105,20 +135,116 @@ def download_audio(url: str, output_dir: str = "./audios", max_duration: int = 9
     return final_path
 
 
+def _probe(url: str, max_entries: int = None) -> list:
+    """[(url, info)] de una URL; una playlist se expande a sus vídeos (como mucho max_entries + 1)."""
+    # extract_flat: las entradas de una playlist se listan sin extraer cada vídeo
+    with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': 'in_playlist'}) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+
+    if info.get("_type") not in ("playlist", "multi_video"):
+        return [(url, info)]
+
+    entries = []
+    # Las entradas se generan bajo demanda: al pasar del límite no se piden más páginas
+    for entry in info.get("entries") or []:
+        entry_url = entry and (entry.get("webpage_url") or entry.get("url"))
+        if entry_url:
+            entries.append((entry_url, entry))
+        if max_entries is not None and len(entries) > max_entries:
+            logger.warning(f"[AUDIO] Playlist {info.get('title') or url}: más de {max_entries} vídeos")
+            return entries
+    logger.info(f"[AUDIO] Playlist {info.get('title') or url}: {len(entries)} vídeos")
+    return entries
+
+
+def probe_urls(urls: list, max_workers: int = None, max_entries: int = None) -> list:
+    """
+    Metadatos de muchas URLs en paralelo. Devuelve [(url, info)] en el orden
+    de entrada, con las playlists expandidas y sin duplicados. Una URL que no
+    se puede consultar queda con info=None (download_audio lo reintentará y
+    dará el error). Con max_entries, de cada playlist se listan como mucho
+    max_entries + 1 vídeos: basta para saber que se pasa del límite.
+    """
+    max_workers = DOWNLOAD_WORKERS if max_workers is None else max_workers
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return []
+
+    def probe(url):
+        try:
+            return _probe(url, max_entries)
+        except Exception as e:
+            logger.error(f"[AUDIO] No se pudieron obtener los metadatos de {url}: {e}")
+            return [(url, None)]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))), thread_name_prefix="probe") as pool:
+        probed = list(pool.map(probe, urls))
+
+    entries = {}
+    for url_entries in probed:
+        for url, info in url_entries:
+            entries.setdefault(url, info)
+    return list(entries.items())
+
+
+def download_entries(entries: list, output_dir: str = "./audios", max_duration: int = 9000,
+                     max_workers: int = None, on_result=None) -> list:
+    """
+    Descarga en paralelo [(url, info)] (la salida de probe_urls).
+    on_result(DownloadResult) se llama según termina cada descarga, con éxito o no.
+    Devuelve los DownloadResult en el orden de entrada.
+    """
+    max_workers = DOWNLOAD_WORKERS if max_workers is None else max_workers
+    results = [None] * len(entries)
+    if not entries:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(entries))), thread_name_prefix="download") as pool:
+        futures = {
+            pool.submit(download_audio, url, output_dir, max_duration, info): (i, url)
+            for i, (url, info) in enumerate(entries)
+        }
+        for future in as_completed(futures):
+            i, url = futures[future]
+            try:
+                result = DownloadResult(url, path=future.result())
+            except Exception as e:
+                logger.error(f"[AUDIO] Error descargando {url}: {e}")
+                result = DownloadResult(url, error=str(e))
+            results[i] = result
+            if on_result is not None:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    logger.error(f"[AUDIO] Error procesando la descarga de {url}: {e}")
+
+    ok = sum(1 for r in results if r.ok)
+    logger.info(f"[AUDIO] Descargas terminadas: {ok}/{len(results)} correctas")
+    return results
+
+
+def download_many(urls: list, output_dir: str = "./audios", max_duration: int = 9000,
+                  max_workers: int = None, on_result=None) -> list:
+    """probe_urls + download_entries: descarga muchas URLs y playlists en paralelo."""
+    entries = probe_urls(urls, max_workers)
+    return download_entries(entries, output_dir, max_duration, max_workers, on_result)
+
+
 # ============================
 #   EJECUCIÓN DIRECTA
 # ============================
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Uso: python audio_downloader.py <URL>")
+        print("Uso: python audio_downloader.py <URL> [<URL>...]")
         sys.exit(1)
 
-    url = sys.argv[1]
+    results = download_many(sys.argv[1:])
+    for result in results:
+        if result.ok:
+            print(f"✅ Audio descargado en: {result.path}")
+        else:
+            print(f"❌ Error en {result.url}: {result.error}")
 
-    try:
-        path = download_audio(url)
-        print(f"\n✅ Audio descargado en: {path}")
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
+    if not all(result.ok for result in results):
         sys.exit(1)
@@ -0,0 +1,105 @@
+# transcriber_app/modules/checkpoints.py
+"""
+Puntos de control por job: lo que ya se ha calculado se guarda en disco
+para que un reintento continúe desde la última etapa terminada.
+
+    checkpoints/<job_id>/
+        transcript.json      texto y metadata de la transcripción
+        chunks/<clave>.txt   texto de cada trozo del audio
+        summaries/<modo>.md  resumen de cada modo
+
+Igual que el progreso (ver progress.py), el checkpoint activo vive en una
+ContextVar: quien lanza el job abre checkpoint_scope() y el orquestador y
+los transcriptores lo consultan con current_checkpoint() sin recibirlo
+como parámetro. Sin checkpoint activo todo funciona como antes.
+"""
+import contextvars
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from transcriber_app.config import CHECKPOINT_DIR
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+_current = contextvars.ContextVar("job_checkpoint", default=None)
+_SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class JobCheckpoint:
+    def __init__(self, job_id: str, base_dir: str = None):
+        self.job_id = job_id
+        self.dir = Path(CHECKPOINT_DIR if base_dir is None else base_dir) / _SAFE_RE.sub("_", job_id)
+
+    def _write(self, relative: str, content: str):
+        path = self.dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _read(self, relative: str):
+        path = self.dir / relative
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    # --- Transcripción ---
+    def load_transcript(self):
+        """(texto, metadata) guardados o None."""
+        raw = self._read("transcript.json")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["text"], data["metadata"]
+
+    def save_transcript(self, text: str, metadata: dict):
+        self._write("transcript.json", json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False))
+
+    # --- Trozos de audio ---
+    def load_chunk(self, key: str):
+        return self._read(f"chunks/{_SAFE_RE.sub('_', key)}.txt")
+
+    def save_chunk(self, key: str, text: str):
+        self._write(f"chunks/{_SAFE_RE.sub('_', key)}.txt", text)
+
+    # --- Resúmenes ---
+    def load_summary(self, mode: str):
+        return self._read(f"summaries/{_SAFE_RE.sub('_', mode)}.md")
+
+    def save_summary(self, mode: str, summary: str):
+        self._write(f"summaries/{_SAFE_RE.sub('_', mode)}.md", summary)
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+@contextmanager
+def checkpoint_scope(checkpoint: JobCheckpoint):
+    """Activa checkpoint para el código ejecutado dentro del bloque."""
+    token = _current.set(checkpoint)
+    try:
+        yield checkpoint
+    finally:
+        _current.reset(token)
+
+
+def current_checkpoint():
+    return _current.get()
+
+
+def checkpointed_chunk(checkpoint, key: str, fn) -> str:
+    """Devuelve el texto guardado del trozo o lo calcula con fn() y lo guarda."""
+    if checkpoint is None:
+        return fn()
+    saved = checkpoint.load_chunk(key)
+    if saved is not None:
+        logger.info(f"[CHECKPOINT] Trozo {key} reutilizado del job {checkpoint.job_id}")
+        return saved
+    text = fn()
+    checkpoint.save_chunk(key, text)
+    return text
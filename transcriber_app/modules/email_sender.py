@@ -4,6 +4,7 @@ from pathlib import Path
 
 from .emails import RECIPIENTS
 from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import time_stage
 
 # Logging
 logger = setup_logging("transcribeapp")
@@ -22,12 +23,13 @@ class EmailSender:
         with open(path, "r", encoding="utf-8") as f:
             content = f.read()
 
-        for recipient in RECIPIENTS:
-            subprocess.run(
-                ["mail", "-s", subject, recipient],
-                input=content.encode("utf-8"),
-                check=True
-            )
+        with time_stage("email"):
+            for recipient in RECIPIENTS:
+                subprocess.run(
+                    ["mail", "-s", subject, recipient],
+                    input=content.encode("utf-8"),
+                    check=True
+                )
 
         logger.info(f"[EMAIL SENDER] Email enviado a: {', '.join(RECIPIENTS)}")
         return f"📨 Email enviado a: {', '.join(RECIPIENTS)}"
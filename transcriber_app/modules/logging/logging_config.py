@@ -1,37 +1,233 @@
 # transcriber_app/modules/logging/logging_config.py
+"""
+Logging del proyecto.
+
+Por defecto (LOG_ASYNC=true) los módulos solo dejan el registro en una cola
+en memoria (QueueHandler); un hilo aparte (QueueListener) lo formatea y lo
+escribe en consola y en logs/transcribeapp.log. Así el hilo de la petición
+no paga ni el formateo ni la escritura a disco.
+
+- LOG_LEVEL: nivel mínimo por defecto (INFO).
+- LOG_ROTATION=size: rotación por tamaño (LOG_MAX_BYTES, LOG_BACKUP_COUNT).
+  RotatingFileHandler no es seguro entre procesos, así que en un proceso
+  hijo (workers de uvicorn) cada uno escribe y rota su propio fichero,
+  logs/transcribeapp.<pid>.log. Al arrancar, cada worker borra los ficheros
+  de pids que ya no existen (reinicios y workers reciclados).
+- LOG_ROTATION=external: todos los procesos escriben en transcribeapp.log
+  con WatchedFileHandler, que lo reabre cuando una herramienta externa
+  (logrotate) lo rota.
+- LOG_FORMAT=json: una línea JSON por registro (para agregadores de logs).
+- LOG_DEBUG_SAMPLE_RATE: fracción de mensajes DEBUG que se conservan.
+- preview(obj): repr truncado que solo se calcula si el mensaje se escribe;
+  usar con el estilo perezoso de logging: logger.debug("x: %s", preview(obj)).
+
+La configuración se lee del entorno aquí y no de config.py, que a su vez
+usa este módulo.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import random
+import re
 import sys
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
 LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" o "json"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size")  # "size" o "external"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+# transcribeapp.<pid>.log y sus copias rotadas (.1, .2...)
+PID_LOG_RE = re.compile(r"^transcribeapp\.(\d+)\.log(\.\d+)?$")
+
+# Atributos estándar de LogRecord: lo demás son campos pasados con extra=
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_queue = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea con la hora, el nivel, el logger, el mensaje y los extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Deja pasar solo una fracción `rate` de los mensajes DEBUG; el resto de niveles, todos."""
 
-def setup_logging(name="transcribeapp", level=logging.DEBUG) -> logging.Logger:
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que encola el registro tal cual.
+    El QueueHandler estándar formatea el mensaje al encolar (en el hilo que
+    escribe el log); aquí se deja para el hilo del listener. La cola es en
+    memoria, así que no hace falta que el registro sea serializable; a
+    cambio, los argumentos se leen más tarde y no deben modificarse después
+    de loguearlos.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class preview:
+    """repr(obj) truncado a `limit` caracteres, calculado solo al formatear el mensaje."""
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj, limit: int = 200):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return repr(self.obj)[:self.limit]
+
+
+def _build_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        return JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S%z")
+    return logging.Formatter(
+        fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+def log_file_path(rotation: str = LOG_ROTATION) -> Path:
+    """
+    Fichero de log de este proceso.
+    Con rotación por tamaño, un proceso hijo usa transcribeapp.<pid>.log: si
+    varios workers rotasen el mismo fichero se perderían o mezclarían líneas.
+    """
+    if rotation == "size" and multiprocessing.parent_process() is not None:
+        purge_stale_logs()
+        return LOG_DIR / f"transcribeapp.{os.getpid()}.log"
+    return LOG_DIR / "transcribeapp.log"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # existe, pero es de otro usuario
+    return True
+
+
+def purge_stale_logs() -> int:
+    """Borra los ficheros por proceso de pids que ya no existen; devuelve cuántos."""
+    removed = 0
+    for path in LOG_DIR.glob("transcribeapp.*.log*"):
+        match = PID_LOG_RE.match(path.name)
+        if not match or _pid_alive(int(match.group(1))):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass  # otro worker lo borró a la vez
+    return removed
+
+
+def _build_file_handler(rotation: str, max_bytes: int, backup_count: int) -> logging.Handler:
+    if rotation == "external":
+        # La rotación la hace logrotate; el handler reabre el fichero al detectarlo
+        return logging.handlers.WatchedFileHandler(log_file_path(rotation), encoding="utf-8")
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            log_file_path(rotation), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    raise ValueError(f"LOG_ROTATION no válido: {rotation!r} (usa 'size' o 'external')")
+
+
+def _build_handlers(fmt: str, max_bytes: int, backup_count: int, rotation: str = LOG_ROTATION) -> list:
+    formatter = _build_formatter(fmt)
+
+    # Consola
+    sh = logging.StreamHandler(sys.stdout)
+    sh.setFormatter(formatter)
+
+    # Fichero en logs/
+    fh = _build_file_handler(rotation, max_bytes, backup_count)
+    fh.setFormatter(formatter)
+    return [sh, fh]
+
+
+def _shared_queue() -> queue.SimpleQueue:
+    """Cola común a todos los loggers y su listener, que se crea la primera vez."""
+    global _queue, _listener
+    if _queue is None:
+        _queue = queue.SimpleQueue()
+        handlers = _build_handlers(LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Vaciar la cola antes de que termine el proceso
+        atexit.register(stop_logging)
+    return _queue
+
+
+def stop_logging():
+    """Escribe lo pendiente y para el hilo del listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(name="transcribeapp", level=None) -> logging.Logger:
     """
     Configura el logging global del proyecto.
     - name: nombre del logger (por defecto 'transcribeapp').
-    - level: nivel mínimo de log (DEBUG, INFO, WARNING, ERROR, CRITICAL).
+    - level: nivel mínimo de log (DEBUG, INFO, WARNING, ERROR, CRITICAL);
+      por defecto, LOG_LEVEL.
     Devuelve un logger listo para usar.
     """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    logger.setLevel(LOG_LEVEL if level is None else level)
 
     if not logger.hasHandlers():
-        formatter = logging.Formatter(
-            fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-
-        # Consola
-        sh = logging.StreamHandler(sys.stdout)
-        sh.setFormatter(formatter)
-        logger.addHandler(sh)
+        if LOG_ASYNC:
+            handlers = [DeferredQueueHandler(_shared_queue())]
+        else:
+            handlers = _build_handlers(LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
 
-        # Fichero único transcribeapp.log
-        fh = logging.FileHandler(LOG_DIR / "transcribeapp.log", encoding="utf-8")
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        for handler in handlers:
+            # Descartar DEBUG antes de encolar o escribir nada
+            handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE_RATE))
+            logger.addHandler(handler)
 
     # 🔑 Clave: propagar al root para que todos los módulos se vean
     logger.propagate = True
@@ -0,0 +1,198 @@
+# transcriber_app/modules/metrics.py
+"""
+Métricas del pipeline en el formato de texto de Prometheus (GET /metrics).
+
+- transcriber_stage_seconds: histograma de la duración de cada etapa
+  (upload, ffmpeg, encode_upload, transcription, summarization, email).
+  encode_upload es ffmpeg en streaming junto con la subida que lee su salida.
+- transcriber_jobs_total: jobs terminados por estado (done, error, retried).
+- transcriber_stage_errors_total: etapas que terminaron con excepción.
+- transcriber_cache_lookups_total: aciertos y fallos de las cachés.
+- transcriber_provider_throttled_total: respuestas 429 de cada proveedor.
+- transcriber_queue_depth / transcriber_jobs_in_flight: estado del scheduler.
+
+Sin dependencias: solo hacen falta contadores e histogramas en memoria.
+Los valores son por proceso. Con varios workers de uvicorn todos comparten
+el puerto y cada scrape llega a uno cualquiera, así que los contadores
+saltarían entre los valores de unos y otros: para que /metrics sea fiable
+el despliegue debe correr un solo worker (UVICORN_WORKERS=1, como en k3s/).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites (segundos) de los buckets del histograma de etapas: de una
+# llamada rápida a Gemini a la transcripción de una reunión larga
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, no {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valor instantáneo; con set_function se lee en cada exposición."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._function = None
+
+    def set(self, value: float):
+        with self._lock:
+            self._values[()] = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            return self._function()
+        with self._lock:
+            return self._values.get((), 0)
+
+    def render(self) -> list:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+            f"{self.name} {_format_value(self.value())}",
+        ]
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = STAGE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0] * len(self.buckets), 0.0))
+            return counts[-1]
+
+    def _samples(self, key: tuple, value) -> list:
+        counts, total = value
+        lines = []
+        for bound, count in zip(self.buckets, counts):
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "transcriber_stage_seconds", "Duración de cada etapa del pipeline en segundos.", ("stage",)
+)
+STAGE_ERRORS = Counter(
+    "transcriber_stage_errors_total", "Etapas del pipeline que terminaron con error.", ("stage",)
+)
+JOBS = Counter("transcriber_jobs_total", "Jobs de audio terminados por estado.", ("status",))
+CACHE_LOOKUPS = Counter(
+    "transcriber_cache_lookups_total", "Consultas a las cachés por resultado (hit/miss).", ("cache", "result")
+)
+PROVIDER_THROTTLED = Counter(
+    "transcriber_provider_throttled_total", "Respuestas 429 recibidas de cada proveedor.", ("provider",)
+)
+QUEUE_DEPTH = Gauge("transcriber_queue_depth", "Jobs esperando en la cola del scheduler.")
+JOBS_IN_FLIGHT = Gauge("transcriber_jobs_in_flight", "Jobs ejecutándose en los workers.")
+
+REGISTRY = [STAGE_SECONDS, STAGE_ERRORS, JOBS, CACHE_LOOKUPS, PROVIDER_THROTTLED, QUEUE_DEPTH, JOBS_IN_FLIGHT]
+
+# Content-Type del formato de texto de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Mide la duración del bloque como etapa `stage`; si falla, cuenta también el error."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        observe_stage(stage, time.perf_counter() - start, ok=False)
+        raise
+    observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_stage(stage: str, seconds: float, ok: bool = True):
+    """Para etapas que indican el fallo con el valor devuelto en lugar de una excepción."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if not ok:
+        STAGE_ERRORS.inc(stage=stage)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,40 @@
+# transcriber_app/modules/progress.py
+"""
+Avisos de progreso del pipeline (recibido, convirtiendo, transcribiendo,
+trozo n/m, resumiendo, terminado).
+
+Los módulos llaman a report_progress(etapa, **datos) sin saber quién escucha.
+Quien lanza el trabajo registra un oyente con progress_listener(); el oyente
+vive en una ContextVar, así que cada job (hilo o tarea asyncio) tiene el suyo.
+Sin oyente, report_progress no hace nada.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+_listener = contextvars.ContextVar("progress_listener", default=None)
+
+
+@contextmanager
+def progress_listener(callback):
+    """Registra callback(etapa, datos) para los avisos emitidos dentro del bloque."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def report_progress(stage: str, **info):
+    callback = _listener.get()
+    if callback is None:
+        return
+    try:
+        callback(stage, info)
+    except Exception as e:
+        # El progreso es informativo: nunca debe romper el pipeline
+        logger.warning(f"[PROGRESS] Error notificando la etapa {stage}: {e}")
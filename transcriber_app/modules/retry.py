@@ -0,0 +1,95 @@
+# transcriber_app/modules/retry.py
+"""
+Reintentos con espera exponencial y jitter para las etapas del pipeline.
+
+Solo se reintentan los fallos transitorios (red, 429, 5xx, cuota agotada,
+ffmpeg matado por una señal o por timeout); un 4xx, un ffmpeg que termina
+con error (audio corrupto o no soportado: fallaría igual) o un error de
+programación se propaga a la primera.
+La espera es "full jitter": aleatoria entre 0 y base * 2^intento (con tope),
+así los jobs que fallan a la vez no vuelven a llamar todos a la vez.
+
+Dentro de un job con checkpoint (los de la web) las etapas no se reintentan:
+lo hace el job entero, que se vuelve a encolar y continúa desde su
+checkpoint. Así los reintentos no se multiplican (etapa x job x 429 del
+rate limiter).
+"""
+import asyncio
+import random
+import subprocess
+import time
+
+import httpx
+import requests
+
+from transcriber_app.config import RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+from transcriber_app.modules.ai.rate_limiter import RateLimitTimeout
+from transcriber_app.modules.checkpoints import current_checkpoint
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,
+    subprocess.TimeoutExpired,
+    RateLimitTimeout,
+)
+
+
+def is_transient(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # Excepciones de google.api_core (ServiceUnavailable, ResourceExhausted...)
+        status = getattr(error, "code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(error, subprocess.CalledProcessError):
+        # returncode negativo: el proceso murió por una señal (OOM, parada del contenedor)
+        return error.returncode < 0
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def stage_attempts() -> int:
+    """Intentos por etapa: RETRY_ATTEMPTS, o 1 si el job entero ya se reintenta desde su checkpoint."""
+    return 1 if current_checkpoint() is not None else RETRY_ATTEMPTS
+
+
+def backoff_delay(attempt: int, base_delay: float = None, max_delay: float = None) -> float:
+    """Espera antes del reintento número attempt (0 = primer reintento)."""
+    base_delay = RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = RETRY_MAX_DELAY if max_delay is None else max_delay
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_call(fn, label: str = "operación", attempts: int = None, retry_on=is_transient):
+    """Ejecuta fn() hasta `attempts` veces mientras falle de forma transitoria."""
+    attempts = stage_attempts() if attempts is None else attempts
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt + 1 >= attempts or not retry_on(e):
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"[RETRY] {label} falló ({e}); reintento {attempt + 1}/{attempts - 1} en {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def retry_call_async(fn, label: str = "operación", attempts: int = None, retry_on=is_transient):
+    """Como retry_call, con fn una función que devuelve un awaitable."""
+    attempts = stage_attempts() if attempts is None else attempts
+    for attempt in range(attempts):
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt + 1 >= attempts or not retry_on(e):
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"[RETRY] {label} falló ({e}); reintento {attempt + 1}/{attempts - 1} en {delay:.1f}s")
+            await asyncio.sleep(delay)
@@ -10,6 +10,10 @@ class Transcriber:
     def __init__(self):
         self.engine = GroqTranscriber()
 
+    @property
+    def engine_id(self) -> str:
+        return self.engine.engine_id
+
     def transcribe(self, audio_path: str):
         text, _ = self.engine.transcribe(audio_path)
         return text
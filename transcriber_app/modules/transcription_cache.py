@@ -0,0 +1,268 @@
+# transcriber_app/modules/transcription_cache.py
+"""
+Caché de transcripciones indexada por el contenido del audio.
+
+La clave es el SHA-256 del audio decodificado (PCM 16 kHz mono), así que el
+mismo audio reutiliza la transcripción aunque el fichero tenga otro nombre u
+otro contenedor. La clave incluye también el motor y el modelo que
+transcriben: la salida de un motor no se sirve a peticiones de otro.
+
+Opcionalmente se calcula una huella perceptual (la evolución de la energía
+cada medio segundo) que reconoce el mismo audio recodificado con otra
+calidad. Las huellas viven en un índice SQLite aparte (fingerprints.db) que
+se consulta por motor y duración, y solo se indexan las de audios de al
+menos FINGERPRINT_MIN_SECONDS con bits variados: el silencio da una huella
+de ceros que coincidiría con cualquier otro silencio de la misma duración.
+
+Cada entrada es un JSON en disco; la fecha de modificación hace de marca
+LRU y se expulsan las más antiguas cuando se supera el tamaño máximo.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from transcriber_app.config import (
+    TRANSCRIPTION_CACHE_ENABLED,
+    TRANSCRIPTION_CACHE_DIR,
+    TRANSCRIPTION_CACHE_MAX_MB,
+    TRANSCRIPTION_CACHE_FINGERPRINT,
+)
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+RMS_RE = re.compile(r"RMS_level=(-?(?:\d+(?:\.\d+)?|inf))")
+FRAME_SECONDS = 0.5
+FINGERPRINT_SIMILARITY = 0.9
+# Huellas que no se usan para buscar parecidos: audios cortos o casi constantes (silencio)
+FINGERPRINT_MIN_SECONDS = 30.0
+FINGERPRINT_MIN_ENTROPY = 0.7
+# Tolerancia de duración de fingerprint_similarity
+FINGERPRINT_LENGTH_TOLERANCE = 0.02
+
+
+@dataclass(frozen=True)
+class AudioKey:
+    digest: str
+    fingerprint: Optional[str] = None
+    engine: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Nombre de la entrada: el digest, más el motor si se conoce."""
+        if not self.engine:
+            return self.digest
+        return f"{self.digest}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', self.engine)}"
+
+
+def engine_id(transcriber) -> Optional[str]:
+    """Motor y modelo del transcriptor (p. ej. "groq-whisper:whisper-large-v3"); None si no lo declara."""
+    return getattr(transcriber, "engine_id", None)
+
+
+def decoded_audio_digest(path: str, chunk_size: int = 256 * 1024) -> str:
+    """SHA-256 del audio decodificado a PCM 16 kHz mono, leído en streaming de ffmpeg."""
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", path,
+           "-vn", "-ac", "1", "-ar", "16000", "-f", "s16le", "pipe:1"]
+    digest = hashlib.sha256()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return digest.hexdigest()
+
+
+def audio_fingerprint(path: str) -> str:
+    """
+    Huella perceptual: un bit por cada medio segundo que indica si la energía
+    sube o baja respecto al anterior. Es robusta a cambios de volumen y de
+    códec. El cálculo de la energía lo hace ffmpeg (filtro astats).
+    """
+    samples = int(8000 * FRAME_SECONDS)
+    # ametadata escribe cada valor en el log de ffmpeg (stderr, nivel info)
+    cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "info", "-i", path, "-vn", "-ac", "1",
+           "-af", f"aresample=8000,asetnsamples=n={samples}:p=0,astats=metadata=1:reset=1,"
+                  "ametadata=print:key=lavfi.astats.Overall.RMS_level",
+           "-f", "null", "-"]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    levels = [max(float(v), -120.0) for v in RMS_RE.findall(result.stderr)]
+    return "".join("1" if b > a else "0" for a, b in zip(levels, levels[1:]))
+
+
+def fingerprint_similarity(a: str, b: str) -> float:
+    """Fracción de bits iguales; 0 si las duraciones difieren más de un 2 %."""
+    if not a or not b or abs(len(a) - len(b)) > max(len(a), len(b)) * FINGERPRINT_LENGTH_TOLERANCE:
+        return 0.0
+    n = min(len(a), len(b))
+    return sum(1 for x, y in zip(a[:n], b[:n]) if x == y) / n
+
+
+def fingerprint_entropy(fingerprint: str) -> float:
+    """Entropía de los bits de la huella (0 = todos iguales, 1 = mitad y mitad)."""
+    if not fingerprint:
+        return 0.0
+    p = fingerprint.count("1") / len(fingerprint)
+    if p in (0.0, 1.0):
+        return 0.0
+    return -(p * math.log2(p) + (1 - p) * math.log2(1 - p))
+
+
+def fingerprint_usable(fingerprint: Optional[str]) -> bool:
+    """Si la huella distingue el audio lo bastante para buscar coincidencias aproximadas."""
+    return (bool(fingerprint)
+            and len(fingerprint) * FRAME_SECONDS >= FINGERPRINT_MIN_SECONDS
+            and fingerprint_entropy(fingerprint) >= FINGERPRINT_MIN_ENTROPY)
+
+
+class FingerprintIndex:
+    """Huellas de las entradas de la caché, consultables por motor y longitud (SQLite en modo WAL)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            name TEXT PRIMARY KEY,
+            engine TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_fingerprints_lookup ON fingerprints (engine, length);
+    """
+
+    def __init__(self, path: Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def add(self, name: str, engine: Optional[str], fingerprint: str):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO fingerprints (name, engine, length, fingerprint) VALUES (?, ?, ?, ?)",
+            (name, engine or "", len(fingerprint), fingerprint)
+        )
+
+    def remove(self, name: str):
+        self._conn().execute("DELETE FROM fingerprints WHERE name = ?", (name,))
+
+    def candidates(self, engine: Optional[str], fingerprint: str) -> list:
+        """[(name, huella)] del mismo motor con una duración compatible."""
+        margin = math.ceil(len(fingerprint) * FINGERPRINT_LENGTH_TOLERANCE)
+        return self._conn().execute(
+            "SELECT name, fingerprint FROM fingerprints WHERE engine = ? AND length BETWEEN ? AND ?",
+            (engine or "", len(fingerprint) - margin, len(fingerprint) + margin)
+        ).fetchall()
+
+
+class TranscriptionCache:
+    def __init__(self, cache_dir: str = TRANSCRIPTION_CACHE_DIR,
+                 max_bytes: int = TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024,
+                 use_fingerprint: bool = TRANSCRIPTION_CACHE_FINGERPRINT):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.use_fingerprint = use_fingerprint
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index = FingerprintIndex(self.cache_dir / "fingerprints.db") if use_fingerprint else None
+
+    def key_for(self, audio_path: str, engine: str = None) -> AudioKey:
+        """engine: motor y modelo que van a transcribir (ver engine_id)."""
+        digest = decoded_audio_digest(audio_path)
+        fingerprint = audio_fingerprint(audio_path) if self.use_fingerprint else None
+        return AudioKey(digest, fingerprint, engine)
+
+    def get(self, key: AudioKey):
+        """Devuelve (texto, metadata) o None."""
+        path = self._path(key.name)
+        if not path.exists() and self.index is not None and fingerprint_usable(key.fingerprint):
+            path = self._find_by_fingerprint(key)
+        if path is None or not path.exists():
+            return None
+
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)  # marca de uso reciente para el LRU
+        except (OSError, ValueError) as e:
+            logger.warning(f"[TRANSCRIPTION CACHE] Entrada ilegible {path}: {e}")
+            return None
+
+        logger.info(f"[TRANSCRIPTION CACHE] Acierto para {key.digest[:12]}")
+        return entry["text"], entry.get("metadata", {})
+
+    def put(self, key: AudioKey, text: str, metadata: dict = None):
+        entry = {"text": text, "metadata": metadata or {}, "fingerprint": key.fingerprint, "engine": key.engine}
+        path = self._path(key.name)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)  # escritura atómica: otros procesos nunca ven medio fichero
+        if self.index is not None and fingerprint_usable(key.fingerprint):
+            self.index.add(key.name, key.engine, key.fingerprint)
+        logger.info(f"[TRANSCRIPTION CACHE] Guardada transcripción {key.digest[:12]}")
+        self._evict()
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.json"
+
+    def _find_by_fingerprint(self, key: AudioKey):
+        # Solo se leen las huellas del mismo motor y duración parecida, no las entradas
+        best, best_score = None, FINGERPRINT_SIMILARITY
+        for name, candidate in self.index.candidates(key.engine, key.fingerprint):
+            score = fingerprint_similarity(key.fingerprint, candidate)
+            if score >= best_score:
+                best, best_score = self._path(name), score
+        if best is not None:
+            logger.info(f"[TRANSCRIPTION CACHE] Acierto por huella ({best_score:.0%}): {best.name}")
+        return best
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    logger.info(f"[TRANSCRIPTION CACHE] Expulsada entrada {path.name}")
+                except OSError:
+                    continue
+                if self.index is not None:
+                    self.index.remove(path.stem)
+
+
+@lru_cache(maxsize=None)
+def get_transcription_cache() -> Optional[TranscriptionCache]:
+    """Caché compartida del proceso, o None si está desactivada."""
+    if not TRANSCRIPTION_CACHE_ENABLED:
+        return None
+    return TranscriptionCache()
@@ -0,0 +1,341 @@
+# transcriber_app/runner/batch.py
+"""
+Procesamiento por lotes: muchos audios o transcripciones con el mismo pipeline que el CLI.
+
+    python -m transcriber_app.main batch <directorio|glob|manifiesto> <modo[,modo...]>
+        [--workers N] [--report fichero.json] [--force]
+
+- Entrada: un directorio (sus audios y .txt, sin subdirectorios), un glob
+  ("archivo/**/*.mp3") o un manifiesto de texto con una ruta por línea
+  (relativa al manifiesto; las líneas vacías y las que empiezan por # se
+  ignoran).
+- Las salidas se nombran por el nombre del fichero sin extensión, así que dos
+  entradas con el mismo (a/intro.mp3 y b/intro.mp3, o reunion.mp3 y
+  reunion.txt) son un error: se pisarían entre sí.
+- Cada elemento se salta si sus salidas (transcripts/<nombre>.txt y
+  outputs/<nombre>_<modo>.md) son al menos tan recientes como la entrada;
+  si solo faltan algunos modos se generan esos, y si la transcripción de un
+  audio está al día se resume desde ella sin volver a transcribir.
+- Los elementos se procesan en un pool de BATCH_WORKERS hilos; los límites
+  de cada proveedor los sigue aplicando el rate limiter.
+- Al terminar se escribe un informe JSON en BATCH_REPORT_DIR (o --report).
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from transcriber_app.config import BATCH_WORKERS, BATCH_REPORT_DIR
+from transcriber_app.modules.ai.ai_manager import AIManager
+from transcriber_app.modules.ai.gemini.agent_registry import available_modes
+from transcriber_app.modules.audio_receiver import AudioReceiver
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.output_formatter import OutputFormatter
+from transcriber_app.runner.orchestrator import Orchestrator
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+AUDIO_EXTENSIONS = {".mp3", ".webm", ".wav", ".m4a", ".mp4", ".ogg", ".flac"}
+TEXT_EXTENSIONS = {".txt"}
+GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class BatchItem:
+    path: Path
+    kind: str                                      # "audio" o "texto"
+    status: str = "pending"                        # pending, skipped, done, error
+    modes: list = field(default_factory=list)      # modos que hay que generar
+    from_transcript: bool = False                  # audio con la transcripción al día
+    outputs: dict = field(default_factory=dict)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    @property
+    def transcript_path(self) -> Path:
+        # OutputFormatter guarda la transcripción con el nombre en minúsculas
+        return Path("transcripts") / f"{self.name.lower()}.txt"
+
+    def output_path(self, mode: str) -> Path:
+        return Path("outputs") / f"{self.name}_{mode}.md"
+
+    def to_dict(self) -> dict:
+        return {
+            "path": str(self.path),
+            "kind": self.kind,
+            "status": self.status,
+            "modes": self.modes,
+            "from_transcript": self.from_transcript,
+            "outputs": self.outputs,
+            "seconds": round(self.seconds, 3),
+            "error": self.error,
+        }
+
+
+def _kind(path: Path) -> Optional[str]:
+    ext = path.suffix.lower()
+    if ext in AUDIO_EXTENSIONS:
+        return "audio"
+    if ext in TEXT_EXTENSIONS:
+        return "texto"
+    return None
+
+
+def collect_items(source: str) -> list:
+    """Elementos a procesar a partir de un directorio, un glob o un manifiesto."""
+    path = Path(source)
+    if path.is_dir():
+        candidates = sorted(p for p in path.iterdir() if p.is_file())
+    elif GLOB_CHARS & set(source):
+        candidates = sorted(Path(p) for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+    elif path.is_file() and _kind(path) is None:
+        candidates = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = Path(line)
+            candidates.append(entry if entry.is_absolute() else path.parent / entry)
+        missing = [str(p) for p in candidates if not p.is_file()]
+        if missing:
+            raise ValueError(f"El manifiesto incluye ficheros que no existen: {', '.join(missing)}")
+    elif path.is_file():
+        candidates = [path]
+    else:
+        raise ValueError(f"No existe el directorio, glob o manifiesto: {source}")
+
+    items = []
+    for candidate in dict.fromkeys(candidates):
+        kind = _kind(candidate)
+        if kind is None:
+            logger.debug("[BATCH] Ignorado (extensión no soportada): %s", candidate)
+            continue
+        items.append(BatchItem(path=candidate, kind=kind))
+    _check_collisions(items)
+    return items
+
+
+def _check_collisions(items: list):
+    """ValueError si dos elementos escribirían las mismas salidas."""
+    # La transcripción se guarda en minúsculas: Intro.mp3 e intro.mp3 también chocan
+    by_name = {}
+    for item in items:
+        by_name.setdefault(item.name.lower(), []).append(str(item.path))
+    collisions = [paths for paths in by_name.values() if len(paths) > 1]
+    if collisions:
+        detail = "; ".join(", ".join(paths) for paths in collisions)
+        raise ValueError(f"Hay entradas con el mismo nombre y sus salidas se pisarían: {detail}")
+
+
+def _is_fresh(output: Path, source_mtime: float) -> bool:
+    try:
+        return output.stat().st_mtime >= source_mtime
+    except OSError:
+        return False
+
+
+def plan_item(item: BatchItem, modes: list, force: bool = False) -> BatchItem:
+    """Decide qué modos faltan o están desactualizados; marca 'skipped' si no falta ninguno."""
+    if force:
+        item.modes = list(modes)
+        return item
+
+    source_mtime = item.path.stat().st_mtime
+    if item.kind == "audio":
+        item.from_transcript = _is_fresh(item.transcript_path, source_mtime)
+        if not item.from_transcript:
+            # Sin transcripción al día hay que transcribir y, por tanto, rehacer todos los modos
+            item.modes = list(modes)
+            return item
+
+    item.modes = [m for m in modes if not _is_fresh(item.output_path(m), source_mtime)]
+    if not item.modes:
+        item.status = "skipped"
+        item.outputs = {m: str(item.output_path(m)) for m in modes}
+    return item
+
+
+def process_item(orchestrator: Orchestrator, item: BatchItem) -> BatchItem:
+    start = time.perf_counter()
+    try:
+        if item.kind == "audio" and not item.from_transcript:
+            output_files, _, _ = orchestrator.run_audio_multi(str(item.path), item.modes)
+        elif item.kind == "audio":
+            output_files, _, _ = orchestrator.run_text_multi(str(item.transcript_path), item.modes, name=item.name)
+        else:
+            output_files, _, _ = orchestrator.run_text_multi(str(item.path), item.modes)
+        item.outputs = {m: str(p) for m, p in output_files.items()}
+        item.status = "done"
+    except Exception as e:
+        logger.error(f"[BATCH] Error procesando {item.path}: {e}")
+        item.status = "error"
+        item.error = str(e)
+    item.seconds = time.perf_counter() - start
+    return item
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class BatchProgress:
+    """Imprime una línea por elemento terminado con el avance y el tiempo restante estimado."""
+
+    SYMBOLS = {"done": "✅", "skipped": "⏭️ ", "error": "❌"}
+
+    def __init__(self, total: int, pending: int, out=print):
+        self.total = total
+        self.pending = pending
+        self.out = out
+        self.finished = 0
+        self.processed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def eta(self) -> Optional[float]:
+        """Ritmo real del pool (incluye el paralelismo) aplicado a lo que queda."""
+        if not self.processed:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed / self.processed * (self.pending - self.processed)
+
+    def update(self, item: BatchItem):
+        with self._lock:
+            self.finished += 1
+            if item.status != "skipped":
+                self.processed += 1
+            line = f"[{self.finished}/{self.total}] {self.SYMBOLS.get(item.status, '')} {item.path}"
+            if item.status == "skipped":
+                line += " (al día)"
+            else:
+                line += f" ({format_duration(item.seconds)})"
+                if item.error:
+                    line += f": {item.error}"
+            eta = self.eta()
+            if eta is not None and self.processed < self.pending:
+                line += f" · ETA {format_duration(eta)}"
+            self.out(line)
+
+
+def build_orchestrator() -> Orchestrator:
+    return Orchestrator(
+        receiver=AudioReceiver(),
+        transcriber=AIManager.get_transcriber(),
+        formatter=OutputFormatter(),
+    )
+
+
+def run_batch(items: list, modes: list, workers: int = None, force: bool = False,
+              orchestrator: Orchestrator = None, out=print) -> dict:
+    """Procesa los elementos en paralelo y devuelve el informe."""
+    workers = BATCH_WORKERS if workers is None else workers
+    started_at = datetime.now(timezone.utc)
+    start = time.monotonic()
+
+    for item in items:
+        plan_item(item, modes, force)
+    pending = [item for item in items if item.status == "pending"]
+    progress = BatchProgress(len(items), len(pending), out=out)
+    for item in items:
+        if item.status == "skipped":
+            progress.update(item)
+
+    logger.info(f"[BATCH] {len(items)} elementos, {len(pending)} por procesar con {workers} workers (modos: {modes})")
+    if pending:
+        orchestrator = build_orchestrator() if orchestrator is None else orchestrator
+        # OutputFormatter.save_metrics no crea el directorio
+        os.makedirs(os.path.join("outputs", "metrics"), exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+            futures = [pool.submit(process_item, orchestrator, item) for item in pending]
+            for future in as_completed(futures):
+                progress.update(future.result())
+
+    totals = {status: sum(1 for item in items if item.status == status) for status in ("done", "skipped", "error")}
+    return {
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": round(time.monotonic() - start, 3),
+        "workers": workers,
+        "modes": list(modes),
+        "force": force,
+        "totals": {"items": len(items), **totals},
+        "items": [item.to_dict() for item in items],
+    }
+
+
+def write_report(report: dict, path=None) -> Path:
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = Path(BATCH_REPORT_DIR) / f"batch_{stamp}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info(f"[BATCH] Informe guardado en: {path}")
+    return path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m transcriber_app.main batch",
+        description="Transcribe y resume en paralelo un directorio, un glob o un manifiesto de audios/textos.",
+    )
+    parser.add_argument("source", help="Directorio, glob entre comillas ('audios/**/*.mp3') o manifiesto")
+    parser.add_argument("modes", help="Modo de resumen o varios separados por comas")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help=f"Elementos procesados a la vez (por defecto {BATCH_WORKERS})")
+    parser.add_argument("--report", help=f"Ruta del informe JSON (por defecto en {BATCH_REPORT_DIR}/)")
+    parser.add_argument("--force", action="store_true", help="Reprocesar aunque las salidas estén al día")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.lower().split(",") if m.strip()]
+    invalid = [m for m in modes if m not in available_modes()]
+    if not modes or invalid:
+        print(f"❌ Modo no válido: {', '.join(invalid) or args.modes}")
+        print(f"   Modos disponibles: {', '.join(available_modes())}")
+        return 2
+
+    try:
+        items = collect_items(args.source)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    if not items:
+        print(f"❌ No hay audios ni textos que procesar en: {args.source}")
+        return 2
+
+    report = run_batch(items, modes, workers=args.workers, force=args.force)
+    report_path = write_report(report, args.report)
+
+    totals = report["totals"]
+    print(
+        f"\n✅ {totals['done']} procesados, ⏭️  {totals['skipped']} al día, ❌ {totals['error']} con error "
+        f"en {format_duration(report['duration_seconds'])}"
+    )
+    print(f"📄 Informe: {report_path}")
+    return 1 if totals["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
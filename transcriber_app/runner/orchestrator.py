@@ -1,29 +1,41 @@
 # transcriber_app/runner/orchestrator.py
 
 import os
+import asyncio
 from transcriber_app.modules.logging.logging_config import setup_logging
 from transcriber_app.modules.ai.ai_manager import AIManager, log_agent_result
+from transcriber_app.modules.transcription_cache import engine_id, get_transcription_cache
+from transcriber_app.modules.progress import report_progress
+from transcriber_app.modules.checkpoints import current_checkpoint
+from transcriber_app.modules.retry import retry_call, retry_call_async
+from transcriber_app.modules.metrics import record_cache_lookup, time_stage
 
 # Logging
 logger = setup_logging("transcribeapp")
 
 
 class Orchestrator:
-    def __init__(self, receiver, transcriber, formatter, save_files=True):
+    def __init__(self, receiver, transcriber, formatter, save_files=True, cache=None):
         self.receiver = receiver
         self.transcriber = transcriber
         self.formatter = formatter
         self.save_files = save_files
+        # Caché de transcripciones por contenido (None = la compartida según config)
+        self.cache = cache if cache is not None else get_transcription_cache()
         logger.info(f"[ORCHESTRATOR] Orchestrator inicializado con componentes (save_files={save_files}).")
 
-    def run_audio(self, audio_path, mode="default"):
+    def run_audio(self, audio_path, mode="default", on_partial_summary=None):
+        """
+        on_partial_summary(texto_parcial) recibe el resumen acumulado según
+        llegan los tokens del modelo (para mostrarlo antes de que termine).
+        """
         logger.info(f"[ORCHESTRATOR] Ejecutando flujo de audio para: {audio_path} con modo: {mode}")
 
         # 1. Cargar audio
         audio_info = self.receiver.load(audio_path)
 
-        # 2. Transcribir
-        text, metadata = self.transcriber.transcribe(audio_info["path"])
+        # 2. Transcribir (o reutilizar una transcripción del mismo audio)
+        text, metadata = self.transcribe(audio_info["path"])
         logger.info(f"[ORCHESTRATOR] Metadata de transcripción: {metadata}")
 
         # 3. Guardar transcripción
@@ -31,7 +43,8 @@ class Orchestrator:
         self.formatter.save_transcription(safe_name, text, enforce_save=self.save_files)
 
         # 4. Resumir con Gemini (nuevo sistema)
-        summary_output = AIManager.summarize(text, mode)
+        report_progress("summarizing", mode=mode)
+        summary_output = self._summarize(text, mode, on_partial_summary)
 
         # 5. Log básico del agente
         log_agent_result(summary_output)
@@ -43,6 +56,173 @@ class Orchestrator:
         output_file = self.formatter.save_output(audio_info["name"], summary_output, mode, enforce_save=self.save_files)
         return (output_file, text, summary_output)
 
+    def run_audio_multi(self, audio_path, modes):
+        """
+        Transcribe una sola vez y genera todos los modos en paralelo.
+        Devuelve ({modo: fichero}, texto, {modo: resumen}).
+        """
+        logger.info(f"[ORCHESTRATOR] Ejecutando flujo de audio para: {audio_path} con modos: {modes}")
+
+        audio_info = self.receiver.load(audio_path)
+
+        text, metadata = self.transcribe(audio_info["path"])
+        logger.info(f"[ORCHESTRATOR] Metadata de transcripción: {metadata}")
+
+        safe_name = audio_info["name"].lower()
+        self.formatter.save_transcription(safe_name, text, enforce_save=self.save_files)
+
+        output_files, summaries = self._summarize_modes(audio_info["name"], text, modes)
+        return (output_files, text, summaries)
+
+    def run_text_multi(self, text_path, modes, name=None):
+        """name: nombre base de las salidas (por defecto, el del fichero de texto)."""
+        logger.info(f"[ORCHESTRATOR] Ejecutando flujo de texto para: {text_path} con modos: {modes}")
+
+        if name is None:
+            name = os.path.splitext(os.path.basename(text_path))[0]
+        with open(text_path, "r", encoding="utf-8") as f:
+            text = f.read()
+
+        output_files, summaries = self._summarize_modes(name, text, modes)
+        return (output_files, text, summaries)
+
+    def _summarize(self, text, mode, on_partial_summary=None):
+        """Resumen de un modo, reutilizando el de un intento anterior del job si existe."""
+        checkpoint = current_checkpoint()
+        saved = checkpoint.load_summary(mode) if checkpoint else None
+        if saved is not None:
+            logger.info(f"[ORCHESTRATOR] Resumen '{mode}' reutilizado del checkpoint")
+            return saved
+
+        with time_stage("summarization"):
+            if on_partial_summary is None:
+                summary_output = retry_call(lambda: AIManager.summarize(text, mode), label=f"Resumen '{mode}'")
+            else:
+                summary_output = retry_call(
+                    lambda: self._summarize_streaming(text, mode, on_partial_summary), label=f"Resumen '{mode}'"
+                )
+
+        if checkpoint is not None and isinstance(summary_output, str):
+            checkpoint.save_summary(mode, summary_output)
+        return summary_output
+
+    def _summarize_streaming(self, text, mode, on_partial_summary):
+        summary_output = ""
+        for chunk in AIManager.summarize_stream(text, mode):
+            summary_output += chunk
+            on_partial_summary(summary_output)
+        return summary_output
+
+    def _summarize_modes(self, name, text, modes):
+        report_progress("summarizing", modes=list(modes))
+        checkpoint = current_checkpoint()
+        saved = {m: checkpoint.load_summary(m) for m in modes} if checkpoint else {}
+        pending = [m for m in modes if saved.get(m) is None]
+
+        summaries = {m: saved[m] for m in modes if saved.get(m) is not None}
+        if pending:
+            with time_stage("summarization"):
+                fresh = retry_call(lambda: AIManager.summarize_many(text, pending), label=f"Resúmenes {pending}")
+            if checkpoint is not None:
+                for m, summary_output in fresh.items():
+                    checkpoint.save_summary(m, summary_output)
+            summaries.update(fresh)
+        summaries = {m: summaries[m] for m in dict.fromkeys(modes)}
+
+        output_files = {}
+        for mode, summary_output in summaries.items():
+            self.formatter.save_metrics(name, summary_output, mode)
+            output_files[mode] = self.formatter.save_output(name, summary_output, mode, enforce_save=self.save_files)
+        return output_files, summaries
+
+    def transcribe(self, audio_path):
+        """
+        Transcribe consultando antes el checkpoint del job y la caché por
+        contenido del audio. Los fallos transitorios se reintentan.
+        """
+        checkpoint = current_checkpoint()
+        saved = self._checkpoint_lookup(checkpoint)
+        if saved is not None:
+            return saved
+
+        key, cached = self._cache_lookup(audio_path)
+        if cached is not None:
+            result = cached
+        else:
+            with time_stage("transcription"):
+                result = retry_call(lambda: self.transcriber.transcribe(audio_path), label="Transcripción")
+            result = self._cache_store(key, result)
+
+        if checkpoint is not None:
+            checkpoint.save_transcript(*result)
+        return result
+
+    async def transcribe_async(self, audio_path):
+        """Versión asíncrona de transcribe; usa transcribe_async del transcriptor si lo tiene."""
+        checkpoint = current_checkpoint()
+        saved = await asyncio.to_thread(self._checkpoint_lookup, checkpoint)
+        if saved is not None:
+            return saved
+
+        key, cached = await asyncio.to_thread(self._cache_lookup, audio_path)
+        if cached is not None:
+            result = cached
+        else:
+            with time_stage("transcription"):
+                if hasattr(self.transcriber, "transcribe_async"):
+                    result = await retry_call_async(
+                        lambda: self.transcriber.transcribe_async(audio_path), label="Transcripción"
+                    )
+                else:
+                    result = await retry_call_async(
+                        lambda: asyncio.to_thread(self.transcriber.transcribe, audio_path), label="Transcripción"
+                    )
+            result = await asyncio.to_thread(self._cache_store, key, result)
+
+        if checkpoint is not None:
+            await asyncio.to_thread(checkpoint.save_transcript, *result)
+        return result
+
+    def _checkpoint_lookup(self, checkpoint):
+        if checkpoint is None:
+            return None
+        saved = checkpoint.load_transcript()
+        if saved is not None:
+            logger.info(f"[ORCHESTRATOR] Transcripción reutilizada del checkpoint del job {checkpoint.job_id}")
+            report_progress("transcribing", resumed=True)
+        return saved
+
+    def _cache_lookup(self, audio_path):
+        """Devuelve (clave, (texto, metadata) o None)."""
+        if self.cache is None:
+            return None, None
+        try:
+            key = self.cache.key_for(audio_path, engine=engine_id(self.transcriber))
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"[ORCHESTRATOR] Caché de transcripciones no disponible: {e}")
+            return None, None
+
+        record_cache_lookup("transcription", hit=cached is not None)
+        if cached is None:
+            return key, None
+        text, metadata = cached
+        logger.info(f"[ORCHESTRATOR] Transcripción reutilizada de caché para: {audio_path}")
+        report_progress("transcribing", cached=True)
+        return key, (text, {**metadata, "cached": True})
+
+    def _cache_store(self, key, result):
+        # El wrapper del CLI (Transcriber) devuelve solo el texto
+        text, metadata = result if isinstance(result, tuple) else (result, {})
+
+        if key is not None:
+            try:
+                self.cache.put(key, text, metadata)
+            except Exception as e:
+                logger.warning(f"[ORCHESTRATOR] No se pudo guardar en caché: {e}")
+
+        return text, metadata
+
     def run_text(self, text_path, mode="default"):
         logger.info(f"[ORCHESTRATOR] Ejecutando flujo de texto para: {text_path} con modo: {mode}")
 
@@ -53,7 +233,7 @@ class Orchestrator:
             text = f.read()
 
         # 2. Resumir con Gemini
-        summary_output = AIManager.summarize(text, mode)
+        summary_output = self._summarize(text, mode)
 
         # 3. Log del agente
         log_agent_result(summary_output)
@@ -61,3 +241,63 @@ class Orchestrator:
         # 4. Guardar salida final
         output_file = self.formatter.save_output(name, summary_output, mode, enforce_save=self.save_files)
         return (output_file, text, summary_output)
+
+    async def run_audio_async(self, audio_path, mode="default"):
+        """
+        Versión asíncrona de run_audio: ffmpeg, Groq y Gemini se esperan sin
+        bloquear el event loop, así que un mismo worker atiende varios trabajos.
+        El disco (receptor y formateador) va a hilos con asyncio.to_thread.
+        """
+        logger.info(f"[ORCHESTRATOR] (async) Ejecutando flujo de audio para: {audio_path} con modo: {mode}")
+
+        audio_info = await asyncio.to_thread(self.receiver.load, audio_path)
+
+        text, metadata = await self.transcribe_async(audio_info["path"])
+        logger.info(f"[ORCHESTRATOR] Metadata de transcripción: {metadata}")
+
+        safe_name = audio_info["name"].lower()
+        await asyncio.to_thread(self.formatter.save_transcription, safe_name, text, enforce_save=self.save_files)
+
+        report_progress("summarizing", mode=mode)
+        summary_output = await self._summarize_async(text, mode)
+        log_agent_result(summary_output)
+
+        await asyncio.to_thread(self.formatter.save_metrics, audio_info["name"], summary_output, mode)
+        output_file = await asyncio.to_thread(
+            self.formatter.save_output, audio_info["name"], summary_output, mode, enforce_save=self.save_files
+        )
+        return (output_file, text, summary_output)
+
+    async def run_text_async(self, text_path, mode="default"):
+        logger.info(f"[ORCHESTRATOR] (async) Ejecutando flujo de texto para: {text_path} con modo: {mode}")
+
+        name = os.path.splitext(os.path.basename(text_path))[0]
+        text = await asyncio.to_thread(_read_text, text_path)
+
+        summary_output = await self._summarize_async(text, mode)
+        log_agent_result(summary_output)
+
+        output_file = await asyncio.to_thread(
+            self.formatter.save_output, name, summary_output, mode, enforce_save=self.save_files
+        )
+        return (output_file, text, summary_output)
+
+    async def _summarize_async(self, text, mode):
+        checkpoint = current_checkpoint()
+        saved = await asyncio.to_thread(checkpoint.load_summary, mode) if checkpoint else None
+        if saved is not None:
+            logger.info(f"[ORCHESTRATOR] Resumen '{mode}' reutilizado del checkpoint")
+            return saved
+
+        with time_stage("summarization"):
+            summary_output = await retry_call_async(
+                lambda: AIManager.summarize_async(text, mode), label=f"Resumen '{mode}'"
+            )
+        if checkpoint is not None and isinstance(summary_output, str):
+            await asyncio.to_thread(checkpoint.save_summary, mode, summary_output)
+        return summary_output
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
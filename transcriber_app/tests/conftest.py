@@ -2,11 +2,20 @@
 """Test configuration helpers.
 
 Ensure the repository root is on sys.path so imports like
-`from transcriber_app.modules import ...` work in CI and local runs.
+`from transcriber_app.modules import ...` work in CI and local runs,
+and select in-memory backends before the app modules are imported.
 """
 from pathlib import Path
+import os
 import sys
 
 ROOT = Path(__file__).resolve().parents[1].parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# Los tests usan backends en memoria para no crear ficheros en el repo
+os.environ.setdefault("JOB_STORE", "memory")
+os.environ.setdefault("TRANSCRIPTION_CACHE_ENABLED", "false")
+os.environ.setdefault("SUMMARY_CACHE", "memory")
+os.environ.setdefault("RATE_LIMITS_ENABLED", "false")
+os.environ.setdefault("AI_WARM_UP", "false")
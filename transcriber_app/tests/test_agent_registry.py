@@ -0,0 +1,71 @@
+# transcriber_app/tests/test_agent_registry.py
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from transcriber_app.modules.ai.gemini.agent_registry import AgentRegistry, PromptError, parse_prompt
+from transcriber_app.web.web_app import app
+
+
+def write_prompt(path, content):
+    path.write_text(content, encoding="utf-8")
+    # Asegurar que la firma (mtime, tamaño) cambia aunque la escritura sea inmediata
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_parse_prompt_front_matter():
+    settings, prompt = parse_prompt("---\nlabel: Técnico\ntemperature: 0.5\nmax_tokens: 100\n---\nEres...\n")
+    assert settings == {"label": "Técnico", "temperature": 0.5, "max_tokens": 100}
+    assert prompt == "Eres...\n"
+
+    assert parse_prompt("Sin cabecera") == ({}, "Sin cabecera")
+
+    # '#' solo es comentario al principio de la línea o tras un espacio; entre comillas, nunca
+    settings, _ = parse_prompt('---\n# modo de pruebas\nlabel: C#  # lenguaje\nmodel: "gemini #2"\n---\nx')
+    assert settings == {"label": "C#", "model": "gemini #2"}
+    with pytest.raises(PromptError):
+        parse_prompt('---\nlabel: "sin cerrar\n---\nx')
+    with pytest.raises(PromptError):
+        parse_prompt("---\ntemperature: alta\n---\nx")
+
+
+def test_registry_discovers_and_hot_reloads_prompts(tmp_path):
+    write_prompt(tmp_path / "default.md", "---\norder: 1\n---\nResume.")
+    write_prompt(tmp_path / "acta.md", "---\nlabel: Acta\ntemperature: 0.7\nmodel: gemini-x\n---\nRedacta el acta.")
+    registry = AgentRegistry(tmp_path, reload_seconds=0)
+
+    assert registry.modes() == ["default", "acta"]
+    assert registry.describe()[1] == {"mode": "acta", "label": "Acta"}
+
+    agent = registry["acta"]
+    assert agent.system_prompt == "Redacta el acta."
+    assert agent.model_name == "gemini-x"
+    assert agent.generation_config["temperature"] == 0.7
+    assert registry["acta"] is agent  # compilado una sola vez
+
+    # Editar el prompt: la siguiente petición usa el nuevo
+    write_prompt(tmp_path / "acta.md", "---\ntemperature: 0.1\n---\nRedacta un acta breve.")
+    reloaded = registry["acta"]
+    assert reloaded is not agent
+    assert reloaded.system_prompt == "Redacta un acta breve."
+
+    # Un prompt roto no deja el modo sin servicio
+    write_prompt(tmp_path / "acta.md", "---\ntemperature: alta\n---\nx")
+    assert registry["acta"] is reloaded
+
+    # Un fichero nuevo es un modo nuevo
+    write_prompt(tmp_path / "bullet.md", "Lista de puntos.")
+    assert "bullet" in registry
+    assert "inexistente" not in registry
+
+
+def test_modes_endpoint_lists_prompt_modes():
+    response = TestClient(app).get("/api/modes")
+
+    assert response.status_code == 200
+    modes = response.json()["modes"]
+    assert modes[0] == {"mode": "default", "label": "Default"}
+    assert {"mode": "tecnico", "label": "Técnico"} in modes
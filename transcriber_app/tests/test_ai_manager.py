@@ -19,8 +19,73 @@ def test_ai_manager_fallback_to_default():
 
 def test_ai_manager_summarize_stream(monkeypatch):
     gemini = AIManager.get_model("gemini")
-    monkeypatch.setattr(gemini, "run_agent", lambda mode, text: "resultado stream")
+    monkeypatch.setattr(gemini, "run_agent", lambda mode, text, stream=False: iter(["resultado", " stream"]))
 
-    gen = AIManager.summarize_stream("texto", "default")
-    result = "".join(list(gen))
-    assert result == "resultado stream"
+    gen = AIManager.summarize_stream("texto para stream", "default")
+    assert next(gen) == "resultado"
+    assert "".join(gen) == " stream"
+
+
+def test_ai_manager_summarize_many_runs_modes_concurrently(monkeypatch):
+    import threading
+
+    # Si los modos se ejecutaran en serie la barrera nunca se completaría
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_summarize(text, mode, model_name="gemini"):
+        barrier.wait()
+        return f"{mode}: {text}"
+
+    monkeypatch.setattr(AIManager, "summarize", fake_summarize)
+
+    result = AIManager.summarize_many("texto", ["tecnico", "ejecutivo", "bullet", "tecnico"])
+    assert list(result) == ["tecnico", "ejecutivo", "bullet"]
+    assert result["bullet"] == "bullet: texto"
+
+
+def test_ai_manager_summarize_many_async_gathers_modes(monkeypatch):
+    import asyncio
+
+    started = []
+
+    async def fake_summarize_async(text, mode, model_name="gemini"):
+        started.append(mode)
+        # Cede el control: si fueran en serie solo habría empezado un modo
+        await asyncio.sleep(0.01)
+        assert len(started) == 2
+        return f"{mode}: {text}"
+
+    monkeypatch.setattr(AIManager, "summarize_async", fake_summarize_async)
+
+    result = asyncio.run(AIManager.summarize_many_async("texto", ["tecnico", "bullet", "tecnico"]))
+    assert result == {"tecnico": "tecnico: texto", "bullet": "bullet: texto"}
+
+
+def test_lazy_registry_builds_on_first_use():
+    from transcriber_app.modules.ai.registry import LazyRegistry
+
+    built = []
+    registry = LazyRegistry({"a": lambda: built.append("a") or "A"})
+
+    assert "a" in registry and built == []
+    assert registry["a"] == "A"
+    assert registry["a"] == "A"
+    assert built == ["a"]
+
+    registry["b"] = "B"  # instancia ya construida, como en un dict
+    assert registry.get("b") == "B"
+    assert registry.get("c", "por defecto") == "por defecto"
+    assert sorted(registry) == ["a", "b"]
+
+
+def test_importing_ai_manager_does_not_load_provider_sdks():
+    import subprocess
+    import sys
+
+    # Con un handler en el root, setup_logging no crea el fichero de log del repo
+    code = (
+        "import logging, sys; logging.basicConfig(handlers=[logging.NullHandler()]); "
+        "import transcriber_app.modules.ai.ai_manager; "
+        "sys.exit('google.generativeai' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True).returncode == 0
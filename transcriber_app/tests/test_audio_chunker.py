@@ -0,0 +1,84 @@
+# transcriber_app/tests/test_audio_chunker.py
+from unittest.mock import MagicMock, patch
+from transcriber_app.modules.audio_chunker import detect_silences, plan_chunks, stitch_texts
+from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+
+
+def test_plan_chunks_short_audio_is_single_chunk():
+    assert plan_chunks(100, window=600, overlap=2) == [(0.0, 100, False)]
+
+
+def test_plan_chunks_fixed_windows_overlap():
+    chunks = plan_chunks(250, window=100, overlap=5)
+    assert chunks == [(0.0, 100, False), (95, 195, True), (190, 250, True)]
+
+
+def test_plan_chunks_cuts_on_silence():
+    chunks = plan_chunks(250, window=100, overlap=5, silences=[(88, 90), (185, 187)])
+    assert chunks == [(0.0, 89.0, False), (89.0, 186.0, False), (186.0, 250, False)]
+
+
+def test_stitch_texts_removes_overlap():
+    texts = [
+        "hola a todos vamos a empezar la reunión de hoy",
+        "la reunión de hoy trata del sprint",
+    ]
+    assert stitch_texts(texts) == "hola a todos vamos a empezar la reunión de hoy trata del sprint"
+
+
+def test_stitch_texts_keeps_text_without_overlap():
+    texts = ["primera parte que", "que sigue aquí"]
+    assert stitch_texts(texts, [False, False]) == "primera parte que que sigue aquí"
+
+
+def test_detect_silences_parses_ffmpeg_output():
+    stderr = (
+        "[silencedetect @ 0x1] silence_start: 10.5\n"
+        "[silencedetect @ 0x1] silence_end: 11.5 | silence_duration: 1\n"
+        "[silencedetect @ 0x1] silence_start: 20\n"
+        "[silencedetect @ 0x1] silence_end: 21.25 | silence_duration: 1.25\n"
+    )
+    with patch("transcriber_app.modules.audio_chunker.subprocess.run", return_value=MagicMock(stderr=stderr)):
+        assert detect_silences("audio.mp3") == [(10.5, 11.5), (20.0, 21.25)]
+
+
+def test_groq_transcriber_chunks_long_audio():
+    t = GroqTranscriber(chunk_seconds=100, overlap_seconds=5, max_workers=3, split_on_silence=False)
+    calls = []
+
+    def fake_segment(path, start=None, duration=None):
+        calls.append((start, duration))
+        return f"trozo {int(start)} fin"
+
+    with patch("transcriber_app.modules.ai.groq.transcriber.GROQ_API_KEY", "fake_key"):
+        with patch("transcriber_app.modules.ai.groq.transcriber.probe_duration", return_value=250.0):
+            with patch.object(t, "_transcribe_segment", side_effect=fake_segment):
+                text, meta = t.transcribe("audios/largo.mp3")
+
+    assert meta["chunks"] == 3
+    assert sorted(calls) == [(0.0, 100.0), (95.0, 100.0), (190.0, 60.0)]
+    assert text.startswith("trozo 0 fin")
+    assert text.endswith("trozo 190 fin")
+
+
+def test_groq_transcriber_async_chunks_long_audio():
+    import asyncio
+
+    t = GroqTranscriber(chunk_seconds=100, overlap_seconds=5, max_workers=2, split_on_silence=False)
+    calls = []
+
+    async def fake_segment(client, path, start=None, duration=None):
+        calls.append((start, duration))
+        return f"trozo {int(start)} fin"
+
+    async def fake_probe(path):
+        return 250.0
+
+    with patch("transcriber_app.modules.ai.groq.transcriber.GROQ_API_KEY", "fake_key"):
+        with patch("transcriber_app.modules.ai.groq.transcriber.probe_duration_async", side_effect=fake_probe):
+            with patch.object(t, "_transcribe_segment_async", side_effect=fake_segment):
+                text, meta = asyncio.run(t.transcribe_async("audios/largo.mp3"))
+
+    assert meta["chunks"] == 3
+    assert sorted(calls) == [(0.0, 100.0), (95.0, 100.0), (190.0, 60.0)]
+    assert text.startswith("trozo 0 fin")
@@ -0,0 +1,123 @@
+# transcriber_app/tests/test_audio_downloader_pytest.py
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from transcriber_app.modules import audio_downloader
+from transcriber_app.modules.audio_downloader import download_audio, download_many, probe_urls
+
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PL1"
+
+
+def video(video_id, duration=60):
+    return {"_type": "video", "id": video_id, "duration": duration,
+            "webpage_url": f"https://www.youtube.com/watch?v={video_id}"}
+
+
+class FakeYoutubeDL:
+    """Sustituye a yt_dlp.YoutubeDL: metadatos de un catálogo y 'descargas' que escriben el mp3."""
+
+    catalog = {}
+    extracted = []
+    downloaded = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False, process=True):
+        with self.lock:
+            self.extracted.append(url)
+        return dict(self.catalog[url])
+
+    def process_ie_result(self, info, download=True):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        time.sleep(0.05)
+        Path(self.opts["outtmpl"].replace("%(ext)s", "mp3")).write_bytes(b"mp3")
+        with cls.lock:
+            cls.active -= 1
+            cls.downloaded.append(info.get("id"))
+        return info
+
+
+@pytest.fixture
+def fake_ydl(monkeypatch):
+    FakeYoutubeDL.catalog = {
+        PLAYLIST_URL: {
+            "_type": "playlist", "title": "Sprint",
+            "entries": [
+                {"_type": "url", "url": "https://www.youtube.com/watch?v=a1", "id": "a1", "duration": 60},
+                {"_type": "url", "url": "https://www.youtube.com/watch?v=b2", "id": "b2", "duration": 99999},
+                {"_type": "url", "url": "https://www.youtube.com/watch?v=c3", "id": "c3", "duration": 60},
+            ],
+        },
+        "https://www.youtube.com/watch?v=a1": video("a1"),
+        "https://www.youtube.com/watch?v=d4": video("d4"),
+    }
+    FakeYoutubeDL.extracted = []
+    FakeYoutubeDL.downloaded = []
+    FakeYoutubeDL.active = FakeYoutubeDL.max_active = 0
+    monkeypatch.setattr(audio_downloader.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    return FakeYoutubeDL
+
+
+def test_download_audio_extracts_metadata_once(fake_ydl, tmp_path):
+    path = download_audio("https://www.youtube.com/watch?v=d4", str(tmp_path))
+
+    assert path == str(tmp_path / "d4.mp3")
+    assert fake_ydl.extracted == ["https://www.youtube.com/watch?v=d4"]
+    assert fake_ydl.downloaded == ["d4"]
+
+    # Segunda vez: el mp3 ya existe y no se consulta nada
+    assert download_audio("https://www.youtube.com/watch?v=d4", str(tmp_path)) == path
+    assert len(fake_ydl.extracted) == 1
+
+
+def test_download_audio_rejects_playlists(fake_ydl, tmp_path):
+    with pytest.raises(ValueError):
+        download_audio(PLAYLIST_URL, str(tmp_path))
+
+
+def test_probe_urls_expands_playlists_and_deduplicates(fake_ydl):
+    entries = probe_urls([PLAYLIST_URL, "https://www.youtube.com/watch?v=a1", "https://www.youtube.com/watch?v=d4"])
+
+    assert [url.rsplit("=", 1)[1] for url, _ in entries] == ["a1", "b2", "c3", "d4"]
+    # Los vídeos de la playlist no se extraen uno a uno al consultarla
+    assert "https://www.youtube.com/watch?v=c3" not in fake_ydl.extracted
+
+
+def test_probe_urls_stops_listing_past_max_entries(fake_ydl):
+    entries = probe_urls([PLAYLIST_URL], max_entries=1)
+
+    # Uno más que el límite: suficiente para rechazar la petición sin listar la playlist entera
+    assert [url.rsplit("=", 1)[1] for url, _ in entries] == ["a1", "b2"]
+
+
+def test_download_many_runs_in_parallel_and_reports_each_result(fake_ydl, tmp_path):
+    finished = []
+
+    results = download_many(
+        [PLAYLIST_URL, "https://www.youtube.com/watch?v=d4"], str(tmp_path), max_workers=3, on_result=finished.append
+    )
+
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert "supera el límite" in results[1].error
+    assert sorted(r.url for r in finished) == sorted(r.url for r in results)
+    assert sorted(fake_ydl.downloaded) == ["a1", "c3", "d4"]
+    assert 1 < fake_ydl.max_active <= 3
+    # Los metadatos de la consulta se reutilizan: ninguna URL se extrae dos veces
+    assert len(fake_ydl.extracted) == len(set(fake_ydl.extracted))
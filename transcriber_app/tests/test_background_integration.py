@@ -1,3 +1,4 @@
+import threading
 import pytest
 from unittest.mock import patch
 from transcriber_app.web.api.background import process_audio_job, JOB_STATUS
@@ -48,3 +49,124 @@ def test_process_audio_job_error(mock_orchestrator, cleanup_job_status):
 
             assert JOB_STATUS[job_id]["status"] == "error"
             mock_remove.assert_called()
+
+
+def test_process_audio_job_deletes_original_next_to_decoded_audio(mock_orchestrator, cleanup_job_status, tmp_path):
+    # Subida .ogg decodificada a FLAC durante el streaming: el job usa el FLAC y borra ambos
+    original = tmp_path / "reunion.ogg"
+    decoded = tmp_path / "reunion.flac"
+    original.write_bytes(b"ogg")
+    decoded.write_bytes(b"flac")
+
+    process_audio_job("decoded_job", "reunion", "default", "test@example.com",
+                      audio_file=str(decoded), original_file=str(original))
+
+    assert JOB_STATUS["decoded_job"]["status"] == "done"
+    assert mock_orchestrator.run_audio.call_args.args[0] == str(decoded)
+    assert not original.exists() and not decoded.exists()
+
+
+def test_process_audio_job_multiple_modes(mock_orchestrator, cleanup_job_status):
+    mock_orchestrator.run_audio_multi.return_value = (
+        {"tecnico": "a.md", "bullet": "b.md"}, "texto original", {"tecnico": "md tecnico", "bullet": "md bullet"}
+    )
+
+    with patch("transcriber_app.web.api.background.Path.exists", return_value=True):
+        with patch("transcriber_app.web.api.background.os.remove"):
+            process_audio_job("multi_job", "test", "tecnico", "test@example.com", modos=["tecnico", "bullet"])
+
+    assert JOB_STATUS["multi_job"]["markdown"] == "md tecnico"
+    assert JOB_STATUS["multi_job"]["markdowns"]["bullet"] == "md bullet"
+    mock_orchestrator.run_audio.assert_not_called()
+
+
+def test_partial_summary_publisher_throttles_writes(cleanup_job_status, monkeypatch):
+    from transcriber_app.web.api import background
+
+    clock = iter([10.0, 10.1, 10.5])
+    monkeypatch.setattr(background.time, "monotonic", lambda: next(clock))
+
+    publish = background.partial_summary_publisher("partial_job")
+    publish("# R")
+    publish("# Re")   # dentro del intervalo: no se escribe
+    assert JOB_STATUS["partial_job"]["partial_markdown"] == "# R"
+    publish("# Res")
+
+    assert JOB_STATUS["partial_job"]["partial_markdown"] == "# Res"
+
+
+def test_process_audio_job_records_stage_events(mock_orchestrator, cleanup_job_status):
+    from transcriber_app.modules.progress import report_progress
+
+    def fake_run_audio(path, modo, on_partial_summary=None):
+        report_progress("transcribing", chunk=1, chunks=1)
+        report_progress("summarizing", mode=modo)
+        return ("fake_path.md", "texto original", "resumen markdown")
+
+    mock_orchestrator.run_audio.side_effect = fake_run_audio
+    JOB_STATUS["events_job"] = {"status": "queued", "created_at": 0}
+
+    with patch("transcriber_app.web.api.background.Path.exists", return_value=True):
+        with patch("transcriber_app.web.api.background.os.remove"):
+            process_audio_job("events_job", "test", "tecnico", "test@example.com")
+
+    job = JOB_STATUS["events_job"]
+    assert [e["stage"] for e in job["events"]] == ["transcribing", "summarizing", "done"]
+    assert [e["seq"] for e in job["events"]] == [0, 1, 2]
+    assert job["events"][0]["chunks"] == 1
+    assert job["status"] == "done" and job["stage"] == "done"
+
+
+def test_ingest_url_jobs_queues_each_download_as_it_finishes(cleanup_job_status):
+    from transcriber_app.modules.audio_downloader import DownloadResult
+    from transcriber_app.web.api import background
+    from transcriber_app.web.api.scheduler import QueueFullError
+
+    order = []
+    reported = threading.Event()
+
+    def fake_download_entries(entries, on_result=None):
+        on_result(DownloadResult("u1", path="audios/a1.mp3"))
+        on_result(DownloadResult("u2", error="demasiado largo"))
+        order.append("reported")
+        reported.set()
+
+    for job_id in ("job_a", "job_b"):
+        JOB_STATUS[job_id] = {"status": "downloading", "created_at": 0}
+    # Primer intento con la cola llena: el audio espera y se encola después
+    submit_results = [QueueFullError(21, 0.0), 3]
+
+    def fake_submit(*args, **kwargs):
+        result = submit_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        order.append("submitted")
+        return result
+
+    # La espera por la cola llena no bloquea el aviso de las demás descargas
+    with patch("transcriber_app.web.api.background.download_entries", side_effect=fake_download_entries), \
+            patch("transcriber_app.web.api.background.scheduler.submit", side_effect=fake_submit) as mock_submit, \
+            patch("transcriber_app.web.api.background.time.sleep", lambda seconds: reported.wait(2)):
+        background.ingest_url_jobs([("job_a", "u1", {}), ("job_b", "u2", None)], ["tecnico"], "a@b.com")
+
+    assert order == ["reported", "submitted"]
+    args, kwargs = mock_submit.call_args
+    assert args == (process_audio_job,) and kwargs["job_id"] == "job_a"
+    assert kwargs["nombre"] == "a1" and kwargs["modos"] == ["tecnico"]
+    # El job borra el audio descargado al terminar
+    assert kwargs["audio_file"] == "audios/a1.mp3"
+    assert JOB_STATUS["job_a"]["queue_position"] == 3
+    assert [e["stage"] for e in JOB_STATUS["job_a"]["events"]] == ["downloaded", "queued"]
+    assert JOB_STATUS["job_b"]["status"] == "error"
+
+
+def test_process_audio_job_removes_the_audio_it_used(mock_orchestrator, cleanup_job_status, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "audios").mkdir()
+    audio = tmp_path / "audios" / "charla.mp3"
+    audio.write_bytes(b"mp3")
+
+    process_audio_job("mp3_job", "charla", "default", "test@example.com")
+
+    assert JOB_STATUS["mp3_job"]["status"] == "done"
+    assert not audio.exists()
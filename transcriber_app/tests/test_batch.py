@@ -0,0 +1,145 @@
+# transcriber_app/tests/test_batch.py
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from transcriber_app.runner import batch
+from transcriber_app.runner.batch import collect_items, plan_item, run_batch
+
+
+class FakeOrchestrator:
+    """Escribe las salidas como lo haría el pipeline real, sin llamar a los proveedores."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run_audio_multi(self, audio_path, modes):
+        name = Path(audio_path).stem
+        with self._lock:
+            self.calls.append(("audio", audio_path, list(modes)))
+        if name in self.fail:
+            raise RuntimeError("audio corrupto")
+        os.makedirs("transcripts", exist_ok=True)
+        Path("transcripts", f"{name.lower()}.txt").write_text("texto", encoding="utf-8")
+        return self._outputs(name, modes), "texto", {}
+
+    def run_text_multi(self, text_path, modes, name=None):
+        name = name or Path(text_path).stem
+        with self._lock:
+            self.calls.append(("texto", text_path, list(modes)))
+        return self._outputs(name, modes), "texto", {}
+
+    def _outputs(self, name, modes):
+        os.makedirs("outputs", exist_ok=True)
+        files = {}
+        for mode in modes:
+            path = Path("outputs", f"{name}_{mode}.md")
+            path.write_text("resumen", encoding="utf-8")
+            files[mode] = str(path)
+        return files
+
+
+def touch(path, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_collect_items_from_directory_glob_and_manifest(tmp_path):
+    touch(tmp_path / "a.mp3")
+    touch(tmp_path / "b.txt")
+    touch(tmp_path / "notas.pdf")
+    touch(tmp_path / "sub" / "c.webm")
+
+    assert [(i.name, i.kind) for i in collect_items(str(tmp_path))] == [("a", "audio"), ("b", "texto")]
+    assert [i.name for i in collect_items(str(tmp_path / "**" / "*.webm"))] == ["c"]
+
+    manifest = tmp_path / "lote.lst"
+    manifest.write_text("# archivo 2024\nsub/c.webm\n\na.mp3\n", encoding="utf-8")
+    assert [i.name for i in collect_items(str(manifest))] == ["c", "a"]
+
+    manifest.write_text("falta.mp3\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        collect_items(str(manifest))
+
+
+def test_collect_items_rejects_colliding_names(tmp_path):
+    touch(tmp_path / "a" / "intro.mp3")
+    touch(tmp_path / "b" / "intro.mp3")
+    with pytest.raises(ValueError, match="intro.mp3"):
+        collect_items(str(tmp_path / "**" / "*.mp3"))
+
+    touch(tmp_path / "reunion.mp3")
+    touch(tmp_path / "reunion.txt")
+    with pytest.raises(ValueError, match="reunion"):
+        collect_items(str(tmp_path))
+
+
+def test_plan_skips_up_to_date_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    audio = touch(tmp_path / "in" / "reunion.mp3", mtime=1000)
+    touch(tmp_path / "transcripts" / "reunion.txt", mtime=2000)
+    touch(tmp_path / "outputs" / "reunion_tecnico.md", mtime=2000)
+
+    item = plan_item(collect_items(str(audio))[0], ["tecnico"])
+    assert item.status == "skipped"
+
+    # Falta un modo: se resume desde la transcripción, sin volver a transcribir
+    item = plan_item(collect_items(str(audio))[0], ["tecnico", "bullet"])
+    assert item.status == "pending"
+    assert item.from_transcript and item.modes == ["bullet"]
+
+    # El audio es más nuevo que la transcripción: se rehace todo
+    os.utime(audio, (3000, 3000))
+    item = plan_item(collect_items(str(audio))[0], ["tecnico", "bullet"])
+    assert not item.from_transcript and item.modes == ["tecnico", "bullet"]
+
+    item = plan_item(collect_items(str(audio))[0], ["tecnico"], force=True)
+    assert item.modes == ["tecnico"]
+
+
+def test_run_batch_processes_in_parallel_and_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("uno", "dos", "roto"):
+        touch(tmp_path / "archivo" / f"{name}.mp3")
+    orchestrator = FakeOrchestrator(fail={"roto"})
+    lines = []
+
+    report = run_batch(collect_items("archivo"), ["tecnico"], workers=2, orchestrator=orchestrator, out=lines.append)
+
+    assert report["totals"] == {"items": 3, "done": 2, "skipped": 0, "error": 1}
+    by_name = {Path(i["path"]).stem: i for i in report["items"]}
+    assert by_name["uno"]["outputs"] == {"tecnico": str(Path("outputs", "uno_tecnico.md"))}
+    assert by_name["roto"]["error"] == "audio corrupto"
+    assert len(lines) == 3 and lines[-1].startswith("[3/3]")
+    assert any("ETA" in line for line in lines[:-1])
+
+    # Segunda pasada: lo que salió bien está al día, solo se reintenta el fallido
+    orchestrator = FakeOrchestrator()
+    report = run_batch(collect_items("archivo"), ["tecnico"], workers=2, orchestrator=orchestrator, out=lines.append)
+    assert report["totals"]["skipped"] == 2
+    assert orchestrator.calls == [("audio", str(Path("archivo", "roto.mp3")), ["tecnico"])]
+
+
+def test_batch_cli_writes_report(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    touch(tmp_path / "transcripts" / "sprint.txt")
+    monkeypatch.setattr(batch, "build_orchestrator", FakeOrchestrator)
+
+    code = batch.main(["transcripts", "default,tecnico", "--report", "informe.json", "--workers", "1"])
+
+    assert code == 0
+    report = json.loads((tmp_path / "informe.json").read_text(encoding="utf-8"))
+    assert report["modes"] == ["default", "tecnico"]
+    assert report["totals"]["done"] == 1
+    assert "informe.json" in capsys.readouterr().out
+
+    assert batch.main(["transcripts", "inexistente"]) == 2
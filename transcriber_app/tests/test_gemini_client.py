@@ -29,3 +29,18 @@ def test_gemini_model_run_agent_error():
     with pytest.raises(RuntimeError) as excinfo:
         model.run_agent("test", "test text")
     assert "Tipo inesperado" in str(excinfo.value)
+
+
+def test_gemini_model_run_agent_long_text_uses_map_reduce(monkeypatch):
+    from transcriber_app.modules.ai.gemini import client
+
+    monkeypatch.setattr(client, "SUMMARY_CHUNK_TOKENS", 50)
+
+    model = GeminiModel()
+    mock_agent = MagicMock()
+    mock_agent.run.side_effect = lambda prompt: "final" if prompt.startswith("Estos son") else "parcial"
+    model.agents["test"] = mock_agent
+
+    text = " ".join(f"Frase {i}." for i in range(100))
+    assert model.run_agent("test", text) == "final"
+    assert mock_agent.run.call_count > 2
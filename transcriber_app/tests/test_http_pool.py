@@ -0,0 +1,37 @@
+# transcriber_app/tests/test_http_pool.py
+import asyncio
+from unittest.mock import MagicMock
+
+from transcriber_app.modules.ai import http_pool
+from transcriber_app.modules.ai.groq.client import GroqClient
+
+
+def test_get_session_is_shared_per_provider():
+    a = http_pool.get_session("prueba-a")
+    assert http_pool.get_session("prueba-a") is a
+    assert http_pool.get_session("prueba-b") is not a
+    assert a.get_adapter("https://api.groq.com")._pool_maxsize == http_pool.HTTP_POOL_MAXSIZE
+
+
+def test_get_async_client_is_shared_within_a_loop():
+    async def clients():
+        first = http_pool.get_async_client("prueba")
+        second = http_pool.get_async_client("prueba")
+        await http_pool.close_pools()
+        return first, second
+
+    first, second = asyncio.run(clients())
+    assert first is second
+    assert first.is_closed
+
+    # Otro event loop obtiene su propio cliente
+    other, _ = asyncio.run(clients())
+    assert other is not first
+
+
+def test_groq_client_uses_injected_session():
+    session = MagicMock()
+    session.post.return_value.json.return_value = {"choices": [{"message": {"content": "hola"}}]}
+
+    assert GroqClient(session=session).chat("prompt") == "hola"
+    assert session.post.call_args.kwargs["json"]["messages"][0]["content"] == "prompt"
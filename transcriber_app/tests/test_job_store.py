@@ -0,0 +1,78 @@
+# transcriber_app/tests/test_job_store.py
+import threading
+import time
+import pytest
+from transcriber_app.web.api.job_store import MemoryJobStore, SQLiteJobStore, create_job_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryJobStore(ttl_seconds=60)
+    return SQLiteJobStore(path=str(tmp_path / "jobs.db"), ttl_seconds=60)
+
+
+def test_store_behaves_like_dict(store):
+    store["job1"] = {"status": "running"}
+    assert store["job1"] == {"status": "running"}
+    assert store.get("job1")["status"] == "running"
+    assert store.get("missing", "unknown") == "unknown"
+    assert "job1" in store
+    assert len(store) == 1
+
+    del store["job1"]
+    assert "job1" not in store
+
+
+def test_store_merge_keeps_other_fields(store):
+    store["job1"] = {"status": "running", "nombre": "reunion"}
+    data = store.merge("job1", status="done", markdown="# ok")
+    assert data == {"status": "done", "nombre": "reunion", "markdown": "# ok"}
+    assert store["job1"]["markdown"] == "# ok"
+    assert store.count_by_status("done") == 1
+
+
+def test_store_expires_entries(store):
+    store.ttl_seconds = 0.05
+    store["job1"] = {"status": "done"}
+    time.sleep(0.1)
+    assert store.get("job1") is None
+    assert store.purge_expired() == 1
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    worker_a = SQLiteJobStore(path=path)
+    worker_b = SQLiteJobStore(path=path)
+
+    worker_a["job1"] = {"status": "done", "transcription": "hola"}
+    assert worker_b["job1"]["transcription"] == "hola"
+
+
+def test_concurrent_events_are_not_lost(store, tmp_path):
+    # Worker y rutas escriben eventos a la vez; con SQLite, además, desde otra conexión (otro proceso)
+    writers = [store, store]
+    if isinstance(store, SQLiteJobStore):
+        writers[1] = SQLiteJobStore(path=store.path, ttl_seconds=60)
+    store["job1"] = {"status": "running"}
+
+    def write(writer, n):
+        for i in range(25):
+            writer.add_event("job1", {"stage": f"{n}-{i}"}, stage=f"{n}-{i}")
+
+    threads = [threading.Thread(target=write, args=(writer, n)) for n, writer in enumerate(writers * 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    events = store["job1"]["events"]
+    assert len(events) == 100
+    assert [e["seq"] for e in events] == list(range(100))
+    assert store["job1"]["status"] == "running"
+
+
+def test_create_job_store_rejects_unknown_backend():
+    assert isinstance(create_job_store("memory"), MemoryJobStore)
+    with pytest.raises(ValueError):
+        create_job_store("redis")
@@ -0,0 +1,109 @@
+# transcriber_app/tests/test_local_transcriber.py
+
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from transcriber_app.modules.ai.local import transcriber as local
+from transcriber_app.modules.ai.local.transcriber import LocalWhisperTranscriber
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    """Módulo con la API de faster-whisper que registra cómo se usa."""
+    calls = {"models": 0, "batched": [], "plain": []}
+
+    class WhisperModel:
+        def __init__(self, model_size, **kwargs):
+            calls["models"] += 1
+            calls["kwargs"] = kwargs
+
+        def transcribe(self, audio, **kwargs):
+            calls["plain"].append(audio)
+            return iter([SimpleNamespace(text=" sin lotes ")]), SimpleNamespace(duration=1.0)
+
+    class BatchedInferencePipeline:
+        def __init__(self, model):
+            self.model = model
+
+        def transcribe(self, audio, batch_size, **kwargs):
+            calls["batched"].append((audio, batch_size))
+            segments = [SimpleNamespace(text=" hola "), SimpleNamespace(text="mundo ")]
+            return iter(segments), SimpleNamespace(duration=12.5)
+
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = WhisperModel
+    module.BatchedInferencePipeline = BatchedInferencePipeline
+
+    def decode_audio(path, sampling_rate):
+        raise AssertionError("no debe decodificarse el audio completo")
+
+    module.decode_audio = decode_audio
+
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(local, "_models", {})
+    return calls
+
+
+def test_model_is_loaded_once_and_batched(fake_faster_whisper):
+    t1 = LocalWhisperTranscriber(model_size="tiny", batch_size=4)
+    t2 = LocalWhisperTranscriber(model_size="tiny", batch_size=4)
+
+    text, metadata = t1.transcribe("audio.wav")
+    t2.transcribe("audio.wav")
+
+    assert fake_faster_whisper["models"] == 1
+    assert fake_faster_whisper["kwargs"]["compute_type"] == "int8"
+    assert fake_faster_whisper["batched"][0] == ("audio.wav", 4)
+    assert text == "hola mundo"
+    assert metadata["engine"] == "local-whisper"
+    assert metadata["audio_duration"] == 12.5
+
+
+def test_batch_size_one_uses_plain_model(fake_faster_whisper):
+    text, _ = LocalWhisperTranscriber(batch_size=1).transcribe("audio.wav")
+    assert text == "sin lotes"
+    assert fake_faster_whisper["plain"] == ["audio.wav"]
+
+
+def test_transcribe_range_decodes_only_the_window(fake_faster_whisper, monkeypatch):
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        # 3 s de PCM s16le a 16 kHz
+        return SimpleNamespace(stdout=b"\x00\x40" * 3 * local.SAMPLE_RATE)
+
+    class FakeArray(list):
+        def astype(self, dtype):
+            return self
+
+        def __truediv__(self, scale):
+            return FakeArray(v / scale for v in self)
+
+    numpy = types.ModuleType("numpy")
+    numpy.int16, numpy.float32 = "int16", "float32"
+    numpy.frombuffer = lambda data, dtype: FakeArray(int.from_bytes(data[i:i + 2], "little", signed=True)
+                                                     for i in range(0, len(data), 2))
+    monkeypatch.setitem(sys.modules, "numpy", numpy)
+    monkeypatch.setattr(local.subprocess, "run", run)
+
+    LocalWhisperTranscriber().transcribe_range("audio.wav", start=2, duration=3)
+
+    # ffmpeg busca el inicio y corta la duración: solo se decodifica la ventana
+    cmd = commands[0]
+    assert cmd[cmd.index("-ss") + 1] == "2.000" and cmd.index("-ss") < cmd.index("-i")
+    assert cmd[cmd.index("-t") + 1] == "3.000"
+    samples, _ = fake_faster_whisper["batched"][0]
+    assert len(samples) == 3 * local.SAMPLE_RATE
+    assert samples[0] == 0.5
+
+
+def test_missing_dependency_raises_clear_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    monkeypatch.setattr(local, "_models", {})
+
+    with pytest.raises(RuntimeError, match="faster-whisper no está instalado"):
+        LocalWhisperTranscriber().transcribe("audio.wav")
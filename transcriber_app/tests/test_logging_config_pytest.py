@@ -1,4 +1,9 @@
 import logging
+import logging.handlers
+import os
+
+import pytest
+
 from transcriber_app.modules.logging.logging_config import setup_logging, LOG_DIR
 
 
@@ -10,3 +15,93 @@ def test_setup_logging_returns_logger_and_log_dir_exists(tmp_path, monkeypatch):
     assert logger.propagate is True
     # LOG_DIR should exist (created at import time)
     assert LOG_DIR.exists()
+
+
+def test_json_formatter_includes_extra_fields():
+    from transcriber_app.modules.logging.logging_config import JsonFormatter
+    import json
+
+    record = logging.makeLogRecord({"msg": "hola %s", "args": ("mundo",), "levelno": logging.INFO,
+                                    "levelname": "INFO", "name": "t", "job_id": "j1"})
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hola mundo"
+    assert entry["level"] == "INFO"
+    assert entry["job_id"] == "j1"
+
+
+def test_debug_sampler_only_drops_debug():
+    from transcriber_app.modules.logging.logging_config import DebugSampler
+
+    sampler = DebugSampler(0.0)
+    assert not sampler.filter(logging.makeLogRecord({"levelno": logging.DEBUG}))
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.WARNING}))
+
+
+def test_queue_handler_defers_formatting_to_listener():
+    import queue
+    from transcriber_app.modules.logging.logging_config import DeferredQueueHandler, preview
+
+    class Expensive:
+        calls = 0
+
+        def __repr__(self):
+            Expensive.calls += 1
+            return "x" * 1000
+
+    q = queue.SimpleQueue()
+    logger = logging.getLogger("test_deferred")
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(q))
+    logger.setLevel(logging.DEBUG)
+
+    logger.debug("respuesta: %s", preview(Expensive(), 10))
+
+    record = q.get_nowait()
+    assert Expensive.calls == 0  # nada formateado en el hilo que loguea
+    assert record.getMessage() == "respuesta: " + "x" * 10
+    assert Expensive.calls == 1
+
+
+def test_setup_logging_defaults_to_env_level(monkeypatch):
+    from transcriber_app.modules.logging import logging_config
+
+    monkeypatch.setattr(logging_config, "LOG_LEVEL", "WARNING")
+    assert setup_logging("test_env_level").level == logging.WARNING
+    assert setup_logging("test_env_level", level=logging.DEBUG).level == logging.DEBUG
+
+
+def test_worker_processes_never_share_a_rotating_file(tmp_path, monkeypatch):
+    from transcriber_app.modules.logging import logging_config
+
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(logging_config.multiprocessing, "parent_process", lambda: None)
+    assert logging_config.log_file_path("size") == tmp_path / "transcribeapp.log"
+
+    # En un worker hijo, cada proceso rota su propio fichero
+    monkeypatch.setattr(logging_config.multiprocessing, "parent_process", lambda: object())
+    assert logging_config.log_file_path("size").name == f"transcribeapp.{os.getpid()}.log"
+    # Con rotación externa todos escriben en el mismo y lo reabren al rotarse
+    assert logging_config.log_file_path("external") == tmp_path / "transcribeapp.log"
+
+    handler = logging_config._build_file_handler("external", 0, 0)
+    try:
+        assert isinstance(handler, logging.handlers.WatchedFileHandler)
+    finally:
+        handler.close()
+    with pytest.raises(ValueError):
+        logging_config._build_file_handler("daily", 0, 0)
+
+
+def test_stale_per_process_logs_are_purged(tmp_path, monkeypatch):
+    from transcriber_app.modules.logging import logging_config
+
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(logging_config, "_pid_alive", lambda pid: pid == os.getpid())
+    for name in ("transcribeapp.11.log", "transcribeapp.11.log.1", f"transcribeapp.{os.getpid()}.log",
+                 "transcribeapp.log", "transcribeapp.log.1"):
+        (tmp_path / name).write_text("x", encoding="utf-8")
+
+    assert logging_config.purge_stale_logs() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [f"transcribeapp.{os.getpid()}.log", "transcribeapp.log", "transcribeapp.log.1"]
+    )
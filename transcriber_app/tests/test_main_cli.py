@@ -31,3 +31,32 @@ def test_main_cli_texto(monkeypatch):
             main()
 
         instance.run_text.assert_called_once_with("transcripts/test.txt", "default")
+
+
+def test_main_cli_multiple_modes(monkeypatch):
+    with patch("transcriber_app.main.Orchestrator") as mock_orch:
+        instance = mock_orch.return_value
+        instance.run_text_multi.return_value = (
+            {"tecnico": "a.md", "bullet": "b.md"}, "txt", {"tecnico": "s1", "bullet": "s2"}
+        )
+
+        test_args = ["main.py", "texto", "test.txt", "tecnico,bullet"]
+        monkeypatch.setattr(sys, "argv", test_args)
+
+        with patch("builtins.print"):
+            main()
+
+        instance.run_text_multi.assert_called_once_with("transcripts/test.txt", ["tecnico", "bullet"])
+        instance.run_text.assert_not_called()
+
+
+def test_main_cli_batch_subcommand(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["main.py", "batch", "audios/", "tecnico", "--workers", "2"])
+
+    with patch("transcriber_app.main.batch.main", return_value=0) as mock_batch:
+        try:
+            main()
+        except SystemExit as e:
+            assert e.code == 0
+
+    mock_batch.assert_called_once_with(["audios/", "tecnico", "--workers", "2"])
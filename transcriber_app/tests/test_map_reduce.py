@@ -0,0 +1,73 @@
+# transcriber_app/tests/test_map_reduce.py
+import asyncio
+import threading
+import time
+
+from transcriber_app.modules.ai.map_reduce import (
+    estimate_tokens,
+    map_reduce_summarize,
+    map_reduce_summarize_async,
+    split_transcript,
+)
+
+
+def test_split_transcript_respects_budget_and_sentences():
+    text = " ".join(f"Frase número {i} de la reunión." for i in range(200))
+    chunks = split_transcript(text, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 101 for c in chunks)
+    # No se parte ninguna frase
+    assert all(c.rstrip().endswith(".") for c in chunks)
+    assert " ".join(chunks).replace("\n", " ").split() == text.split()
+
+
+def test_split_transcript_prefers_speaker_turns():
+    text = "\n".join(f"Ana: intervención {i}. Con dos frases." if i % 2 else f"Luis: respuesta {i}."
+                     for i in range(40))
+    chunks = split_transcript(text, max_tokens=60)
+
+    for chunk in chunks:
+        assert all(line.startswith(("Ana:", "Luis:")) for line in chunk.splitlines())
+
+
+def test_map_reduce_short_text_is_single_call():
+    calls = []
+    assert map_reduce_summarize(lambda p: calls.append(p) or "resumen", "texto corto", max_tokens=100) == "resumen"
+    assert calls == ["texto corto"]
+
+
+def test_map_reduce_maps_in_parallel_then_reduces():
+    text = " ".join(f"Frase {i}." for i in range(100))
+    n_chunks = len(split_transcript(text, max_tokens=50))
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+    prompts = []
+
+    def run(prompt):
+        prompts.append(prompt)
+        if prompt.startswith("A continuación"):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return "parcial"
+        return "final"
+
+    result = map_reduce_summarize(run, text, max_tokens=50, max_workers=2)
+
+    assert result == "final"
+    assert active["max"] == 2
+    assert len(prompts) == n_chunks + 1
+    assert prompts[-1].startswith("Estos son") and "### Parte 1\nparcial" in prompts[-1]
+
+
+def test_map_reduce_async():
+    text = " ".join(f"Frase {i}." for i in range(100))
+
+    async def run(prompt):
+        return "parcial" if prompt.startswith("A continuación") else "final"
+
+    assert asyncio.run(map_reduce_summarize_async(run, text, max_tokens=50)) == "final"
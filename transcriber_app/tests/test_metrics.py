@@ -0,0 +1,81 @@
+# transcriber_app/tests/test_metrics.py
+
+import sys
+from unittest.mock import patch
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+
+from transcriber_app.modules import metrics
+from transcriber_app.modules.ai.rate_limiter import governed_call
+from transcriber_app.modules.metrics import Counter, Histogram, time_stage
+from transcriber_app.web.web_app import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(1, 5))
+    hist.observe(0.5, stage="upload")
+    hist.observe(3, stage="upload")
+
+    lines = hist.render()
+    assert 'demo_seconds_bucket{stage="upload",le="1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="upload",le="5"} 2' in lines
+    assert 'demo_seconds_bucket{stage="upload",le="+Inf"} 2' in lines
+    assert 'demo_seconds_sum{stage="upload"} 3.5' in lines
+    assert 'demo_seconds_count{stage="upload"} 2' in lines
+
+
+def test_counter_rejects_unknown_labels():
+    counter = Counter("demo_total", "Demo.", ("status",))
+    with pytest.raises(ValueError):
+        counter.inc(estado="done")
+
+
+def test_time_stage_counts_failures():
+    before = metrics.STAGE_ERRORS.value(stage="demo")
+    with pytest.raises(RuntimeError):
+        with time_stage("demo"):
+            raise RuntimeError("fallo")
+
+    assert metrics.STAGE_ERRORS.value(stage="demo") == before + 1
+    assert metrics.STAGE_SECONDS.count(stage="demo") >= 1
+
+
+def test_provider_429_is_counted_without_governor():
+    response = requests.Response()
+    response.status_code = 429
+    before = metrics.PROVIDER_THROTTLED.value(provider="demo")
+
+    governed_call("demo", None, lambda: response)
+
+    assert metrics.PROVIDER_THROTTLED.value(provider="demo") == before + 1
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    with time_stage("transcription"):
+        pass
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE transcriber_stage_seconds histogram" in response.text
+    assert 'transcriber_stage_seconds_count{stage="transcription"}' in response.text
+    assert "transcriber_queue_depth " in response.text
+    assert "transcriber_jobs_in_flight 0" in response.text
+
+
+def test_streamed_encoding_is_timed_as_encode_upload():
+    from transcriber_app.modules.ai.groq import transcriber as groq
+
+    # "ffmpeg" de prueba que escribe unos bytes en stdout
+    fake_cmd = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'audio')"]
+    before = metrics.STAGE_SECONDS.count(stage="encode_upload"), metrics.STAGE_SECONDS.count(stage="ffmpeg")
+
+    with patch.object(groq, "ffmpeg_command", return_value=fake_cmd):
+        assert b"".join(groq.stream_encoded("audio.webm")) == b"audio"
+
+    # La subida consume la salida mientras ffmpeg corre: no se mide como ffmpeg
+    assert metrics.STAGE_SECONDS.count(stage="encode_upload") == before[0] + 1
+    assert metrics.STAGE_SECONDS.count(stage="ffmpeg") == before[1]
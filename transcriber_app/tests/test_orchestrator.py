@@ -41,3 +41,21 @@ def test_orchestrator_runs(monkeypatch):
     assert out == "test_tecnico.md"
     assert text == "contenido de prueba"
     assert summary == "resumen generado"
+
+
+def test_orchestrator_run_audio_async(monkeypatch):
+    import asyncio
+    from transcriber_app.modules.ai.ai_manager import AIManager
+
+    async def fake_summarize_async(text, mode):
+        return f"resumen de {text}"
+
+    monkeypatch.setattr(AIManager, "summarize_async", fake_summarize_async)
+
+    # DummyTranscriber no tiene transcribe_async: se ejecuta en un hilo
+    orch = Orchestrator(DummyReceiver(), DummyTranscriber(), DummyFormatter())
+    out, text, summary = asyncio.run(orch.run_audio_async("audios/test.mp3", "tecnico"))
+
+    assert out == "test_tecnico.md"
+    assert text == "texto transcrito"
+    assert summary == "resumen de texto transcrito"
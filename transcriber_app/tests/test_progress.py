@@ -0,0 +1,39 @@
+# transcriber_app/tests/test_progress.py
+from unittest.mock import patch
+
+from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+from transcriber_app.modules.progress import progress_listener, report_progress
+
+
+def test_report_progress_without_listener_is_noop():
+    report_progress("converting")
+
+
+def test_progress_listener_receives_stages_and_ignores_errors():
+    events = []
+    with progress_listener(lambda stage, info: events.append((stage, info))):
+        report_progress("transcribing", chunk=1, chunks=2)
+    report_progress("fuera")
+
+    assert events == [("transcribing", {"chunk": 1, "chunks": 2})]
+
+    def failing(stage, info):
+        raise RuntimeError("oyente roto")
+
+    with progress_listener(failing):
+        report_progress("summarizing")
+
+
+def test_groq_transcriber_reports_chunk_progress():
+    t = GroqTranscriber(chunk_seconds=100, overlap_seconds=5, max_workers=3, split_on_silence=False)
+    events = []
+
+    with patch("transcriber_app.modules.ai.groq.transcriber.GROQ_API_KEY", "fake_key"):
+        with patch("transcriber_app.modules.ai.groq.transcriber.probe_duration", return_value=250.0):
+            with patch.object(t, "_transcribe_segment", return_value="texto"):
+                with progress_listener(lambda stage, info: events.append((stage, info))):
+                    t.transcribe("audios/largo.mp3")
+
+    assert events[0] == ("converting", {})
+    assert [info["chunk"] for stage, info in events[1:]] == [0, 1, 2, 3]
+    assert all(info["chunks"] == 3 for _, info in events[1:])
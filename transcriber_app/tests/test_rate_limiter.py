@@ -0,0 +1,220 @@
+# transcriber_app/tests/test_rate_limiter.py
+
+import asyncio
+
+import pytest
+import requests
+
+from transcriber_app.modules.ai import rate_limiter
+from transcriber_app.modules.ai.rate_limiter import (
+    AdaptiveConcurrency,
+    MemoryBucketStore,
+    ProviderGovernor,
+    RateLimitTimeout,
+    SQLiteBucketStore,
+    throttle_delay,
+)
+
+
+def response(status, retry_after=None):
+    resp = requests.Response()
+    resp.status_code = status
+    if retry_after is not None:
+        resp.headers["Retry-After"] = retry_after
+    return resp
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Reloj simulado: las esperas se registran y adelantan el reloj sin dormir."""
+    waited = []
+    clock = [1000.0]
+
+    def sleep(seconds):
+        waited.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleep)
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: clock[0])
+    return waited
+
+
+@pytest.mark.parametrize("store_factory", [MemoryBucketStore, "sqlite"])
+def test_bucket_refills_over_time(store_factory, tmp_path, monkeypatch):
+    store = SQLiteBucketStore(tmp_path / "limits.db") if store_factory == "sqlite" else store_factory()
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+
+    # 2 peticiones por segundo, ráfaga de 2
+    assert store.take("k", 1, rate=2, capacity=2) == 0
+    assert store.take("k", 1, rate=2, capacity=2) == 0
+    assert store.take("k", 1, rate=2, capacity=2) == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert store.take("k", 1, rate=2, capacity=2) == 0
+
+
+def test_aimd_halves_on_throttle_and_grows_on_success():
+    limiter = AdaptiveConcurrency(initial=4, maximum=8)
+    assert all(limiter.try_acquire() for _ in range(4))
+    assert not limiter.try_acquire()
+
+    limiter.release(throttled=True)
+    assert limiter.limit == 2
+    for _ in range(3):
+        limiter.release()
+    assert limiter.limit > 3
+
+
+def test_throttle_delay_reads_retry_after():
+    assert throttle_delay(response(200)) is None
+    assert throttle_delay(response(429, "7")) == 7.0
+    assert throttle_delay(requests.HTTPError(response=response(429))) == 0.0
+
+    class ResourceExhausted(Exception):
+        code = 429
+
+    assert throttle_delay(ResourceExhausted()) == 0.0
+
+
+def test_call_waits_and_retries_after_429(sleeps):
+    outcomes = [response(429, "2"), response(200)]
+    governor = ProviderGovernor("groq", {"requests_per_minute": 60}, max_wait=30)
+
+    result = governor.call(lambda: outcomes.pop(0))
+
+    assert result.status_code == 200
+    assert governor.concurrency.limit < 4  # la concurrencia se redujo tras el 429
+    assert governor.store.blocked_until("groq") > 0
+    assert sum(sleeps) > 0
+
+
+def test_call_gives_up_after_max_retries(sleeps):
+    governor = ProviderGovernor("groq", {}, max_retries=1, max_wait=30)
+    calls = []
+
+    result = governor.call(lambda: calls.append(1) or response(429, "0"))
+
+    assert result.status_code == 429
+    assert len(calls) == 2
+
+
+def test_acquire_times_out_instead_of_waiting_forever(sleeps):
+    governor = ProviderGovernor("groq", {"audio_seconds_per_hour": 60}, max_wait=5)
+    governor.acquire({"audio_seconds": 60})
+
+    with pytest.raises(RateLimitTimeout):
+        governor.acquire({"audio_seconds": 60})
+
+
+def test_call_async_retries_exceptions(monkeypatch):
+    class Throttled(Exception):
+        code = 429
+
+    attempts = []
+
+    async def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise Throttled()
+        return "ok"
+
+    governor = ProviderGovernor("gemini", {"requests_per_minute": 600}, max_wait=30)
+    monkeypatch.setattr(rate_limiter, "DEFAULT_THROTTLE_DELAY", 0.01)
+    assert asyncio.run(governor.call_async(fn)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_governed_call_is_direct_when_disabled():
+    # conftest desactiva las cuotas
+    assert rate_limiter.get_governor("groq") is None
+    assert rate_limiter.governed_call("groq", "m", lambda: "directo") == "directo"
+
+
+def test_waiting_for_a_slot_does_not_spend_tokens(sleeps):
+    # Una sola plaza y 20 peticiones/minuto; el reloj no avanza, así que no hay recarga
+    governor = ProviderGovernor("groq", {"requests_per_minute": 20},
+                                concurrency=AdaptiveConcurrency(initial=1, maximum=1), max_wait=30)
+    governor.acquire({})
+
+    for _ in range(50):
+        assert governor._try_acquire({}) == rate_limiter.POLL_SECONDS
+    governor.concurrency.release()
+
+    # Quedan las 19 peticiones restantes del bucket
+    for _ in range(19):
+        assert governor._try_acquire({}) == 0
+        governor.concurrency.release()
+    assert governor._try_acquire({}) > 0
+
+
+@pytest.mark.parametrize("store_factory", [MemoryBucketStore, "sqlite"])
+def test_short_dimension_does_not_consume_the_others(store_factory, tmp_path, sleeps):
+    store = SQLiteBucketStore(tmp_path / "limits.db") if store_factory == "sqlite" else store_factory()
+    governor = ProviderGovernor("groq", {"requests_per_minute": 2, "audio_seconds_per_hour": 60},
+                                store=store, max_wait=30)
+    governor.acquire({"audio_seconds": 60})
+    governor.concurrency.release()
+
+    # Sin segundos de audio: la petición espera sin gastar del bucket de peticiones
+    for _ in range(5):
+        assert governor._try_acquire({"audio_seconds": 30}) > 0
+    assert governor.concurrency.inflight == 0
+    assert governor._try_acquire({}) == 0
+
+
+def test_stream_holds_the_slot_until_consumed():
+    governor = ProviderGovernor("gemini", {}, concurrency=AdaptiveConcurrency(initial=1, maximum=1))
+
+    stream = governor.call(lambda: iter(["a", "b"]), stream=True)
+    assert governor.concurrency.inflight == 1
+    assert governor._try_acquire({}) == rate_limiter.POLL_SECONDS
+
+    assert list(stream) == ["a", "b"]
+    assert governor.concurrency.inflight == 0
+
+    # Un stream abandonado devuelve la plaza al cerrarlo
+    governor.call(lambda: iter(["a"]), stream=True).close()
+    assert governor.concurrency.inflight == 0
+
+
+def test_async_stream_holds_the_slot_until_consumed():
+    governor = ProviderGovernor("gemini", {}, concurrency=AdaptiveConcurrency(initial=1, maximum=1))
+
+    async def chunks():
+        yield "a"
+        yield "b"
+
+    async def fn():
+        return chunks()
+
+    async def consume():
+        stream = await governor.call_async(fn, stream=True)
+        assert governor.concurrency.inflight == 1
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(consume()) == ["a", "b"]
+    assert governor.concurrency.inflight == 0
+
+
+def test_saturated_when_blocked_or_without_free_slots(sleeps):
+    governor = ProviderGovernor("groq", {}, concurrency=AdaptiveConcurrency(initial=1, maximum=1))
+    assert not governor.saturated()
+
+    governor.acquire({})
+    assert governor.saturated()
+    governor.concurrency.release()
+    assert not governor.saturated()
+
+    governor.store.block("groq", rate_limiter.time.time() + 10)
+    assert governor.saturated()
+
+
+def test_budget_is_spent_without_waiting(sleeps, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_store", MemoryBucketStore())
+
+    assert [rate_limiter.try_take_budget("vista", 2) for _ in range(3)] == [True, True, False]
+    assert sleeps == []
+    # 0 = sin límite
+    assert rate_limiter.try_take_budget("otro", 0)
@@ -0,0 +1,186 @@
+# transcriber_app/tests/test_retry_checkpoints.py
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from transcriber_app.modules import retry
+from transcriber_app.modules.checkpoints import JobCheckpoint, checkpoint_scope, checkpointed_chunk
+from transcriber_app.modules.retry import backoff_delay, is_transient, retry_call
+from transcriber_app.runner.orchestrator import Orchestrator
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+def test_is_transient():
+    assert is_transient(http_error(503))
+    assert is_transient(http_error(429))
+    assert not is_transient(http_error(400))
+    assert is_transient(requests.ConnectionError())
+    # ffmpeg: un error de salida es determinista (audio corrupto); una señal o un timeout, no
+    assert not is_transient(subprocess.CalledProcessError(1, "ffmpeg"))
+    assert is_transient(subprocess.CalledProcessError(-9, "ffmpeg"))
+    assert is_transient(subprocess.TimeoutExpired("ffmpeg", 60))
+    assert not is_transient(ValueError("bug"))
+
+
+def test_backoff_delay_is_capped_full_jitter():
+    delays = [backoff_delay(10, base_delay=1, max_delay=5) for _ in range(50)]
+    assert all(0 <= d <= 5 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_call_retries_only_transient_errors():
+    outcomes = [requests.ConnectionError(), "ok"]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert retry_call(flaky, attempts=3) == "ok"
+
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bug")
+
+    with pytest.raises(ValueError):
+        retry_call(broken, attempts=3)
+    assert len(calls) == 1
+
+
+def test_checkpointed_chunk_reuses_saved_text(tmp_path):
+    checkpoint = JobCheckpoint("job/1", base_dir=tmp_path)
+    assert checkpointed_chunk(checkpoint, "0.00+10.00", lambda: "hola") == "hola"
+    assert checkpointed_chunk(checkpoint, "0.00+10.00", lambda: pytest.fail("no debía recalcularse")) == "hola"
+
+    checkpoint.clear()
+    assert not checkpoint.dir.exists()
+
+
+class Receiver:
+    def load(self, path):
+        return {"name": "reunion", "path": path}
+
+
+class Formatter:
+    def save_transcription(self, *args, **kwargs):
+        return True
+
+    def save_metrics(self, *args, **kwargs):
+        return True
+
+    def save_output(self, name, summary, mode, enforce_save=True):
+        return f"{name}_{mode}.md"
+
+
+class CountingTranscriber:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, path):
+        self.calls += 1
+        return "texto", {"engine": "fake"}
+
+
+def test_retried_job_resumes_from_last_stage(tmp_path):
+    from transcriber_app.modules.ai.ai_manager import AIManager
+
+    transcriber = CountingTranscriber()
+    orch = Orchestrator(Receiver(), transcriber, Formatter(), save_files=False, cache=None)
+    checkpoint = JobCheckpoint("job-1", base_dir=tmp_path)
+
+    # Primer intento: la transcripción termina y el resumen falla de forma definitiva
+    with checkpoint_scope(checkpoint), \
+            patch.object(AIManager, "summarize", side_effect=http_error(400)):
+        with pytest.raises(requests.HTTPError):
+            orch.run_audio("audios/reunion.mp3", "tecnico")
+
+    # Segundo intento: se reutiliza la transcripción; el 503 no se reintenta en la etapa
+    # (dentro de un job reintenta el job entero)
+    with checkpoint_scope(checkpoint), \
+            patch.object(AIManager, "summarize", side_effect=[http_error(503), "resumen"]) as summarize:
+        with pytest.raises(requests.HTTPError):
+            orch.run_audio("audios/reunion.mp3", "tecnico")
+        _, text, summary = orch.run_audio("audios/reunion.mp3", "tecnico")
+
+    assert transcriber.calls == 1
+    assert (text, summary) == ("texto", "resumen")
+    assert summarize.call_count == 2
+    assert checkpoint.load_summary("tecnico") == "resumen"
+
+
+def test_stage_retries_only_outside_jobs(tmp_path):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise requests.ConnectionError()
+
+    with pytest.raises(requests.ConnectionError):
+        retry_call(flaky)
+    assert len(calls) == retry.RETRY_ATTEMPTS
+
+    calls.clear()
+    with checkpoint_scope(JobCheckpoint("job-2", base_dir=tmp_path)), pytest.raises(requests.ConnectionError):
+        retry_call(flaky)
+    assert len(calls) == 1
+
+
+def test_background_requeues_transient_failures(monkeypatch):
+    from transcriber_app.web.api import background
+
+    scheduled = []
+    monkeypatch.setattr(background, "schedule_job_retry",
+                        lambda job_id, e, attempt, **p: scheduled.append((attempt, p["prioridad"])))
+
+    with patch("transcriber_app.web.api.background.Orchestrator") as mock, \
+            patch("transcriber_app.web.api.background.Path.exists", return_value=True), \
+            patch("transcriber_app.web.api.background.os.remove") as mock_remove:
+        mock.return_value.run_audio.side_effect = requests.ConnectionError("caído")
+        background.process_audio_job("retry_job", "test", "default", "a@b.com", prioridad=5)
+
+    assert scheduled == [(1, 5)]
+    # El audio se conserva para el reintento
+    mock_remove.assert_not_called()
+    background.JOB_STATUS.clear()
+
+
+def test_job_retry_keeps_priority_and_waits_for_a_full_queue(monkeypatch):
+    from transcriber_app.web.api import background
+    from transcriber_app.web.api.scheduler import QueueFullError
+
+    class ImmediateTimer:
+        def __init__(self, delay, fn):
+            self.fn = fn
+
+        def start(self):
+            self.fn()
+
+    monkeypatch.setattr(background.threading, "Timer", ImmediateTimer)
+    background.JOB_STATUS["retry_job"] = {"status": "running"}
+    with patch("transcriber_app.web.api.background.scheduler.submit",
+               side_effect=[QueueFullError(3, 10.0), 1]) as mock_submit:
+        background.schedule_job_retry("retry_job", requests.ConnectionError("caído"), 1,
+                                      nombre="test", modo="default", email="a@b.com", prioridad=5)
+
+    # La cola llena no lo da por perdido: espera y lo encola con la prioridad original
+    assert mock_submit.call_count == 2
+    kwargs = mock_submit.call_args.kwargs
+    assert kwargs["priority"] == 5 and kwargs["attempt"] == 2
+    assert background.JOB_STATUS["retry_job"]["status"] == "queued"
+    background.JOB_STATUS.clear()
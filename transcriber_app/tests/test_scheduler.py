@@ -0,0 +1,63 @@
+# transcriber_app/tests/test_scheduler.py
+import threading
+import pytest
+from transcriber_app.web.api.scheduler import JobScheduler, QueueFullError
+
+
+def test_scheduler_runs_higher_priority_first():
+    scheduler = JobScheduler(workers=1, max_queue=10)
+    gate = threading.Event()
+    order = []
+
+    # El primer job bloquea al único worker mientras se encolan los demás
+    scheduler.submit(gate.wait, label="bloqueo")
+    scheduler.submit(order.append, "normal", label="normal")
+    scheduler.submit(order.append, "urgente", priority=5, label="urgente")
+    gate.set()
+    scheduler.shutdown(wait=True)
+
+    assert order == ["urgente", "normal"]
+
+
+def test_scheduler_rejects_when_queue_full():
+    scheduler = JobScheduler(workers=1, max_queue=1)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def bloqueo():
+        started.set()
+        gate.wait()
+
+    scheduler.submit(bloqueo)
+    started.wait(timeout=5)
+    scheduler.submit(lambda: None)
+
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.submit(lambda: None)
+
+    assert excinfo.value.queue_position == 2
+    assert excinfo.value.estimated_wait > 0
+
+    gate.set()
+    scheduler.shutdown(wait=True)
+
+
+def test_scheduler_limits_concurrency():
+    scheduler = JobScheduler(workers=2, max_queue=10)
+    lock = threading.Lock()
+    state = {"running": 0, "max": 0}
+    gate = threading.Event()
+
+    def job():
+        with lock:
+            state["running"] += 1
+            state["max"] = max(state["max"], state["running"])
+        gate.wait(timeout=0.05)
+        with lock:
+            state["running"] -= 1
+
+    for _ in range(6):
+        scheduler.submit(job)
+    scheduler.shutdown(wait=True)
+
+    assert state["max"] <= 2
@@ -0,0 +1,67 @@
+# transcriber_app/tests/test_summary_cache.py
+from transcriber_app.modules.ai import ai_manager
+from transcriber_app.modules.ai.ai_manager import AIManager
+from transcriber_app.modules.ai.summary_cache import MemoryLRUBackend, SQLiteBackend, SummaryCache, make_key
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryLRUBackend(max_entries=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+
+
+def test_sqlite_backend_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "summaries.db")
+    backend = SQLiteBackend(path=path, max_entries=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.set("c", "3")
+
+    other_worker = SQLiteBackend(path=path, max_entries=2)
+    assert other_worker.get("a") is None
+    assert other_worker.get("c") == "3"
+
+
+def test_tiered_cache_promotes_and_counts(tmp_path):
+    memory = MemoryLRUBackend()
+    disk = SQLiteBackend(path=str(tmp_path / "summaries.db"))
+    disk.set("k", "resumen")
+    cache = SummaryCache([memory, disk])
+
+    assert cache.get("k") == "resumen"
+    assert memory.get("k") == "resumen"
+    assert cache.get("otra") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_make_key_depends_on_every_component():
+    base = make_key("texto", "tecnico", "gemini", "v1")
+    assert base == make_key("texto", "tecnico", "gemini", "v1")
+    assert base != make_key("texto", "bullet", "gemini", "v1")
+    assert base != make_key("texto", "tecnico", "gemini", "v2")
+    assert base != make_key("otro texto", "tecnico", "gemini", "v1")
+
+
+def test_summarize_uses_cache_and_prompt_version(monkeypatch):
+    cache = SummaryCache([MemoryLRUBackend()])
+    monkeypatch.setattr(ai_manager, "get_summary_cache", lambda: cache)
+
+    calls = []
+    gemini = AIManager.get_model("gemini")
+    monkeypatch.setattr(gemini, "run_agent", lambda mode, text: calls.append(mode) or f"resumen {len(calls)}")
+
+    assert AIManager.summarize("transcripción", "tecnico") == "resumen 1"
+    assert AIManager.summarize("transcripción", "tecnico") == "resumen 1"
+    assert len(calls) == 1
+
+    # Cambiar el prompt del agente invalida la entrada
+    agent = AIManager.get_agent("tecnico")
+    monkeypatch.setattr(agent, "system_prompt", agent.system_prompt + "\nNueva instrucción")
+    assert AIManager.summarize("transcripción", "tecnico") == "resumen 2"
+    assert cache.stats()["hits"] == 1
@@ -5,7 +5,9 @@ from transcriber_app.modules.transcriber_cli import Transcriber
 
 @pytest.fixture
 def mock_groq_api():
-    with patch("transcriber_app.modules.ai.groq.transcriber.requests.post") as mock_post:
+    mock_session = MagicMock()
+    with patch("transcriber_app.modules.ai.groq.transcriber.get_session", return_value=mock_session):
+        mock_post = mock_session.post
         # Mocking the response from Groq
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -24,3 +26,42 @@ def test_transcribe_returns_text(mock_groq_api):
     t = Transcriber()
     out = t.transcribe("audios/ejemplo.mp3")
     assert "simulated transcription from groq" in out
+
+
+def test_multipart_stream_wraps_chunks():
+    from transcriber_app.modules.ai.groq.transcriber import multipart_stream
+
+    body = b"".join(multipart_stream(
+        {"model": "whisper"}, "file", "audio.flac", "audio/flac", iter([b"abc", b"def"]), "XYZ"
+    ))
+
+    assert body.startswith(b'--XYZ\r\nContent-Disposition: form-data; name="model"\r\n\r\nwhisper\r\n')
+    assert b'name="file"; filename="audio.flac"\r\nContent-Type: audio/flac\r\n\r\nabcdef\r\n--XYZ--\r\n' in body
+
+
+def test_stream_encoded_reads_process_stdout():
+    import subprocess
+    import sys
+    from transcriber_app.modules.ai.groq import transcriber
+
+    fake_cmd = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'x' * 200000)"]
+    with patch.object(transcriber, "ffmpeg_command", return_value=fake_cmd):
+        data = b"".join(transcriber.stream_encoded("audio.mp3"))
+    assert data == b"x" * 200000
+
+    failing_cmd = [sys.executable, "-c", "import sys; sys.exit(1)"]
+    with patch.object(transcriber, "ffmpeg_command", return_value=failing_cmd):
+        with pytest.raises(subprocess.CalledProcessError):
+            b"".join(transcriber.stream_encoded("audio.mp3"))
+
+
+def test_groq_transcriber_streams_upload_without_temp_file(mock_groq_api):
+    from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+
+    t = GroqTranscriber(stream_upload=True, audio_codec="flac")
+    text, meta = t.transcribe("audios/ejemplo.mp3")
+
+    assert text == "simulated transcription from groq"
+    kwargs = mock_groq_api.call_args.kwargs
+    assert kwargs["headers"]["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert "files" not in kwargs
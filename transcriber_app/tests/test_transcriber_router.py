@@ -0,0 +1,109 @@
+# transcriber_app/tests/test_transcriber_router.py
+
+import threading
+
+import pytest
+import requests
+
+from transcriber_app.modules.ai import transcriber_router
+from transcriber_app.modules.ai.transcriber_router import BackendStats, RoutingTranscriber, is_retryable
+from transcriber_app.modules.progress import progress_listener, report_progress
+
+
+@pytest.fixture(autouse=True)
+def fixed_duration(monkeypatch):
+    monkeypatch.setattr(transcriber_router, "probe_duration", lambda path: 100.0)
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+class FakeBackend:
+    def __init__(self, name, error=None, gate=None):
+        self.name = name
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+
+    def transcribe(self, audio_path):
+        self.calls += 1
+        report_progress("transcribing", backend=self.name)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return f"texto de {self.name}", {"engine": self.name}
+
+
+def make_router(**backends):
+    return RoutingTranscriber(backends, backends=list(backends), hedge_min_seconds=0.05)
+
+
+def test_prefers_backend_with_lower_estimate():
+    router = make_router(groq=FakeBackend("groq"), local=FakeBackend("local"))
+    assert router.ranked_backends(100) == ["groq", "local"]
+
+    # Con errores recientes y trabajos en curso Groq deja de ser la primera opción
+    for _ in range(5):
+        router.stats["groq"].start()
+        router.stats["groq"].finish(1.0, 100, ok=False)
+    router.stats["groq"].start()
+    router.stats["groq"].start()
+    assert router.ranked_backends(100) == ["local", "groq"]
+
+
+def test_fails_over_on_rate_limit():
+    router = make_router(groq=FakeBackend("groq", error=http_error(429)), local=FakeBackend("local"))
+
+    text, metadata = router.transcribe("audio.wav")
+
+    assert text == "texto de local"
+    assert metadata["backend"] == "local"
+    assert router.stats["groq"].error_rate == 1.0
+
+
+def test_client_errors_are_not_retried():
+    local = FakeBackend("local")
+    router = make_router(groq=FakeBackend("groq", error=http_error(400)), local=local)
+
+    with pytest.raises(requests.HTTPError):
+        router.transcribe("audio.wav")
+    assert local.calls == 0
+    assert is_retryable(http_error(503)) and is_retryable(ConnectionError())
+
+
+def test_hedges_slow_backend():
+    gate = threading.Event()
+    router = make_router(groq=FakeBackend("groq", gate=gate), local=FakeBackend("local"))
+    router.stats["groq"].prior_rtf = 0.0001  # umbral de hedging = hedge_min_seconds
+
+    try:
+        text, metadata = router.transcribe("audio.wav")
+    finally:
+        gate.set()
+
+    assert text == "texto de local"
+    assert metadata["hedged"] is True
+
+
+def test_progress_reaches_job_listener():
+    events = []
+    router = make_router(groq=FakeBackend("groq"))
+
+    with progress_listener(lambda stage, info: events.append(info)):
+        router.transcribe("audio.wav")
+
+    assert events == [{"backend": "groq"}]
+
+
+def test_rtf_percentile():
+    stats = BackendStats(prior_rtf=0.3, window=10)
+    assert stats.rtf() == 0.3
+    for elapsed in (1, 2, 3, 4):
+        stats.start()
+        stats.finish(elapsed, 10, ok=True)
+    assert stats.rtf(0.5) == 0.3
+    assert stats.rtf(0.95) == 0.4
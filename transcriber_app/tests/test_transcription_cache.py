@@ -0,0 +1,142 @@
+# transcriber_app/tests/test_transcription_cache.py
+import os
+import time
+from unittest.mock import patch
+from transcriber_app.modules.ai.local.transcriber import LocalWhisperTranscriber
+from transcriber_app.modules.ai.transcriber_router import RoutingTranscriber
+from transcriber_app.modules.transcription_cache import (
+    AudioKey,
+    TranscriptionCache,
+    fingerprint_similarity,
+    fingerprint_usable,
+)
+from transcriber_app.runner.orchestrator import Orchestrator
+
+
+class DummyReceiver:
+    def load(self, path):
+        return {"name": "reunion", "path": path}
+
+
+class CountingTranscriber:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, path):
+        self.calls += 1
+        return "texto transcrito", {"engine": "fake"}
+
+
+class DummyFormatter:
+    def save_transcription(self, name, text, enforce_save=True):
+        return f"{name}.txt"
+
+    def save_output(self, name, summary, mode, enforce_save=True):
+        return f"{name}_{mode}.md"
+
+    def save_metrics(self, name, summary, mode):
+        return True
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path))
+    key = AudioKey("abc123")
+
+    assert cache.get(key) is None
+    cache.put(key, "hola", {"engine": "groq"})
+    assert cache.get(key) == ("hola", {"engine": "groq"})
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path), max_bytes=10_000)
+    cache.put(AudioKey("viejo"), "a" * 4000)
+    cache.put(AudioKey("medio"), "b" * 4000)
+
+    # Usar "viejo" lo convierte en el más reciente
+    old = time.time() - 100
+    os.utime(tmp_path / "medio.json", (old, old))
+    assert cache.get(AudioKey("viejo")) is not None
+
+    cache.put(AudioKey("nuevo"), "c" * 4000)
+
+    assert cache.get(AudioKey("medio")) is None
+    assert cache.get(AudioKey("viejo")) is not None
+    assert cache.get(AudioKey("nuevo")) is not None
+
+
+def test_cache_matches_by_fingerprint(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path), use_fingerprint=True)
+    cache.put(AudioKey("original", "1010110010" * 10), "texto")
+
+    recoded = AudioKey("recodificado", "1010110010" * 9 + "1010110011")
+    assert cache.get(recoded) == ("texto", {})
+    assert cache.get(AudioKey("otro", "0101001101" * 10)) is None
+
+
+def test_fingerprint_ignores_silence_and_short_clips(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path), use_fingerprint=True)
+    # Silencio: todos los bits a cero; cualquier otro silencio de la misma duración coincidiría
+    cache.put(AudioKey("silencio", "0" * 100), "de otro usuario")
+    assert cache.get(AudioKey("otro-silencio", "0" * 100)) is None
+
+    # Menos de FINGERPRINT_MIN_SECONDS: demasiado pocos bits para fiarse
+    cache.put(AudioKey("corto", "10" * 20), "corto")
+    assert cache.get(AudioKey("otro-corto", "10" * 20)) is None
+
+    assert not fingerprint_usable("0" * 100)
+    assert fingerprint_usable("1010110010" * 10)
+
+
+def test_cache_key_includes_engine(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path), use_fingerprint=True)
+    fingerprint = "1010110010" * 10
+    cache.put(AudioKey("audio", fingerprint, "local-whisper:small"), "texto local")
+
+    assert cache.get(AudioKey("audio", fingerprint, "local-whisper:small")) == ("texto local", {})
+    # Ni por digest ni por huella se sirve la salida de otro motor
+    assert cache.get(AudioKey("audio", fingerprint, "groq-whisper:whisper-large-v3")) is None
+    assert cache.get(AudioKey("recodificado", fingerprint, "groq-whisper:whisper-large-v3")) is None
+
+
+def test_fingerprint_lookup_uses_index_and_follows_eviction(tmp_path):
+    cache = TranscriptionCache(cache_dir=str(tmp_path), max_bytes=10_000, use_fingerprint=True)
+    fingerprint = "1010110010" * 10
+    cache.put(AudioKey("viejo", fingerprint), "a" * 6000)
+
+    # La búsqueda por huella no abre las entradas que no coinciden
+    with patch("pathlib.Path.read_text", side_effect=AssertionError("lectura de entrada")):
+        assert cache._find_by_fingerprint(AudioKey("otro", "0101001101" * 10)) is None
+
+    old = time.time() - 100
+    os.utime(tmp_path / "viejo.json", (old, old))
+    cache.put(AudioKey("nuevo", "1100101001" * 10), "b" * 6000)
+    assert cache.index.candidates(None, fingerprint) == [("nuevo", "1100101001" * 10)]
+
+
+def test_engine_id_of_transcribers():
+    local = LocalWhisperTranscriber(model_size="small")
+    assert local.engine_id == "local-whisper:small"
+    assert RoutingTranscriber({"local": local}, backends=["groq", "local"]).engine_id == "router:local-whisper:small"
+
+
+def test_fingerprint_similarity_rejects_different_lengths():
+    assert fingerprint_similarity("1010", "1010") == 1.0
+    assert fingerprint_similarity("1" * 100, "1" * 50) == 0.0
+
+
+def test_orchestrator_reuses_cached_transcription(tmp_path, monkeypatch):
+    from transcriber_app.modules.ai.ai_manager import AIManager
+    monkeypatch.setattr(AIManager, "summarize", lambda text, mode: "resumen")
+
+    cache = TranscriptionCache(cache_dir=str(tmp_path))
+    transcriber = CountingTranscriber()
+    orch = Orchestrator(DummyReceiver(), transcriber, DummyFormatter(), save_files=False, cache=cache)
+
+    transcriber.engine_id = "fake:modelo"
+    with patch.object(cache, "key_for", return_value=AudioKey("mismo-audio")) as key_for:
+        orch.run_audio("audios/reunion.mp3", "default")
+        _, text, _ = orch.run_audio("audios/copia_con_otro_nombre.webm", "tecnico")
+
+    assert key_for.call_args.kwargs == {"engine": "fake:modelo"}
+    assert transcriber.calls == 1
+    assert text == "texto transcrito"
@@ -0,0 +1,256 @@
+# transcriber_app/tests/test_upload_sessions.py
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from transcriber_app.web.web_app import app
+from transcriber_app.web.api import upload_sessions
+from transcriber_app.web.api.background import JOB_STATUS
+from transcriber_app.web.api.upload_sessions import ChunkOutOfOrder, SessionTranscriber, UploadSession
+from transcriber_app.web.api.uploads import UploadTooLarge
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "UPLOAD_SESSION_DIR", str(tmp_path))
+    # Sin presupuesto de vistas previas: cada prueba de modo en vivo empieza igual
+    monkeypatch.setattr(upload_sessions, "UPLOAD_LIVE_RPM", 0)
+    return tmp_path
+
+
+class FakeTranscriber:
+    MODEL = "fake-whisper"
+
+    def __init__(self):
+        self.ranges = []
+
+    def transcribe(self, audio_path):
+        return "todo el audio", {"engine": "fake"}
+
+    def transcribe_range(self, audio_path, start, duration):
+        self.ranges.append((start, duration))
+        return f"tramo desde {start:.0f}"
+
+
+def test_append_is_ordered_and_idempotent(session_dir):
+    session = UploadSession.create(".webm")
+
+    assert session.append(0, b"ab") is True
+    assert session.append(0, b"ab") is False  # reenvío tras un corte
+    with pytest.raises(ChunkOutOfOrder) as exc:
+        session.append(2, b"ef")
+    assert exc.value.expected == 1
+
+    assert session.append(1, b"cd") is True
+    assert session.audio_path.read_bytes() == b"abcd"
+    assert UploadSession.load(session.session_id).info()["next_index"] == 2
+
+
+def test_schedule_segments_only_complete_ones(session_dir):
+    session = UploadSession.create(".webm", chunk_seconds=1.0)
+    session.state["next_index"] = 25
+    session.save()
+
+    transcriber = FakeTranscriber()
+    with patch.object(upload_sessions._executor, "submit", lambda fn, *args: fn(*args)):
+        # 25 s recibidos (menos el margen) con tramos de 10 s: solo 0 y 1 están completos
+        assert session.schedule_segments(transcriber, segment_seconds=10) == [0, 1]
+        assert session.schedule_segments(transcriber, segment_seconds=10) == []
+
+    assert session.ready_segments() == ["tramo desde 0", "tramo desde 8"]
+    assert transcriber.ranges[1] == (8.0, 12.0)  # el segundo tramo solapa 2 s con el primero
+
+
+def test_session_transcriber_reuses_segments(session_dir):
+    session = UploadSession.create(".webm")
+    session.state["segments"] = {"0": "hola a todos", "1": "a todos y bienvenidos"}
+    session.save()
+
+    base = FakeTranscriber()
+    transcriber = SessionTranscriber(session, base, segment_seconds=10, overlap=2, wait_seconds=0)
+    text, metadata = transcriber.transcribe("audio.webm")
+
+    assert base.ranges == [(18, None)]  # solo la cola
+    assert text == "hola a todos y bienvenidos tramo desde 18"
+    assert metadata["pretranscribed_segments"] == 2
+
+
+def test_session_transcriber_chunks_gaps_and_tail(session_dir, monkeypatch):
+    # Tramos de 10 s en 60 s de audio: el tramo 1 falló y los 3-5 no llegaron a pedirse
+    monkeypatch.setattr(upload_sessions, "probe_duration", lambda path: 60.0)
+    session = UploadSession.create(".webm")
+    session.state["segments"] = {"0": "uno", "2": "tres"}
+    session.save()
+
+    base = FakeTranscriber()
+    base.transcribe_range = lambda path, start, duration: base.ranges.append((start, duration)) or f"t{start:.0f}"
+    transcriber = SessionTranscriber(session, base, segment_seconds=10, overlap=2, wait_seconds=0, chunk_seconds=10)
+    text, metadata = transcriber.transcribe("audio.webm")
+
+    # El hueco del tramo 1 y la cola se trocean; el tramo 2 se reutiliza pese al hueco
+    assert sorted(base.ranges) == [(8, 10), (16, 4), (28, 10), (36, 10), (44, 10), (52, None)]
+    assert text == "uno t8 t16 tres t28 t36 t44 t52"
+    assert metadata["pretranscribed_segments"] == 2
+    assert metadata["chunks"] == 8
+
+
+def test_session_transcriber_without_segments_uses_base(session_dir):
+    session = UploadSession.create(".webm")
+    transcriber = SessionTranscriber(session, FakeTranscriber(), wait_seconds=0)
+    assert transcriber.transcribe("audio.webm") == ("todo el audio", {"engine": "fake"})
+
+
+def test_chunked_upload_routes(session_dir):
+    session_id = client.post("/api/uploads", data={"mime": "audio/webm;codecs=opus"}).json()["session_id"]
+
+    assert client.put(f"/api/uploads/{session_id}/chunks/0", content=b"abc").status_code == 200
+    out_of_order = client.put(f"/api/uploads/{session_id}/chunks/3", content=b"xyz")
+    assert out_of_order.status_code == 409
+    assert out_of_order.json()["next_index"] == 1
+
+    bad_hash = client.put(f"/api/uploads/{session_id}/chunks/1", content=b"def", headers={"X-Chunk-SHA256": "00"})
+    assert bad_hash.status_code == 400
+    assert client.get(f"/api/uploads/{session_id}").json()["received_bytes"] == 3
+
+    with patch("transcriber_app.web.api.routes.scheduler.submit", return_value=1) as mock_submit:
+        response = client.post(
+            f"/api/uploads/{session_id}/finalize",
+            data={"nombre": "trozos_test", "modo": "default", "email": "a@b.com"},
+        )
+
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+    assert mock_submit.call_args.kwargs["upload_session"] == session_id
+    saved = Path("audios") / "trozos_test.webm"
+    assert saved.read_bytes() == b"abc"
+    saved.unlink()
+    del JOB_STATUS[job_id]
+
+    # Una sesión finalizada no admite más trozos
+    assert client.put(f"/api/uploads/{session_id}/chunks/1", content=b"def").status_code == 409
+    assert client.get("/api/uploads/noexiste").status_code == 404
+
+
+def test_live_window_follows_closed_segments(session_dir):
+    session = UploadSession.create(".webm", live=True)
+    session.state["segments"] = {"0": "hola a todos"}
+    session.state["next_index"] = 135
+    session.save()
+
+    transcriber = FakeTranscriber()
+    with patch.object(upload_sessions._executor, "submit", lambda fn, *args: fn(*args)):
+        assert session.schedule_live(transcriber, interval=5) is True
+        # Dentro del intervalo no se relanza
+        assert session.schedule_live(transcriber, interval=5) is False
+
+    # La ventana empieza tras el tramo cerrado (con su solape) y acaba en lo recibido
+    start = upload_sessions.UPLOAD_SEGMENT_SECONDS - 2.0
+    assert transcriber.ranges == [(start, 135 - start)]
+    partial = session.partial_text()
+    assert partial["seq"] == 1
+    assert partial["text"].startswith("hola a todos tramo desde")
+
+
+def test_live_window_is_bounded_to_the_tail(session_dir):
+    # Ningún tramo cerrado todavía (p. ej. porque fallaron): solo se retranscribe la cola
+    session = UploadSession.create(".webm", live=True)
+    session.state["next_index"] = 100
+    session.save()
+
+    transcriber = FakeTranscriber()
+    with patch.object(upload_sessions._executor, "submit", lambda fn, *args: fn(*args)):
+        assert session.schedule_live(transcriber, interval=5, window=30) is True
+
+    assert transcriber.ranges == [(70, 30)]
+    assert session.partial_text()["text"] == "[…] tramo desde 70"
+
+
+def test_live_skipped_without_budget_or_when_groq_is_saturated(session_dir, monkeypatch):
+    session = UploadSession.create(".webm", live=True)
+    session.state["next_index"] = 10
+    session.save()
+    transcriber = FakeTranscriber()
+
+    monkeypatch.setattr(upload_sessions, "try_take_budget", lambda name, per_minute: False)
+    assert session.schedule_live(transcriber, interval=0.01) is False
+
+    monkeypatch.setattr(upload_sessions, "try_take_budget", lambda name, per_minute: True)
+    monkeypatch.setattr(upload_sessions, "provider_saturated", lambda provider: provider == "groq")
+    time.sleep(0.02)
+    assert session.schedule_live(transcriber, interval=0.01) is False
+    assert transcriber.ranges == []
+
+
+def test_live_disabled_without_flag(session_dir):
+    session = UploadSession.create(".webm")
+    assert session.schedule_live(FakeTranscriber(), interval=5) is False
+
+
+def test_live_events_route(session_dir):
+    session = UploadSession.create(".webm", live=True)
+    session.state["live_window"] = {"from_segment": 0, "text": "texto provisional", "seq": 3}
+    session.state["finalized"] = True
+    session.save()
+
+    body = client.get(f"/api/uploads/{session.session_id}/live").text
+
+    assert "event: partial\nid: 3\n" in body
+    assert '"text": "texto provisional"' in body
+    assert body.index("event: partial") < body.index("event: closed")
+
+
+def _append_all(session_dir, session_id, chunks):
+    session = UploadSession.load(session_id, base_dir=session_dir)
+    for index in range(chunks):
+        session.append(index, f"{index:03d}".encode())
+
+
+@pytest.mark.skipif(upload_sessions.fcntl is None, reason="flock no disponible")
+def test_append_is_exclusive_across_processes(session_dir):
+    import multiprocessing
+
+    session = UploadSession.create(".webm")
+    context = multiprocessing.get_context("fork")
+    # Dos "workers" reciben los mismos trozos (reintentos del cliente tras un corte)
+    workers = [context.Process(target=_append_all, args=(str(session_dir), session.session_id, 40))
+               for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    session.reload()
+    assert session.state["next_index"] == 40
+    assert session.audio_path.read_bytes() == b"".join(f"{i:03d}".encode() for i in range(40))
+
+
+def test_append_enforces_max_bytes(session_dir):
+    session = UploadSession.create(".webm")
+    assert session.append(0, b"abcd", max_bytes=6) is True
+    with pytest.raises(UploadTooLarge):
+        session.append(1, b"efg", max_bytes=6)
+    assert session.info()["received_bytes"] == 4
+
+    with patch.object(upload_sessions, "UPLOAD_MAX_BYTES", 6):
+        response = client.put(f"/api/uploads/{session.session_id}/chunks/1", content=b"efg")
+    assert response.status_code == 413
+
+
+def test_purge_removes_idle_sessions(session_dir):
+    import os
+    import time
+
+    idle = UploadSession.create(".webm")
+    active = UploadSession.create(".webm")
+    old = time.time() - 7200
+    os.utime(idle.dir / "session.json", (old, old))
+
+    assert upload_sessions.purge_expired_sessions(ttl_seconds=3600) == 1
+    assert not idle.dir.exists() and active.dir.exists()
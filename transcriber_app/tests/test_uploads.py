@@ -0,0 +1,50 @@
+# transcriber_app/tests/test_uploads.py
+import asyncio
+import hashlib
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from transcriber_app.web.api import uploads
+from transcriber_app.web.api.uploads import StreamingDecoder, UploadTooLarge, save_upload
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def test_save_upload_hashes_and_sizes(tmp_path):
+    dest = tmp_path / "audio.webm"
+    size, sha256 = asyncio.run(save_upload(_chunks(b"abc", b"def"), dest, max_bytes=100))
+
+    assert dest.read_bytes() == b"abcdef"
+    assert size == 6
+    assert sha256 == hashlib.sha256(b"abcdef").hexdigest()
+    assert not (tmp_path / "audio.webm.part").exists()
+
+
+def test_save_upload_rejects_too_large(tmp_path):
+    dest = tmp_path / "audio.webm"
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(save_upload(_chunks(b"abc", b"def"), dest, max_bytes=4))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_streaming_decoder_receives_upload_while_saving(tmp_path):
+    # "ffmpeg" de prueba que copia stdin al fichero de salida
+    def fake_command(input_path, output, **kwargs):
+        code = f"import sys, shutil; shutil.copyfileobj(sys.stdin.buffer, open({output!r}, 'wb'))"
+        return [sys.executable, "-c", code]
+
+    async def run():
+        with patch.object(uploads, "ffmpeg_command", side_effect=fake_command):
+            decoder = await StreamingDecoder(tmp_path / "decoded" / "audio.flac").start()
+            await save_upload(_chunks(b"x" * 1000, b"y" * 1000), tmp_path / "audio.webm", decoder=decoder)
+            return await decoder.finish()
+
+    decoded = asyncio.run(run())
+    assert decoded.read_bytes() == b"x" * 1000 + b"y" * 1000
+    assert StreamingDecoder.supports(".webm") and not StreamingDecoder.supports(".m4a")
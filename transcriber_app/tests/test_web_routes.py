@@ -1,8 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from transcriber_app.web.web_app import app
+from transcriber_app.web.api.scheduler import JobScheduler
 from transcriber_app.web.api.background import JOB_STATUS
+from transcriber_app.config import INGEST_MAX_ENTRIES
 
 
 client = TestClient(app)
@@ -36,17 +38,191 @@ def test_get_status_not_found():
     assert response.json()["status"] == "unknown"
 
 
-def test_upload_audio_endpoint():
-    # Mock background task to prevent actual processing
-    with patch("transcriber_app.web.api.routes.BackgroundTasks.add_task") as mock_task:
-        with patch("transcriber_app.web.api.routes.uuid.uuid4") as mock_uuid:
-            mock_uuid.return_value = "job456"
-            # Simulate file upload
-            files = {"audio": ("test.mp3", b"fake data", "audio/mpeg")}
-            data = {"nombre": "test", "modo": "default", "email": "a@b.com"}
+def test_upload_audio_endpoint(cleanup_jobs):
+    # Planificador real: el job encolado se ejecuta y recibe sus kwargs (job_id incluido)
+    job_scheduler = JobScheduler(workers=1, max_queue=5)
+    with patch("transcriber_app.web.api.routes.scheduler", job_scheduler), \
+            patch("transcriber_app.web.api.background.Orchestrator") as mock_orch:
+        mock_orch.return_value.run_audio.return_value = ("out.md", "texto", "resumen")
+        files = {"audio": ("test.mp3", b"fake data", "audio/mpeg")}
+        data = {"nombre": "test", "modo": "default", "email": "a@b.com"}
 
+        response = client.post("/api/upload-audio", data=data, files=files)
+        job_scheduler.shutdown(wait=True)
+
+    assert response.status_code == 200
+    job = JOB_STATUS[response.json()["job_id"]]
+    assert job["status"] == "done"
+    assert job["markdown"] == "resumen"
+
+
+def test_upload_audio_queue_full_returns_503(cleanup_jobs):
+    from transcriber_app.web.api.scheduler import QueueFullError
+
+    with patch("transcriber_app.web.api.routes.scheduler.submit", side_effect=QueueFullError(21, 120.0)):
+        files = {"audio": ("test.mp3", b"fake data", "audio/mpeg")}
+        data = {"nombre": "test", "modo": "default", "email": "a@b.com"}
+
+        response = client.post("/api/upload-audio", data=data, files=files)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "120"
+        assert response.json()["queue_position"] == 21
+        assert len(JOB_STATUS) == 0
+
+
+def test_process_existing_multiple_modes():
+    from transcriber_app.modules.ai.ai_manager import AIManager
+
+    summaries = {"tecnico": "md tecnico", "bullet": "md bullet"}
+    with patch.object(AIManager, "summarize_many_async", new=AsyncMock(return_value=summaries)) as mock_many:
+        with patch("transcriber_app.web.api.routes.OutputFormatter.save_metrics"):
+            data = {"nombre": "test", "modo": "tecnico", "modos": "tecnico,bullet", "transcription": "texto"}
+            response = client.post("/api/process-existing", data=data)
+
+    assert response.status_code == 200
+    assert response.json()["modes"] == summaries
+    assert response.json()["markdown"] == "md tecnico"
+    mock_many.assert_called_once_with("texto", ["tecnico", "bullet"])
+
+
+def test_process_existing_single_mode_uses_normalized_mode():
+    from transcriber_app.modules.ai.ai_manager import AIManager
+
+    with patch.object(AIManager, "summarize_async", new=AsyncMock(return_value="md tecnico")) as mock_summarize:
+        with patch("transcriber_app.web.api.routes.OutputFormatter.save_metrics") as mock_metrics:
+            data = {"nombre": "test", "modo": " Tecnico ", "transcription": "texto"}
+            response = client.post("/api/process-existing", data=data)
+
+    assert response.status_code == 200
+    assert response.json()["mode"] == "tecnico"
+    mock_summarize.assert_called_once_with("texto", "tecnico")
+    mock_metrics.assert_called_once_with("test", "md tecnico", "tecnico")
+
+
+def test_process_existing_rejects_invalid_mode():
+    data = {"nombre": "test", "modo": "tecnico", "modos": "tecnico,inventado", "transcription": "texto"}
+    response = client.post("/api/process-existing", data=data)
+    assert response.status_code == 400
+
+
+def test_process_existing_stream_sends_chunks():
+    from transcriber_app.modules.ai.ai_manager import AIManager
+
+    with patch.object(AIManager, "summarize_stream", return_value=iter(["# Resumen", " parcial"])):
+        with patch("transcriber_app.web.api.routes.OutputFormatter.save_metrics") as mock_metrics:
+            data = {"nombre": "test", "modo": "tecnico", "transcription": "texto"}
+            response = client.post("/api/process-existing/stream", data=data)
+
+    assert response.status_code == 200
+    assert response.text == "# Resumen parcial"
+    mock_metrics.assert_called_once_with("test", "# Resumen parcial", "tecnico")
+
+
+def test_job_result_stream_follows_partial_markdown(cleanup_jobs):
+    JOB_STATUS["stream_job"] = {"status": "done", "partial_markdown": "# Res", "markdown": "# Resumen final"}
+
+    response = client.get("/api/jobs/stream_job/result/stream")
+
+    assert response.status_code == 200
+    assert response.text == "# Resumen final"
+    assert client.get("/api/jobs/no_existe/result/stream").status_code == 404
+
+
+def test_job_events_stream_sends_stages_and_result(cleanup_jobs):
+    JOB_STATUS["sse_job"] = {
+        "status": "done",
+        "markdown": "# Resumen",
+        "events": [{"seq": 0, "stage": "received", "elapsed": 0}, {"seq": 1, "stage": "done", "elapsed": 2.5}],
+    }
+
+    response = client.get("/api/jobs/sse_job/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert "event: stage\nid: 0\n" in body
+    assert body.index('"stage": "received"') < body.index('"stage": "done"')
+    assert 'event: done\ndata: {"status": "done", "markdown": "# Resumen"}' in body
+
+    # Al reconectar solo se reenvían los eventos posteriores
+    resumed = client.get("/api/jobs/sse_job/events", headers={"Last-Event-ID": "0"}).text
+    assert '"stage": "received"' not in resumed
+
+    # Un Last-Event-ID mal formado se trata como si no hubiera: se envía todo
+    malformed = client.get("/api/jobs/sse_job/events", headers={"Last-Event-ID": "abc"})
+    assert malformed.status_code == 200
+    assert '"stage": "received"' in malformed.text
+
+
+def test_upload_audio_too_large_returns_413(cleanup_jobs):
+    with patch("transcriber_app.web.api.uploads.UPLOAD_MAX_BYTES", 4):
+        with patch("transcriber_app.web.api.routes.scheduler.submit") as mock_submit:
+            files = {"audio": ("grande.mp3", b"fake data", "audio/mpeg")}
+            data = {"nombre": "grande", "modo": "default", "email": "a@b.com"}
             response = client.post("/api/upload-audio", data=data, files=files)
 
-            assert response.status_code == 200
-            assert response.json()["job_id"] == "job456"
-            mock_task.assert_called_once()
+    assert response.status_code == 413
+    mock_submit.assert_not_called()
+
+
+def test_upload_audio_stream_saves_raw_body(cleanup_jobs):
+    import hashlib
+    from pathlib import Path
+
+    with patch("transcriber_app.web.api.routes.scheduler.submit", return_value=1) as mock_submit:
+        response = client.post(
+            "/api/upload-audio/stream",
+            params={"nombre": "stream_test", "modo": "default", "email": "a@b.com"},
+            content=b"fake m4a data",
+            headers={"Content-Type": "audio/mp4"},
+        )
+
+    assert response.status_code == 200
+    job = JOB_STATUS[response.json()["job_id"]]
+    assert job["upload_sha256"] == hashlib.sha256(b"fake m4a data").hexdigest()
+    # m4a no se puede decodificar en streaming: el job usa el original
+    assert mock_submit.call_args.kwargs["audio_file"] is None
+    saved = Path("audios") / "stream_test.m4a"
+    assert mock_submit.call_args.kwargs["original_file"] == str(saved)
+    assert saved.read_bytes() == b"fake m4a data"
+    saved.unlink()
+
+
+def test_ingest_urls_creates_a_job_per_video(cleanup_jobs):
+    entries = [("https://youtu.be/a1", {"id": "a1"}), ("https://youtu.be/b2", {"id": "b2"})]
+
+    with patch("transcriber_app.web.api.routes.probe_urls", return_value=entries) as mock_probe, \
+            patch("transcriber_app.web.api.routes.ingest_url_jobs") as mock_ingest:
+        data = {"urls": "https://www.youtube.com/playlist?list=PL1\n", "modo": "tecnico", "email": "a@b.com"}
+        response = client.post("/api/ingest-urls", data=data)
+
+    assert response.status_code == 200
+    jobs = response.json()["jobs"]
+    assert [j["url"] for j in jobs] == ["https://youtu.be/a1", "https://youtu.be/b2"]
+    assert JOB_STATUS[jobs[0]["job_id"]]["status"] == "downloading"
+    mock_probe.assert_called_once_with(["https://www.youtube.com/playlist?list=PL1"], max_entries=INGEST_MAX_ENTRIES)
+    job_list, modes, email, _ = mock_ingest.call_args.args
+    assert [job_id for job_id, _, _ in job_list] == [j["job_id"] for j in jobs]
+    assert modes == ["tecnico"] and email == "a@b.com"
+
+
+def test_ingest_urls_rejects_too_many_entries(cleanup_jobs):
+    entries = [(f"https://youtu.be/v{i}", {}) for i in range(3)]
+
+    with patch("transcriber_app.web.api.routes.INGEST_MAX_ENTRIES", 2), \
+            patch("transcriber_app.web.api.routes.probe_urls", return_value=entries), \
+            patch("transcriber_app.web.api.routes.ingest_url_jobs") as mock_ingest:
+        data = {"urls": "https://www.youtube.com/playlist?list=PL1", "modo": "tecnico", "email": "a@b.com"}
+        assert client.post("/api/ingest-urls", data=data).status_code == 400
+
+        data["urls"] = "https://youtu.be/a,https://youtu.be/b,https://youtu.be/c"
+        assert client.post("/api/ingest-urls", data=data).status_code == 400
+
+    mock_ingest.assert_not_called()
+    assert len(JOB_STATUS) == 0
+
+
+def test_ingest_urls_requires_urls(cleanup_jobs):
+    response = client.post("/api/ingest-urls", data={"urls": " , ", "modo": "tecnico", "email": "a@b.com"})
+    assert response.status_code == 400
@@ -3,67 +3,266 @@
 from transcriber_app.runner.orchestrator import Orchestrator
 from transcriber_app.modules.output_formatter import OutputFormatter
 from transcriber_app.modules.audio_receiver import AudioReceiver
-from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+from transcriber_app.modules.ai.ai_manager import AIManager
 from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.progress import progress_listener
+from transcriber_app.modules.checkpoints import JobCheckpoint, checkpoint_scope
+from transcriber_app.modules.retry import backoff_delay, is_transient
+from transcriber_app.modules.metrics import JOBS
+from transcriber_app.modules.audio_downloader import download_entries
+from transcriber_app.config import JOB_MAX_ATTEMPTS
+from .job_store import create_job_store
+from .scheduler import QueueFullError, scheduler
+from .upload_sessions import SessionTranscriber, UploadSession
 from pathlib import Path
 import os
+import queue
+import threading
+import time
 
 # Logging
 logger = setup_logging("transcribeapp")
 
-JOB_STATUS = {}
+# Estado de los jobs compartido entre workers (ver job_store.py)
+JOB_STATUS = create_job_store()
 
+# Cada cuánto se publica el resumen parcial en el estado del job
+PARTIAL_FLUSH_SECONDS = 0.3
+# Espera máxima entre intentos de encolar un job (descarga o reintento) con la cola llena
+INGEST_QUEUE_RETRY_SECONDS = 30
 
-def process_audio_job(job_id: str, nombre: str, modo: str, email: str):
-    logger.info(f"[BACKGROUND JOB] Iniciando job {job_id}")
+
+def record_job_event(job_id: str, stage: str, **info):
+    """Añade una etapa al historial del job con el tiempo transcurrido desde su creación."""
+    created_at = (JOB_STATUS.get(job_id) or {}).get("created_at", time.time())
+    event = {"stage": stage, "elapsed": round(time.time() - created_at, 3), **info}
+    JOB_STATUS.add_event(job_id, event, stage=stage)
+
+
+def partial_summary_publisher(job_id: str):
+    """Callback que guarda el resumen parcial del job sin escribir en cada token."""
+    last_flush = 0.0
+
+    def publish(partial: str):
+        nonlocal last_flush
+        now = time.monotonic()
+        if now - last_flush >= PARTIAL_FLUSH_SECONDS:
+            JOB_STATUS.merge(job_id, partial_markdown=partial)
+            last_flush = now
+
+    return publish
+
+
+def process_audio_job(job_id: str, nombre: str, modo: str, email: str, modos: list = None,
+                      audio_file: str = None, upload_session: str = None, attempt: int = 1,
+                      prioridad: int = 0, original_file: str = None):
+    """
+    audio_file: audio ya convertido durante la subida (se usa en lugar del original).
+    original_file: audio tal como se subió; se borra al terminar aunque se haya usado audio_file.
+    upload_session: sesión de subida por trozos cuyos tramos ya transcritos se reutilizan.
+    prioridad: la del encolado original, para que los reintentos la conserven.
+    attempt: intento del job; si falla de forma transitoria se vuelve a encolar
+    (hasta JOB_MAX_ATTEMPTS) y continúa desde su checkpoint.
+    """
+    logger.info(f"[BACKGROUND JOB] Iniciando job {job_id} (intento {attempt})")
     logger.info(f"[BACKGROUND JOB] Parámetros: nombre={nombre!r}, modo={modo!r}, email={email!r}")
 
+    checkpoint = JobCheckpoint(job_id)
+    requeued = False
+    audio_path = None
     try:
-        JOB_STATUS[job_id] = {"status": "running"}
+        JOB_STATUS.merge(job_id, status="running")
 
-        # Buscar el archivo con diferentes extensiones posibles
-        audio_path = None
-        for ext in [".m4a", ".mp4", ".webm", ".mp3", ".wav"]:
-            temp_path = Path("audios") / f"{nombre}{ext}"
-            if temp_path.exists():
-                audio_path = temp_path
-                break
+        # Audio convertido durante la subida o, si no, buscar el original con
+        # diferentes extensiones posibles
+        audio_path = next((Path(f) for f in (audio_file, original_file) if f and Path(f).exists()), None)
+        if audio_path is None:
+            for ext in [".m4a", ".mp4", ".webm", ".mp3", ".wav"]:
+                temp_path = Path("audios") / f"{nombre}{ext}"
+                if temp_path.exists():
+                    audio_path = temp_path
+                    break
 
         if not audio_path:
-            JOB_STATUS[job_id] = {"status": "error"}
+            JOB_STATUS.merge(job_id, status="error")
+            record_job_event(job_id, "error", error="Audio no encontrado")
+            JOBS.inc(status="error")
             logger.error(f"[BACKGROUND JOB] Audio no encontrado para: {nombre}")
             return
 
+        transcriber = AIManager.get_transcriber()
+        session = _load_upload_session(upload_session)
+        if session is not None:
+            transcriber = SessionTranscriber(session, transcriber)
+
         # === USAR EL MISMO PIPELINE QUE EL CLI PERO SIN GUARDAR ARCHIVOS ===
         orchestrator = Orchestrator(
             receiver=AudioReceiver(),
-            transcriber=GroqTranscriber(),
+            transcriber=transcriber,
             formatter=OutputFormatter(),
             save_files=False
         )
 
-        output_file, text, summary = orchestrator.run_audio(str(audio_path), modo)
+        # Las etapas que notifica el pipeline se guardan como eventos del job y
+        # lo ya calculado queda en el checkpoint por si hay que reintentar
+        with progress_listener(lambda stage, info: record_job_event(job_id, stage, **info)), \
+                checkpoint_scope(checkpoint):
+            if modos and len(modos) > 1:
+                # Una transcripción y todos los modos en paralelo
+                output_files, text, summaries = orchestrator.run_audio_multi(str(audio_path), modos)
+                result = {"markdown": summaries[modos[0]], "markdowns": summaries}
+            else:
+                output_file, text, summary = orchestrator.run_audio(
+                    str(audio_path), modo, on_partial_summary=partial_summary_publisher(job_id)
+                )
+                result = {"markdown": summary}
 
         logger.info(f"[BACKGROUND JOB] Procesamiento en memoria completado para {nombre}")
 
         # Guardar resultados en el JOB_STATUS para que el frontend los recoja
-        JOB_STATUS[job_id] = {
-            "status": "done",
-            "transcription": text,
-            "markdown": summary
-        }
+        record_job_event(job_id, "done")
+        JOB_STATUS.merge(job_id, status="done", transcription=text, **result)
+        JOBS.inc(status="done")
 
         logger.info(f"[BACKGROUND JOB] Job {job_id} finalizado correctamente")
 
     except Exception as e:
-        JOB_STATUS[job_id] = {"status": "error", "error": str(e)}
-        logger.error(f"[BACKGROUND JOB] Error en job {job_id}: {e}", exc_info=True)
+        if attempt < JOB_MAX_ATTEMPTS and is_transient(e):
+            schedule_job_retry(
+                job_id, e, attempt,
+                nombre=nombre, modo=modo, email=email, modos=modos,
+                audio_file=audio_file, upload_session=upload_session, prioridad=prioridad,
+                original_file=original_file
+            )
+            requeued = True
+            JOBS.inc(status="retried")
+        if not requeued:
+            record_job_event(job_id, "error", error=str(e))
+            JOB_STATUS.merge(job_id, status="error", error=str(e))
+            JOBS.inc(status="error")
+            logger.error(f"[BACKGROUND JOB] Error en job {job_id}: {e}", exc_info=True)
+    finally:
+        # El reintento necesita el audio y el checkpoint; si no, se borran siempre
+        if not requeued:
+            _cleanup_job(checkpoint, nombre, audio_file, upload_session, audio_path, original_file)
+
+
+def ingest_url_jobs(jobs: list, modos: list, email: str, prioridad: int = 0):
+    """
+    Descarga en paralelo las URLs de jobs ([(job_id, url, info)], con la info
+    de probe_urls) y encola cada audio en el planificador en cuanto termina
+    su descarga, sin esperar al resto de la playlist.
+
+    Los audios descargados pasan a un hilo alimentador que los encola: si la
+    cola del planificador está llena, es ese hilo el que espera y el pool de
+    descargas sigue informando de las que terminan.
+    """
+    job_ids = {url: job_id for job_id, url, _ in jobs}
+    downloaded = queue.Queue()
+
+    def on_result(result):
+        job_id = job_ids[result.url]
+        if not result.ok:
+            record_job_event(job_id, "error", error=result.error)
+            JOB_STATUS.merge(job_id, status="error", error=result.error)
+            JOBS.inc(status="error")
+            return
+        record_job_event(job_id, "downloaded", filename=Path(result.path).name)
+        JOB_STATUS.merge(job_id, status="queued")
+        downloaded.put((job_id, result.path))
+
+    def feed():
+        while True:
+            item = downloaded.get()
+            if item is None:
+                return
+            job_id, audio_file = item
+            _submit_downloaded(job_id, audio_file, modos, email, prioridad)
+
+    feeder = threading.Thread(target=feed, name="url-ingest-feeder", daemon=True)
+    feeder.start()
+    try:
+        download_entries([(url, info) for _, url, info in jobs], on_result=on_result)
     finally:
-        # Borrar el audio original siempre
+        downloaded.put(None)
+    feeder.join()
+
+
+def _submit_downloaded(job_id: str, audio_file: str, modos: list, email: str, prioridad: int):
+    # audio_file: el job borra el audio descargado al terminar
+    position = _submit_waiting(
+        job_id, nombre=Path(audio_file).stem, modo=modos[0], email=email, modos=modos,
+        audio_file=audio_file, prioridad=prioridad
+    )
+    record_job_event(job_id, "queued")
+    JOB_STATUS.merge(job_id, queue_position=position)
+
+
+def _submit_waiting(job_id: str, **params) -> int:
+    """Encola process_audio_job con su prioridad; con la cola llena espera en lugar de descartarlo."""
+    while True:
+        try:
+            return scheduler.submit(
+                process_audio_job, priority=params.get("prioridad", 0), label=job_id, job_id=job_id, **params
+            )
+        except QueueFullError as e:
+            delay = min(max(e.estimated_wait, 1), INGEST_QUEUE_RETRY_SECONDS)
+            logger.warning(f"[BACKGROUND JOB] Cola llena, job {job_id} espera {delay:.0f}s para encolarse")
+            time.sleep(delay)
+
+
+def schedule_job_retry(job_id: str, error: Exception, attempt: int, **params):
+    """Vuelve a encolar el job tras una espera con jitter (el worker queda libre mientras)."""
+    delay = backoff_delay(attempt - 1)
+    logger.warning(f"[BACKGROUND JOB] Job {job_id} falló ({error}); reintento {attempt + 1} en {delay:.1f}s")
+    record_job_event(job_id, "retrying", attempt=attempt + 1, delay=round(delay, 1), error=str(error))
+    JOB_STATUS.merge(job_id, status="queued", attempt=attempt + 1)
+
+    def resubmit():
         try:
-            audio_path = Path("audios") / f"{nombre}.webm"
-            if audio_path.exists():
-                os.remove(audio_path)
-                logger.info(f"[BACKGROUND JOB] Audio temporal eliminado: {audio_path}")
+            # Misma prioridad que el encolado original; con la cola llena el reintento espera
+            _submit_waiting(job_id, attempt=attempt + 1, **params)
         except Exception as e:
-            logger.warning(f"[BACKGROUND JOB] No se pudo eliminar el audio temporal: {e}")
+            record_job_event(job_id, "error", error=str(e))
+            JOB_STATUS.merge(job_id, status="error", error=str(e))
+            JOBS.inc(status="error")
+            logger.error(f"[BACKGROUND JOB] No se pudo reencolar el job {job_id}: {e}")
+            _cleanup_job(JobCheckpoint(job_id), params["nombre"], params.get("audio_file"),
+                         params.get("upload_session"), original_file=params.get("original_file"))
+
+    timer = threading.Timer(delay, resubmit)
+    timer.daemon = True
+    timer.start()
+
+
+def _cleanup_job(checkpoint: JobCheckpoint, nombre: str, audio_file: str, upload_session: str,
+                 audio_path: Path = None, original_file: str = None):
+    """
+    audio_path: el audio que usó el job (cualquier extensión, también las descargas).
+    original_file: el audio subido, que queda aparte cuando el job usó uno convertido.
+    """
+    checkpoint.clear()
+    # Borrar el audio original
+    try:
+        candidates = (Path("audios") / f"{nombre}.webm", audio_path, original_file)
+        for path in {Path(p) for p in candidates if p}:
+            if path is not None and path.exists():
+                os.remove(path)
+                logger.info(f"[BACKGROUND JOB] Audio temporal eliminado: {path}")
+        if audio_file and os.path.exists(audio_file):
+            os.remove(audio_file)
+        session = _load_upload_session(upload_session)
+        if session is not None:
+            session.delete()
+    except Exception as e:
+        logger.warning(f"[BACKGROUND JOB] No se pudo eliminar el audio temporal: {e}")
+
+
+def _load_upload_session(session_id: str):
+    if not session_id:
+        return None
+    try:
+        return UploadSession.load(session_id)
+    except KeyError:
+        logger.warning(f"[BACKGROUND JOB] Sesión de subida no encontrada: {session_id}")
+        return None
@@ -2,10 +2,12 @@
 import os
 import smtplib
 import ssl
+import time
 from pathlib import Path
 from email.message import EmailMessage
 from dotenv import load_dotenv
 from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import observe_stage
 
 # Logging
 logger = setup_logging("transcribeapp")
@@ -86,6 +88,14 @@ def send_email_with_attachment(to: str, subject: str, body: str, attachment_path
         logger.error(f"[EMAILER] Error preparando mensaje: {e}")
         return False
 
+    start = time.perf_counter()
+    sent = _send_with_fallbacks(msg, SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS)
+    observe_stage("email", time.perf_counter() - start, ok=sent)
+    return sent
+
+
+def _send_with_fallbacks(msg: EmailMessage, host: str, port: int, user: str, password: str) -> bool:
+    """Prueba los métodos de conexión en orden; True si alguno envía el mensaje."""
     # Intentar diferentes métodos de conexión
     methods = [
         {"name": "SSL+CRAM-MD5", "ssl": True, "cram_md5": True},
@@ -97,26 +107,26 @@ def send_email_with_attachment(to: str, subject: str, body: str, attachment_path
         try:
             logger.info(f"[EMAILER] Probando método: {method['name']}")
 
-            port = method.get("port", SMTP_PORT)
+            method_port = method.get("port", port)
 
             if method["ssl"]:
                 # Crear contexto SSL seguro
                 context = ssl.create_default_context()
                 smtp = smtplib.SMTP_SSL(
-                    SMTP_HOST,
-                    port,
+                    host,
+                    method_port,
                     context=context,
                     timeout=30
                 )
             else:
-                smtp = smtplib.SMTP(SMTP_HOST, port, timeout=30)
+                smtp = smtplib.SMTP(host, method_port, timeout=30)
                 smtp.starttls()
 
             # Autenticación
             if method["cram_md5"]:
-                smtp.login(SMTP_USER, SMTP_PASS, initial_response_ok=True)
+                smtp.login(user, password, initial_response_ok=True)
             else:
-                smtp.login(SMTP_USER, SMTP_PASS)
+                smtp.login(user, password)
 
             logger.info(f"[EMAILER] Autenticado con {method['name']}")
 
@@ -147,6 +157,7 @@ def send_email(to: str, subject: str, body: str):
         logger.error("[EMAILER] No hay contraseña SMTP configurada")
         return False
 
+    start = time.perf_counter()
     try:
         msg = EmailMessage()
         msg["From"] = SMTP_USER
@@ -159,8 +170,10 @@ def send_email(to: str, subject: str, body: str):
             smtp.send_message(msg)
 
         logger.info(f"[EMAILER] Email simple enviado a {to}")
+        observe_stage("email", time.perf_counter() - start)
         return True
 
     except Exception as e:
         logger.error(f"[EMAILER] Error enviando email simple: {e}")
+        observe_stage("email", time.perf_counter() - start, ok=False)
         return False
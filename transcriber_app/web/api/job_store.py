@@ -0,0 +1,284 @@
+# transcriber_app/web/api/job_store.py
+"""
+Almacén de estado de los jobs de procesamiento.
+
+Sustituye al antiguo diccionario en memoria JOB_STATUS. Se comporta como un
+dict (job_id -> dict de estado) para no romper a quien lo usa, pero:
+
+- Los registros caducan tras un TTL, así que la memoria no crece con el
+  número de jobs.
+- El backend SQLite (modo WAL) permite que los workers de uvicorn de un
+  mismo pod vean el mismo estado, y lo conserva entre reinicios si
+  JOB_STORE_PATH está en un volumen (k3s/deployment.yaml monta uno en
+  /app/jobs). No sirve para réplicas en nodos distintos: SQLite necesita un
+  disco local, no uno de red.
+- El backend en memoria se usa en tests y en despliegues de un solo proceso.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+
+from transcriber_app.config import JOB_STORE_BACKEND, JOB_STORE_PATH, JOB_TTL_SECONDS
+from transcriber_app.modules.logging.logging_config import setup_logging
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+
+class JobStore(MutableMapping):
+    """
+    Interfaz común de los backends.
+    Los backends implementan _load, _save, _merge, _delete, _ids,
+    count_by_status, clear y purge_expired.
+    """
+
+    def __init__(self, ttl_seconds: int = JOB_TTL_SECONDS, purge_interval: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    # --- API tipo dict ---
+    def __getitem__(self, job_id: str) -> dict:
+        data = self._load(job_id)
+        if data is None:
+            raise KeyError(job_id)
+        return data
+
+    def __setitem__(self, job_id: str, data: dict):
+        self._save(job_id, dict(data), time.time() + self.ttl_seconds)
+        self._maybe_purge()
+
+    def __delitem__(self, job_id: str):
+        if not self._delete(job_id):
+            raise KeyError(job_id)
+
+    def __iter__(self):
+        return iter(self._ids())
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
+    # --- API propia ---
+    def merge(self, job_id: str, **fields) -> dict:
+        """Actualiza solo algunos campos del job (lo crea si no existe)."""
+        data = self._merge(job_id, fields, time.time() + self.ttl_seconds)
+        self._maybe_purge()
+        return data
+
+    def add_event(self, job_id: str, event: dict, max_events: int = 200, **fields) -> dict:
+        """
+        Añade un evento de progreso a la lista 'events' del job y actualiza
+        otros campos. Escriben eventos el worker y las rutas a la vez, así que
+        el evento se añade dentro de _merge, en la misma transacción que lee la lista.
+        """
+        data = self._merge(job_id, fields, time.time() + self.ttl_seconds, event=event, max_events=max_events)
+        self._maybe_purge()
+        return data
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            removed = self.purge_expired()
+            if removed:
+                logger.info(f"[JOB STORE] {removed} jobs caducados eliminados")
+
+    # --- Contrato de los backends ---
+    def _load(self, job_id: str):
+        raise NotImplementedError
+
+    def _save(self, job_id: str, data: dict, expires_at: float):
+        raise NotImplementedError
+
+    def _merge(self, job_id: str, fields: dict, expires_at: float, event: dict = None,
+               max_events: int = 200) -> dict:
+        """Actualiza fields y, si se pasa, añade event a 'events', todo de forma atómica."""
+        raise NotImplementedError
+
+    def _delete(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    def _ids(self) -> list:
+        raise NotImplementedError
+
+    def count_by_status(self, status: str) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+
+def _apply_merge(data: dict, fields: dict, event: dict, max_events: int) -> dict:
+    data.update(fields)
+    if event is not None:
+        events = data.get("events", [])
+        # seq crece siempre, aunque se descarten los eventos más antiguos
+        event = {"seq": events[-1]["seq"] + 1 if events else 0, **event}
+        data["events"] = (events + [event])[-max_events:]
+    return data
+
+
+class MemoryJobStore(JobStore):
+    """Backend en memoria del proceso. Útil para tests y un único worker."""
+
+    def __init__(self, ttl_seconds: int = JOB_TTL_SECONDS, purge_interval: float = 60.0):
+        super().__init__(ttl_seconds, purge_interval)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _load(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None or entry[0] < time.time():
+                return None
+            return dict(entry[1])
+
+    def _save(self, job_id, data, expires_at):
+        with self._lock:
+            self._jobs[job_id] = (expires_at, data)
+
+    def _merge(self, job_id, fields, expires_at, event=None, max_events=200):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            data = dict(entry[1]) if entry and entry[0] >= time.time() else {}
+            _apply_merge(data, fields, event, max_events)
+            self._jobs[job_id] = (expires_at, data)
+            return dict(data)
+
+    def _delete(self, job_id):
+        with self._lock:
+            return self._jobs.pop(job_id, None) is not None
+
+    def _ids(self):
+        now = time.time()
+        with self._lock:
+            return [job_id for job_id, (expires_at, _) in self._jobs.items() if expires_at >= now]
+
+    def count_by_status(self, status: str) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(
+                1 for expires_at, data in self._jobs.values()
+                if expires_at >= now and data.get("status") == status
+            )
+
+    def clear(self):
+        with self._lock:
+            self._jobs.clear()
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, (expires_at, _) in self._jobs.items() if expires_at < now]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Backend SQLite en modo WAL.
+    Cada hilo abre su propia conexión; los procesos que comparten el fichero
+    comparten el estado.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs(expires_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+    """
+
+    def __init__(self, path: str = JOB_STORE_PATH, ttl_seconds: int = JOB_TTL_SECONDS, purge_interval: float = 60.0):
+        super().__init__(ttl_seconds, purge_interval)
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        logger.info(f"[JOB STORE] SQLite inicializado en: {self.path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, job_id):
+        row = self._conn().execute(
+            "SELECT data FROM jobs WHERE job_id = ? AND expires_at >= ?",
+            (job_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, job_id, data, expires_at):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, data.get("status"), json.dumps(data, ensure_ascii=False), time.time(), expires_at)
+        )
+
+    def _merge(self, job_id, fields, expires_at, event=None, max_events=200):
+        conn = self._conn()
+        # BEGIN IMMEDIATE toma el lock de escritura antes de leer: evita perder
+        # actualizaciones concurrentes de otros workers.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM jobs WHERE job_id = ? AND expires_at >= ?",
+                (job_id, time.time())
+            ).fetchone()
+            data = _apply_merge(json.loads(row[0]) if row else {}, fields, event, max_events)
+            self._save(job_id, data, expires_at)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return data
+
+    def _delete(self, job_id):
+        cur = self._conn().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return cur.rowcount > 0
+
+    def _ids(self):
+        rows = self._conn().execute(
+            "SELECT job_id FROM jobs WHERE expires_at >= ?", (time.time(),)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def count_by_status(self, status: str) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND expires_at >= ?",
+            (status, time.time())
+        ).fetchone()
+        return row[0]
+
+    def clear(self):
+        self._conn().execute("DELETE FROM jobs")
+
+    def purge_expired(self):
+        cur = self._conn().execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+        return cur.rowcount
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    """Crea el backend configurado en JOB_STORE ('sqlite' o 'memory')."""
+    backend = (backend or "sqlite").lower()
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"Backend de jobs desconocido: {backend}")
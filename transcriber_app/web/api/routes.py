@@ -1,34 +1,76 @@
 # transcriber_app/web/api/routes.py
 import os
+import json
+import time
 import uuid
-from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, HTTPException
-from fastapi.responses import StreamingResponse
+import hashlib
+import asyncio
+import threading
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse
 from pathlib import Path
 from transcriber_app.modules.ai.ai_manager import AIManager
-from transcriber_app.runner.orchestrator import Orchestrator
+from transcriber_app.modules.ai.gemini.agent_registry import agent_registry, available_modes
 from transcriber_app.modules.output_formatter import OutputFormatter
-from transcriber_app.modules.audio_receiver import AudioReceiver
-from transcriber_app.modules.ai.groq.transcriber import GroqTranscriber
+from transcriber_app.modules.audio_downloader import probe_urls
+from transcriber_app.config import INGEST_MAX_ENTRIES
 from fastapi.responses import FileResponse
-from .background import process_audio_job
+from .background import ingest_url_jobs, process_audio_job, record_job_event
 from .background import JOB_STATUS
-from transcriber_app.modules.logging.logging_config import setup_logging
+from .scheduler import scheduler, QueueFullError
+from .uploads import (
+    CONTENT_TYPE_EXTENSIONS,
+    StreamingDecoder,
+    UploadTooLarge,
+    save_upload,
+    upload_file_chunks,
+)
+from .upload_sessions import ChunkOutOfOrder, UploadSession
+from transcriber_app.modules.logging.logging_config import setup_logging, preview
 
 # Logging
 logger = setup_logging("transcribeapp")
 
 RECORDINGS_DIR = "recordings"
 
+# Cabeceras para que proxies como nginx no acumulen la respuesta en streaming
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Cada cuánto se consulta el estado del job al retransmitir su resultado
+JOB_STREAM_POLL_SECONDS = 0.25
+# Comentario SSE periódico para que proxies y navegador no cierren la conexión
+SSE_HEARTBEAT_SECONDS = 15
+FINAL_STATUSES = ("done", "error", "bad_audio")
+# Cada cuánto se revisa la transcripción en vivo de una subida por trozos
+UPLOAD_LIVE_POLL_SECONDS = 1.0
+
 router = APIRouter()
 
 
+def parse_modes(modo: str, modos: str = None) -> list:
+    """Lista de modos pedidos: 'modos' (separados por comas) tiene prioridad sobre 'modo'."""
+    modes = [m.strip().lower() for m in (modos or modo or "").split(",") if m.strip()]
+    available = available_modes()
+    invalid = [m for m in modes if m not in available]
+    if not modes or invalid:
+        logger.error(f"[API ROUTE] Modo inválido recibido: {modos or modo}")
+        raise HTTPException(status_code=400, detail="Modo inválido")
+    return list(dict.fromkeys(modes))
+
+
+@router.get("/modes")
+def get_modes():
+    """Modos de resumen disponibles según los prompts actuales."""
+    return {"modes": agent_registry.describe()}
+
+
 @router.post("/upload-audio")
 async def upload_audio(
-    background_tasks: BackgroundTasks,
     audio: UploadFile = File(...),
     nombre: str = Form(...),
     modo: str = Form(...),
-    email: str = Form(...)
+    email: str = Form(...),
+    prioridad: int = Form(0),
+    modos: str = Form(None)
 ):
     logger.info(f"[API ROUTE] Recibido audio: {nombre} con modo: {modo} para email: {email}")
     """
@@ -36,13 +78,7 @@ async def upload_audio(
     """
 
     # Validación básica
-    if modo not in ["default", "tecnico", "refinamiento", "ejecutivo", "bullet"]:
-        logger.error(f"[API ROUTE] Modo inválido recibido: {modo}")
-        raise HTTPException(status_code=400, detail="Modo inválido")
-
-    # Carpeta donde guardas los audios
-    audios_dir = Path("audios")
-    audios_dir.mkdir(exist_ok=True)
+    modes = parse_modes(modo, modos)
 
     # Guardar archivo con su extensión original
     safe_name = nombre.lower()
@@ -51,33 +87,288 @@ async def upload_audio(
     if not original_ext:
         original_ext = ".webm"
 
-    audio_path = audios_dir / f"{safe_name}{original_ext}"
-    with audio_path.open("wb") as f:
-        f.write(await audio.read())
+    audio_path = audio_upload_path(safe_name, original_ext)
+    # Copia por bloques: la memoria no crece con el tamaño del audio
+    try:
+        size, sha256 = await save_upload(upload_file_chunks(audio), audio_path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    return enqueue_audio_job(safe_name, modes, email, prioridad, audio_path, size, sha256)
+
+
+@router.post("/upload-audio/stream")
+async def upload_audio_stream(
+    request: Request,
+    nombre: str,
+    modo: str,
+    email: str,
+    prioridad: int = 0,
+    modos: str = None,
+    filename: str = None
+):
+    """
+    Variante de /upload-audio con el audio como cuerpo crudo de la petición
+    (parámetros en la query). Se escribe a disco según llega y, si el formato
+    lo permite, ffmpeg lo va convirtiendo a la vez, así el job arranca con el
+    audio ya decodificado.
+    """
+    logger.info(f"[API ROUTE] Recibiendo audio en streaming: {nombre} con modo: {modo} para email: {email}")
+    modes = parse_modes(modo, modos)
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    ext = Path(filename).suffix.lower() if filename else CONTENT_TYPE_EXTENSIONS.get(content_type, ".webm")
+
+    safe_name = nombre.lower()
+    audio_path = audio_upload_path(safe_name, ext or ".webm")
+
+    decoder = None
+    if StreamingDecoder.supports(audio_path.suffix):
+        decoder = await StreamingDecoder(Path("audios") / "decoded" / f"{safe_name}.flac").start()
+
+    try:
+        size, sha256 = await save_upload(request.stream(), audio_path, decoder=decoder)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    decoded_path = await decoder.finish() if decoder is not None else None
+    if decoded_path is not None:
+        logger.info(f"[API ROUTE] Audio convertido durante la subida: {decoded_path}")
+
+    return enqueue_audio_job(safe_name, modes, email, prioridad, audio_path, size, sha256, decoded_path)
+
+
+@router.post("/uploads")
+async def create_upload_session(
+    mime: str = Form("audio/webm"),
+    chunk_seconds: float = Form(1.0),
+    live: bool = Form(False)
+):
+    """
+    Abre una subida por trozos: el grabador envía cada trozo según lo genera
+    y el servidor va transcribiendo los tramos completos. Con live=true la
+    transcripción provisional se sigue en /uploads/{id}/live.
+    """
+    ext = CONTENT_TYPE_EXTENSIONS.get(mime.split(";")[0].strip().lower(), ".webm")
+    session = await asyncio.to_thread(UploadSession.create, ext, chunk_seconds, live)
+    return session.info()
+
+
+def load_upload_session(session_id: str) -> UploadSession:
+    try:
+        return UploadSession.load(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Sesión de subida no encontrada")
+
+
+@router.get("/uploads/{session_id}")
+async def get_upload_session(session_id: str):
+    """Estado de la subida (next_index indica por dónde reanudar)."""
+    return load_upload_session(session_id).info()
+
+
+@router.put("/uploads/{session_id}/chunks/{index}")
+async def put_upload_chunk(session_id: str, index: int, request: Request):
+    session = load_upload_session(session_id)
+    data = await request.body()
+
+    expected_sha = request.headers.get("x-chunk-sha256")
+    if expected_sha and hashlib.sha256(data).hexdigest() != expected_sha.lower():
+        raise HTTPException(status_code=400, detail="El hash del trozo no coincide")
+
+    try:
+        appended = await asyncio.to_thread(session.append, index, data)
+    except ChunkOutOfOrder as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "next_index": e.expected})
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if appended:
+        transcriber = AIManager.get_transcriber()
+        await asyncio.to_thread(session.schedule_segments, transcriber)
+        await asyncio.to_thread(session.schedule_live, transcriber)
+    return session.info()
+
+
+@router.get("/uploads/{session_id}/live")
+async def upload_live_events(session_id: str, request: Request):
+    """
+    Canal SSE con la transcripción provisional de una grabación en curso
+    (evento 'partial' con el texto completo hasta ahora). Termina con
+    'closed' cuando la subida se finaliza.
+    """
+    session = load_upload_session(session_id)
+
+    async def live_events_gen():
+        last_seq = None
+        last_write = time.monotonic()
+        while not await request.is_disconnected():
+            try:
+                partial = await asyncio.to_thread(session.partial_text)
+            except FileNotFoundError:
+                # El job ya terminó y borró la sesión
+                yield sse_message("closed", {"session_id": session_id})
+                return
+
+            key = (partial["seq"], len(partial["text"]))
+            if key != last_seq and partial["text"]:
+                yield sse_message("partial", partial, partial["seq"])
+                last_seq = key
+                last_write = time.monotonic()
+
+            if session.state["finalized"]:
+                yield sse_message("closed", {"session_id": session_id})
+                return
+
+            if time.monotonic() - last_write >= SSE_HEARTBEAT_SECONDS:
+                yield ": ping\n\n"
+                last_write = time.monotonic()
+            await asyncio.sleep(UPLOAD_LIVE_POLL_SECONDS)
+
+    return StreamingResponse(live_events_gen(), media_type="text/event-stream", headers=STREAM_HEADERS)
+
+
+@router.post("/uploads/{session_id}/finalize")
+async def finalize_upload_session(
+    session_id: str,
+    nombre: str = Form(...),
+    modo: str = Form(...),
+    email: str = Form(...),
+    prioridad: int = Form(0),
+    modos: str = Form(None)
+):
+    """Cierra la subida y encola el job con los tramos ya transcritos."""
+    session = load_upload_session(session_id)
+    logger.info(f"[API ROUTE] Finalizando subida {session_id}: {nombre} con modo: {modo} para email: {email}")
+    modes = parse_modes(modo, modos)
+
+    safe_name = nombre.lower()
+    audio_path = audio_upload_path(safe_name, session.state["ext"])
+    await asyncio.to_thread(session.finalize, audio_path)
+    size, sha256 = await asyncio.to_thread(file_sha256, audio_path)
+
+    return enqueue_audio_job(safe_name, modes, email, prioridad, audio_path, size, sha256,
+                             upload_session=session_id)
 
+
+def file_sha256(path: Path) -> tuple:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+            size += len(block)
+    return size, digest.hexdigest()
+
+
+def audio_upload_path(safe_name: str, ext: str) -> Path:
+    # Carpeta donde guardas los audios
+    audios_dir = Path("audios")
+    audios_dir.mkdir(exist_ok=True)
+    return audios_dir / f"{safe_name}{ext}"
+
+
+def enqueue_audio_job(safe_name: str, modes: list, email: str, prioridad: int, audio_path: Path,
+                      size: int, sha256: str, decoded_path: Path = None, upload_session: str = None):
     # Crear ID de trabajo
     job_id = str(uuid.uuid4())
 
-    # Lanzar proceso en background
-    background_tasks.add_task(
-        process_audio_job,
-        job_id=job_id,
-        nombre=safe_name,
-        modo=modo,
-        email=email
-    )
-
-    logger.info(f"[API ROUTE] Job {job_id} iniciado para audio: {nombre}")
+    # Encolar en el planificador (el estado se crea antes para que el worker no lo pise)
+    JOB_STATUS[job_id] = {"status": "queued", "created_at": time.time(), "upload_bytes": size, "upload_sha256": sha256}
+    record_job_event(job_id, "received", filename=audio_path.name, bytes=size, decoded=decoded_path is not None)
+    record_job_event(job_id, "queued")
+    try:
+        position = scheduler.submit(
+            process_audio_job,
+            priority=prioridad,
+            label=job_id,
+            job_id=job_id,
+            nombre=safe_name,
+            modo=modes[0],
+            email=email,
+            modos=modes,
+            audio_file=str(decoded_path) if decoded_path else None,
+            original_file=str(audio_path),
+            upload_session=upload_session,
+            prioridad=prioridad
+        )
+    except QueueFullError as e:
+        del JOB_STATUS[job_id]
+        logger.warning(f"[API ROUTE] Cola llena, rechazado audio: {safe_name}")
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(int(e.estimated_wait))},
+            content={
+                "status": "busy",
+                "message": "Servidor ocupado. Inténtalo más tarde.",
+                "queue_position": e.queue_position,
+                "estimated_wait_seconds": round(e.estimated_wait),
+            }
+        )
+
+    JOB_STATUS.merge(job_id, queue_position=position)
+
+    logger.info(f"[API ROUTE] Job {job_id} encolado para audio: {safe_name} (posición {position})")
     return {
         "status": "processing",
         "job_id": job_id,
+        "queue_position": position,
+        "estimated_wait_seconds": round(scheduler.estimate_wait(position)),
         "message": "Audio recibido. Procesamiento iniciado."
     }
 
 
+@router.post("/ingest-urls")
+async def ingest_urls(
+    urls: str = Form(...),
+    modo: str = Form(...),
+    email: str = Form(...),
+    prioridad: int = Form(0),
+    modos: str = Form(None)
+):
+    """
+    Descarga el audio de varias URLs o playlists (una por línea o separadas
+    por comas) y crea un job por vídeo. Las descargas van en paralelo y cada
+    audio entra en la cola de transcripción en cuanto termina de bajarse.
+    Como mucho INGEST_MAX_ENTRIES vídeos por petición.
+    """
+    modes = parse_modes(modo, modos)
+    url_list = [u.strip() for u in urls.replace(",", "\n").splitlines() if u.strip()]
+    if not url_list:
+        raise HTTPException(status_code=400, detail="No se ha indicado ninguna URL")
+    too_many = f"Como mucho {INGEST_MAX_ENTRIES} vídeos por petición"
+    if len(url_list) > INGEST_MAX_ENTRIES:
+        raise HTTPException(status_code=400, detail=too_many)
+    logger.info(f"[API ROUTE] Ingesta de {len(url_list)} URLs con modos {modes} para email: {email}")
+
+    entries = await asyncio.to_thread(probe_urls, url_list, max_entries=INGEST_MAX_ENTRIES)
+    if len(entries) > INGEST_MAX_ENTRIES:
+        logger.warning(f"[API ROUTE] Ingesta rechazada: más de {INGEST_MAX_ENTRIES} vídeos")
+        raise HTTPException(status_code=400, detail=too_many)
+
+    jobs = []
+    for url, info in entries:
+        job_id = str(uuid.uuid4())
+        JOB_STATUS[job_id] = {"status": "downloading", "created_at": time.time(), "source_url": url}
+        record_job_event(job_id, "received", url=url)
+        jobs.append((job_id, url, info))
+
+    # Las descargas siguen después de responder; el estado de cada job se consulta en /status
+    threading.Thread(
+        target=ingest_url_jobs, args=(jobs, modes, email, prioridad), name="url-ingest", daemon=True
+    ).start()
+
+    return {
+        "status": "downloading",
+        "jobs": [{"job_id": job_id, "url": url} for job_id, url, _ in jobs],
+        "message": f"{len(jobs)} audios en descarga. Cada uno se procesará al terminar de bajarse."
+    }
+
+
 @router.get("/status/{job_id}")
 def get_status(job_id: str):
-    logger.info(f"[API ROUTE] Consultando estado del job: {job_id}")
+    # El frontend consulta cada pocos segundos: DEBUG para que se pueda muestrear
+    logger.debug("[API ROUTE] Consultando estado del job: %s", job_id)
     job_data = JOB_STATUS.get(job_id, "unknown")
 
     if isinstance(job_data, dict):
@@ -86,6 +377,87 @@ def get_status(job_id: str):
     return {"job_id": job_id, "status": job_data}
 
 
+def sse_message(event: str, data: dict, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Canal Server-Sent Events con las etapas del job (evento 'stage') y un
+    evento final 'done', 'error' o 'bad_audio' con el resultado.
+    El estado se lee del JOB_STATUS, así que funciona aunque el job lo
+    procese otro worker.
+    """
+    if job_id not in JOB_STATUS:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+
+    # Al reconectar, EventSource envía el último id recibido (uno mal formado cuenta como ninguno)
+    try:
+        last_seq = int(request.headers.get("last-event-id", -1))
+    except ValueError:
+        last_seq = -1
+
+    async def job_events_gen():
+        nonlocal last_seq
+        last_write = time.monotonic()
+        while not await request.is_disconnected():
+            job = await asyncio.to_thread(JOB_STATUS.get, job_id)
+            if job is None:
+                yield sse_message("error", {"status": "unknown", "error": "Job no encontrado"})
+                return
+
+            for event in job.get("events", []):
+                if event["seq"] > last_seq:
+                    yield sse_message("stage", event, event["seq"])
+                    last_seq = event["seq"]
+                    last_write = time.monotonic()
+
+            status = job.get("status")
+            if status in FINAL_STATUSES:
+                result = {k: v for k, v in job.items() if k not in ("events", "partial_markdown")}
+                yield sse_message(status, result)
+                return
+
+            if time.monotonic() - last_write >= SSE_HEARTBEAT_SECONDS:
+                yield ": ping\n\n"
+                last_write = time.monotonic()
+            await asyncio.sleep(JOB_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(job_events_gen(), media_type="text/event-stream", headers=STREAM_HEADERS)
+
+
+@router.get("/jobs/{job_id}/result/stream")
+async def job_result_stream(job_id: str):
+    """Retransmite el resumen del job según se genera (texto plano, chunked)."""
+    if job_id not in JOB_STATUS:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+
+    async def job_result_gen():
+        sent = 0
+        while True:
+            job = await asyncio.to_thread(JOB_STATUS.get, job_id) or {}
+            status = job.get("status")
+            markdown = job.get("markdown") if status == "done" else job.get("partial_markdown")
+
+            if markdown and len(markdown) > sent:
+                yield markdown[sent:]
+                sent = len(markdown)
+
+            if status == "error" or status == "bad_audio":
+                yield f"\n[Error en servidor: {job.get('error', status)}]"
+                return
+            if status == "done" or not job:
+                return
+            await asyncio.sleep(JOB_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(job_result_gen(), media_type="text/plain; charset=utf-8", headers=STREAM_HEADERS)
+
+
 @router.post("/chat/stream")
 async def chat_stream(payload: dict):
     message = payload.get("message", "")
@@ -93,9 +465,11 @@ async def chat_stream(payload: dict):
 
     agent = AIManager.get_agent(mode)
 
-    async def chat_stream_gen():
+    # Generador síncrono: Starlette lo recorre en el threadpool y el stream
+    # bloqueante de Gemini no frena el event loop
+    def chat_stream_gen():
         try:
-            logger.info(f"[CHAT STREAM] Iniciando stream para mensaje: {message[:50]}...")
+            logger.debug("[CHAT STREAM] Iniciando stream para mensaje: %s...", preview(message, 50))
             # agent.run(..., stream=True) devuelve un generador
             for chunk in agent.run(message, stream=True):
                 if chunk:
@@ -118,41 +492,53 @@ def check_name(name: str):
     return {"exists": False}
 
 
-@router.post("/process-existing")
-async def process_existing(
-    nombre: str = Form(...),
-    modo: str = Form(...),
-    transcription: str = Form(None)
-):
-    text = None
+def load_existing_transcription(nombre: str, transcription: str = None) -> str:
+    """Transcripción enviada en el formulario o, si no, la guardada en disco."""
     transcript_path = Path("transcripts") / f"{nombre}.txt"
 
     if transcription:
-        text = transcription
         logger.info(f"[API ROUTE] Reutilizando transcripción recibida vía Form para: {nombre}")
-    elif transcript_path.exists():
-        text = transcript_path.read_text(encoding="utf-8")
+        return transcription
+    if transcript_path.exists():
         logger.info(f"[API ROUTE] Reutilizando transcripción desde archivo para: {nombre}")
-    else:
-        raise HTTPException(status_code=404, detail="Transcripción no encontrada (ni en Form ni en disco)")
+        return transcript_path.read_text(encoding="utf-8")
+    raise HTTPException(status_code=404, detail="Transcripción no encontrada (ni en Form ni en disco)")
 
-    # Usar el mismo pipeline que CLI pero sin guardar
-    orchestrator = Orchestrator(
-        receiver=AudioReceiver(),
-        transcriber=GroqTranscriber(),
-        formatter=OutputFormatter(),
-        save_files=False
-    )
 
-    # 1. Resumir con Gemini
-    summary_output = AIManager.summarize(text, modo)
+@router.post("/process-existing")
+async def process_existing(
+    nombre: str = Form(...),
+    modo: str = Form(...),
+    transcription: str = Form(None),
+    modos: str = Form(None)
+):
+    text = load_existing_transcription(nombre, transcription)
+    modes = parse_modes(modo, modos)
+    formatter = OutputFormatter()
+
+    if len(modes) > 1:
+        # Varios modos sobre la misma transcripción, en paralelo
+        summaries = await AIManager.summarize_many_async(text, modes)
+        for m, summary in summaries.items():
+            formatter.save_metrics(nombre, summary, m)
+
+        return {
+            "status": "done",
+            "mode": modes[0],
+            "markdown": summaries[modes[0]],
+            "modes": summaries,
+            "transcription": text
+        }
+
+    # 1. Resumir con Gemini (cliente asíncrono: no bloquea el event loop)
+    summary_output = await AIManager.summarize_async(text, modes[0])
 
     # 2. Guardar métricas (SIEMPRE se guardan)
-    orchestrator.formatter.save_metrics(nombre, summary_output, modo)
+    formatter.save_metrics(nombre, summary_output, modes[0])
 
     return {
         "status": "done",
-        "mode": modo,
+        "mode": modes[0],
         "markdown": summary_output,
         "transcription": text
     }
@@ -172,3 +558,29 @@ def get_result(filename: str):
     if not path.exists():
         raise HTTPException(status_code=404, detail="Archivo no encontrado")
     return FileResponse(path, media_type="text/markdown")
+
+
+@router.post("/process-existing/stream")
+async def process_existing_stream(
+    nombre: str = Form(...),
+    modo: str = Form(...),
+    transcription: str = Form(None)
+):
+    """Como /process-existing, pero devuelve el markdown según llegan los tokens."""
+    text = load_existing_transcription(nombre, transcription)
+    mode = parse_modes(modo)[0]
+    formatter = OutputFormatter()
+
+    # Generador síncrono: Starlette lo recorre en el threadpool
+    def summary_stream_gen():
+        summary_output = ""
+        try:
+            for chunk in AIManager.summarize_stream(text, mode):
+                summary_output += chunk
+                yield chunk
+            formatter.save_metrics(nombre, summary_output, mode)
+        except Exception as e:
+            logger.error(f"[API ROUTE] Error en el stream del resumen: {e}")
+            yield f"\n[Error en servidor: {str(e)}]"
+
+    return StreamingResponse(summary_stream_gen(), media_type="text/plain; charset=utf-8", headers=STREAM_HEADERS)
@@ -0,0 +1,128 @@
+# transcriber_app/web/api/scheduler.py
+"""
+Planificador de jobs de audio.
+
+Un número fijo de hilos consume una cola con prioridad y tamaño máximo.
+Así el pod nunca lanza más pipelines (ffmpeg + Groq + Gemini) a la vez que
+JOB_WORKERS, y cuando la cola se llena se rechaza el job con una estimación
+de espera en lugar de aceptarlo y saturar la CPU y las cuotas.
+"""
+import itertools
+import math
+import queue
+import threading
+import time
+
+from transcriber_app.config import JOB_WORKERS, JOB_QUEUE_SIZE
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import JOBS_IN_FLIGHT, QUEUE_DEPTH
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+# Duración supuesta de un job hasta tener mediciones reales
+DEFAULT_JOB_SECONDS = 60.0
+
+
+class QueueFullError(Exception):
+    """La cola está llena; el cliente debe reintentar más tarde."""
+
+    def __init__(self, queue_position: int, estimated_wait: float):
+        super().__init__(f"Cola llena (posición estimada {queue_position}, espera ~{estimated_wait:.0f}s)")
+        self.queue_position = queue_position
+        self.estimated_wait = estimated_wait
+
+
+class JobScheduler:
+    def __init__(self, workers: int = JOB_WORKERS, max_queue: int = JOB_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self._queue = queue.PriorityQueue(maxsize=self.max_queue)
+        self._seq = itertools.count()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._running = 0
+        self._avg_seconds = DEFAULT_JOB_SECONDS
+
+    # --- Ciclo de vida ---
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info(f"[SCHEDULER] {self.workers} workers iniciados (cola máx. {self.max_queue})")
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            # Centinela con la menor prioridad posible: se procesa tras lo pendiente
+            self._queue.put((math.inf, next(self._seq), None, None, (), {}))
+        if wait:
+            for t in threads:
+                t.join()
+        logger.info("[SCHEDULER] Workers detenidos")
+
+    # --- API ---
+    def submit(self, fn, *args, priority: int = 0, label: str = None, **kwargs) -> int:
+        """
+        Encola fn(*args, **kwargs).
+        label solo identifica el job en los logs; args y kwargs llegan a fn tal cual.
+        Mayor prioridad se ejecuta antes; a igual prioridad, orden de llegada.
+        Devuelve la posición estimada en la cola o lanza QueueFullError.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((-priority, next(self._seq), label, fn, args, kwargs))
+        except queue.Full:
+            position = self.max_queue + 1
+            raise QueueFullError(position, self.estimate_wait(position))
+
+        position = self._queue.qsize()
+        logger.info(f"[SCHEDULER] Job {label} encolado (prioridad={priority}, posición={position})")
+        return position
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def in_flight(self) -> int:
+        return self._running
+
+    def estimate_wait(self, position: int) -> float:
+        """Segundos estimados hasta que empiece el job en esa posición (1 = primero)."""
+        ahead = max(position - 1, 0) + self._running
+        if ahead < self.workers:
+            return 0.0
+        rounds = math.ceil((ahead - self.workers + 1) / self.workers)
+        return rounds * self._avg_seconds
+
+    # --- Workers ---
+    def _worker(self):
+        while True:
+            _, _, label, fn, args, kwargs = self._queue.get()
+            if fn is None:
+                self._queue.task_done()
+                return
+
+            with self._lock:
+                self._running += 1
+            start = time.time()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"[SCHEDULER] Job {label} terminó con excepción: {e}", exc_info=True)
+            finally:
+                elapsed = time.time() - start
+                with self._lock:
+                    self._running -= 1
+                    # Media móvil exponencial de la duración de los jobs
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+                self._queue.task_done()
+
+
+scheduler = JobScheduler()
+QUEUE_DEPTH.set_function(scheduler.queue_depth)
+JOBS_IN_FLIGHT.set_function(scheduler.in_flight)
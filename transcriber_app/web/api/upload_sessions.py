@@ -0,0 +1,477 @@
+# transcriber_app/web/api/upload_sessions.py
+"""
+Subidas por trozos desde el grabador del navegador.
+
+Protocolo:
+1. POST /api/uploads crea la sesión.
+2. PUT /api/uploads/{id}/chunks/{n} añade el trozo n (el MediaRecorder
+   genera uno por segundo). Reenviar un trozo ya recibido no hace nada y uno
+   fuera de orden devuelve 409 con el índice esperado, así el cliente puede
+   reanudar tras un corte.
+3. POST /api/uploads/{id}/finalize lanza el job.
+
+Mientras llegan los trozos, cada tramo completo de UPLOAD_SEGMENT_SECONDS se
+transcribe en segundo plano. Al finalizar, SessionTranscriber reutiliza esos
+tramos y solo transcribe lo que falta (tramos fallidos o pendientes y la
+cola), troceado en trozos de TRANSCRIBE_CHUNK_SECONDS como cualquier audio.
+
+En modo en vivo (live=True) además se retranscribe cada
+UPLOAD_LIVE_INTERVAL_SECONDS la ventana de audio posterior al último tramo
+cerrado; partial_text() une los tramos cerrados con esa ventana y
+GET /api/uploads/{id}/live lo emite por SSE mientras se graba. La ventana
+no pasa de UPLOAD_LIVE_WINDOW_SECONDS y las vistas previas tienen su propio
+presupuesto (UPLOAD_LIVE_RPM): si se agota, o si Groq ya tiene llamadas
+esperando, se saltan para no quitar cuota a los jobs.
+
+El estado de cada sesión es un JSON en su carpeta, así que cualquier worker
+puede atender el siguiente trozo: cada lectura-modificación-escritura del
+estado se hace con un flock sobre session.lock, que excluye también a los
+demás procesos (en sistemas sin fcntl solo se excluyen los hilos).
+
+El total recibido no puede pasar de UPLOAD_MAX_BYTES y las sesiones sin
+actividad durante UPLOAD_SESSION_TTL_SECONDS se borran.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from transcriber_app.config import (
+    UPLOAD_MAX_BYTES,
+    UPLOAD_SESSION_DIR,
+    UPLOAD_SESSION_TTL_SECONDS,
+    UPLOAD_SEGMENT_SECONDS,
+    UPLOAD_LIVE_INTERVAL_SECONDS,
+    UPLOAD_LIVE_WINDOW_SECONDS,
+    UPLOAD_LIVE_RPM,
+    TRANSCRIBE_CHUNK_SECONDS,
+    TRANSCRIBE_CHUNK_OVERLAP,
+    TRANSCRIBE_MAX_WORKERS,
+)
+from transcriber_app.modules.ai.base.transcriber_interface import TranscriberInterface
+from transcriber_app.modules.ai.rate_limiter import provider_saturated, try_take_budget
+from transcriber_app.modules.audio_chunker import plan_chunks, probe_duration, stitch_texts
+from transcriber_app.modules.logging.logging_config import setup_logging
+from .uploads import UploadTooLarge
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+# Cada cuánto se buscan sesiones caducadas (al crear una nueva)
+PURGE_INTERVAL_SECONDS = 60.0
+# Margen para no transcribir un tramo cuyo final aún puede estar en el buffer del navegador
+SEGMENT_MARGIN_SECONDS = 2.0
+
+_locks = {}
+_locks_guard = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=TRANSCRIBE_MAX_WORKERS, thread_name_prefix="segment")
+# Sesiones con una ventana en vivo transcribiéndose en este proceso
+_live_running = set()
+_last_purge = 0.0
+
+
+class ChunkOutOfOrder(Exception):
+    def __init__(self, expected: int):
+        super().__init__(f"Se esperaba el trozo {expected}")
+        self.expected = expected
+
+
+@contextmanager
+def _session_lock(session_id: str, directory: Path):
+    """Exclusión sobre el estado de la sesión entre hilos (Lock) y entre workers (flock)."""
+    with _locks_guard:
+        lock = _locks.setdefault(session_id, threading.Lock())
+    with lock:
+        try:
+            handle = open(directory / "session.lock", "a")
+        except FileNotFoundError:
+            # La sesión ya se borró: quien llama lo comprueba con session.json
+            yield
+            return
+        with handle:
+            if fcntl is not None:
+                # Se libera al cerrar el fichero
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
+
+def purge_expired_sessions(ttl_seconds: float = None, base_dir: str = None) -> int:
+    """Borra las sesiones sin actividad desde hace más de ttl_seconds; devuelve cuántas."""
+    ttl_seconds = UPLOAD_SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    base = Path(UPLOAD_SESSION_DIR if base_dir is None else base_dir)
+    if not base.is_dir():
+        return 0
+
+    limit = time.time() - ttl_seconds
+    removed = 0
+    for directory in base.iterdir():
+        state_file = directory / "session.json"
+        try:
+            # session.json se reescribe con cada trozo y cada tramo transcrito
+            last_activity = (state_file if state_file.exists() else directory).stat().st_mtime
+        except OSError:
+            continue
+        if directory.is_dir() and last_activity < limit:
+            shutil.rmtree(directory, ignore_errors=True)
+            with _locks_guard:
+                _locks.pop(directory.name, None)
+            removed += 1
+    if removed:
+        logger.info(f"[UPLOAD SESSION] {removed} sesiones caducadas eliminadas")
+    return removed
+
+
+def _maybe_purge(base_dir):
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge >= PURGE_INTERVAL_SECONDS:
+        _last_purge = now
+        try:
+            purge_expired_sessions(base_dir=base_dir)
+        except Exception as e:
+            logger.warning(f"[UPLOAD SESSION] No se pudieron purgar las sesiones caducadas: {e}")
+
+
+class UploadSession:
+    def __init__(self, session_id: str, state: dict, base_dir: Path):
+        self.session_id = session_id
+        self.state = state
+        self.dir = Path(base_dir) / session_id
+
+    # --- Persistencia ---
+    @classmethod
+    def create(cls, ext: str = ".webm", chunk_seconds: float = 1.0, live: bool = False, base_dir: str = None):
+        base_dir = UPLOAD_SESSION_DIR if base_dir is None else base_dir
+        _maybe_purge(base_dir)
+        session_id = uuid.uuid4().hex
+        state = {
+            "ext": ext,
+            "chunk_seconds": chunk_seconds,
+            "next_index": 0,
+            "received_bytes": 0,
+            "created_at": time.time(),
+            "segments": {},  # índice de tramo -> texto (None mientras se transcribe)
+            "finalized": False,
+            "live": live,
+            "live_window": None,  # {"from_segment", "text", "seq"} de la última ventana en vivo
+            "live_at": 0.0,
+        }
+        session = cls(session_id, state, base_dir)
+        session.dir.mkdir(parents=True, exist_ok=True)
+        session.save()
+        logger.info(f"[UPLOAD SESSION] Sesión {session_id} creada ({ext})")
+        return session
+
+    @classmethod
+    def load(cls, session_id: str, base_dir: str = None):
+        base_dir = UPLOAD_SESSION_DIR if base_dir is None else base_dir
+        path = Path(base_dir) / session_id / "session.json"
+        if not session_id.isalnum() or not path.exists():
+            raise KeyError(session_id)
+        return cls(session_id, json.loads(path.read_text(encoding="utf-8")), base_dir)
+
+    def save(self):
+        tmp = self.dir / f"session.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_text(json.dumps(self.state), encoding="utf-8")
+        os.replace(tmp, self.dir / "session.json")
+
+    def reload(self):
+        self.state = json.loads((self.dir / "session.json").read_text(encoding="utf-8"))
+
+    @property
+    def audio_path(self) -> Path:
+        return self.dir / f"audio{self.state['ext']}"
+
+    @property
+    def received_seconds(self) -> float:
+        return self.state["next_index"] * self.state["chunk_seconds"]
+
+    def info(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "next_index": self.state["next_index"],
+            "received_bytes": self.state["received_bytes"],
+            "received_seconds": self.received_seconds,
+            "segments_ready": sum(1 for t in self.state["segments"].values() if t is not None),
+            "finalized": self.state["finalized"],
+            "live": self.state.get("live", False),
+        }
+
+    # --- Trozos ---
+    def append(self, index: int, data: bytes, max_bytes: int = None) -> bool:
+        """Añade el trozo; devuelve False si ya estaba recibido. UploadTooLarge si se pasa de max_bytes."""
+        max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+        with _session_lock(self.session_id, self.dir):
+            self.reload()
+            expected = self.state["next_index"]
+            if self.state["finalized"]:
+                raise ChunkOutOfOrder(expected)
+            if index < expected:
+                return False
+            if index > expected:
+                raise ChunkOutOfOrder(expected)
+            if self.state["received_bytes"] + len(data) > max_bytes:
+                raise UploadTooLarge(max_bytes)
+
+            with self.audio_path.open("ab") as f:
+                f.write(data)
+            self.state["next_index"] += 1
+            self.state["received_bytes"] += len(data)
+            self.save()
+        return True
+
+    # --- Transcripción anticipada ---
+    def segment_bounds(self, k: int, segment_seconds: float = None, overlap: float = None) -> tuple:
+        """(inicio, duración) del tramo k; cada tramo salvo el primero solapa con el anterior."""
+        segment_seconds = UPLOAD_SEGMENT_SECONDS if segment_seconds is None else segment_seconds
+        overlap = TRANSCRIBE_CHUNK_OVERLAP if overlap is None else overlap
+        start = max(0.0, k * segment_seconds - overlap)
+        return start, (k + 1) * segment_seconds - start
+
+    def schedule_segments(self, transcriber, segment_seconds: float = None) -> list:
+        """Lanza en segundo plano los tramos completos que aún no se han pedido."""
+        segment_seconds = UPLOAD_SEGMENT_SECONDS if segment_seconds is None else segment_seconds
+        if segment_seconds <= 0:
+            return []
+
+        with _session_lock(self.session_id, self.dir):
+            self.reload()
+            complete = int((self.received_seconds - SEGMENT_MARGIN_SECONDS) // segment_seconds)
+            pending = [k for k in range(max(0, complete)) if str(k) not in self.state["segments"]]
+            for k in pending:
+                self.state["segments"][str(k)] = None
+            if pending:
+                self.save()
+
+        for k in pending:
+            start, duration = self.segment_bounds(k, segment_seconds)
+            _executor.submit(self._transcribe_segment, transcriber, k, start, duration)
+        return pending
+
+    def _transcribe_segment(self, transcriber, k: int, start: float, duration: float):
+        try:
+            text = transcriber.transcribe_range(str(self.audio_path), start, duration)
+        except Exception as e:
+            # El tramo se transcribirá al finalizar
+            logger.warning(f"[UPLOAD SESSION] Falló el tramo {k} de {self.session_id}: {e}")
+            text = None
+        with _session_lock(self.session_id, self.dir):
+            if not (self.dir / "session.json").exists():
+                return  # el job ya terminó y borró la sesión
+            self.reload()
+            if text is None:
+                self.state["segments"].pop(str(k), None)
+            else:
+                self.state["segments"][str(k)] = text
+            self.save()
+        logger.info(f"[UPLOAD SESSION] Tramo {k} de {self.session_id} transcrito por adelantado")
+
+    def ready_segments(self) -> list:
+        """Textos de los tramos ya transcritos y consecutivos desde el principio."""
+        self.reload()
+        texts = []
+        while self.state["segments"].get(str(len(texts))):
+            texts.append(self.state["segments"][str(len(texts))])
+        return texts
+
+    # --- Modo en vivo ---
+    def schedule_live(self, transcriber, interval: float = None, window: float = None) -> bool:
+        """Lanza la transcripción de la ventana abierta si toca; devuelve si se lanzó."""
+        interval = UPLOAD_LIVE_INTERVAL_SECONDS if interval is None else interval
+        window = UPLOAD_LIVE_WINDOW_SECONDS if window is None else window
+        if interval <= 0:
+            return False
+
+        with _session_lock(self.session_id, self.dir):
+            self.reload()
+            if not self.state.get("live") or self.session_id in _live_running:
+                return False
+            if time.time() - self.state.get("live_at", 0.0) < interval:
+                return False
+            self.state["live_at"] = time.time()
+            self.save()
+            received = self.received_seconds
+
+        # La ventana empieza donde acaban los tramos ya cerrados, así no hay huecos,
+        # salvo que estos vayan retrasados: entonces solo se transcribe la cola
+        from_segment = len(self.ready_segments())
+        start, _ = self.segment_bounds(from_segment)
+        truncated = window > 0 and received - window > start
+        if truncated:
+            start = received - window
+        if received <= start:
+            return False
+
+        # Groq es el único proveedor con cuota: si ya hay llamadas esperando, la vista previa se salta
+        if provider_saturated("groq") or not try_take_budget("upload_live", UPLOAD_LIVE_RPM):
+            logger.debug(f"[UPLOAD SESSION] Ventana en vivo de {self.session_id} saltada: sin cuota")
+            return False
+
+        # live_at ya impide otra llamada dentro del intervalo, así que basta con marcarla aquí
+        _live_running.add(self.session_id)
+        _executor.submit(self._transcribe_live, transcriber, from_segment, start, received - start, truncated)
+        return True
+
+    def _transcribe_live(self, transcriber, from_segment: int, start: float, duration: float,
+                         truncated: bool = False):
+        try:
+            text = transcriber.transcribe_range(str(self.audio_path), start, duration)
+        except Exception as e:
+            logger.warning(f"[UPLOAD SESSION] Falló la ventana en vivo de {self.session_id}: {e}")
+            text = None
+        finally:
+            _live_running.discard(self.session_id)
+
+        if text is None:
+            return
+        with _session_lock(self.session_id, self.dir):
+            if not (self.dir / "session.json").exists():
+                return
+            self.reload()
+            previous = self.state.get("live_window") or {}
+            self.state["live_window"] = {
+                "from_segment": from_segment,
+                "text": text,
+                "truncated": truncated,
+                "seq": previous.get("seq", 0) + 1,
+            }
+            self.save()
+
+    def partial_text(self) -> dict:
+        """Transcripción provisional: tramos cerrados más la última ventana en vivo."""
+        texts = self.ready_segments()
+        window = self.state.get("live_window")
+        seq = 0
+        if window:
+            # Entre los tramos cerrados y una ventana recortada falta audio aún sin transcribir
+            text = f"[…] {window['text']}" if window.get("truncated") else window["text"]
+            texts = texts[:window["from_segment"]] + [text]
+            seq = window["seq"]
+        text = stitch_texts(texts, [False] + [True] * (len(texts) - 1)) if texts else ""
+        return {"text": text, "seq": seq, "received_seconds": self.received_seconds}
+
+    def finalize(self, dest: Path) -> Path:
+        """Copia el audio completo a dest y marca la sesión como cerrada."""
+        with _session_lock(self.session_id, self.dir):
+            self.reload()
+            self.state["finalized"] = True
+            self.save()
+        shutil.copyfile(self.audio_path, dest)
+        return dest
+
+    def delete(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        with _locks_guard:
+            _locks.pop(self.session_id, None)
+
+
+class SessionTranscriber(TranscriberInterface):
+    """
+    Transcriptor que reutiliza los tramos transcritos durante la subida y
+    solo pide a `base` (GroqTranscriber o LocalWhisperTranscriber) el resto del audio.
+    Los huecos (tramos que fallaron o siguen pendientes) y la cola se trocean
+    con plan_chunks, así ninguna petición pasa de chunk_seconds.
+    """
+
+    def __init__(self, session: UploadSession, base, segment_seconds: float = None, overlap: float = None,
+                 wait_seconds: float = 30.0, chunk_seconds: float = None):
+        self.session = session
+        self.base = base
+        self.segment_seconds = UPLOAD_SEGMENT_SECONDS if segment_seconds is None else segment_seconds
+        self.overlap = TRANSCRIBE_CHUNK_OVERLAP if overlap is None else overlap
+        self.wait_seconds = wait_seconds
+        # Por defecto, el mismo troceado que usaría base con el audio completo
+        self.chunk_seconds = (getattr(base, "chunk_seconds", TRANSCRIBE_CHUNK_SECONDS)
+                              if chunk_seconds is None else chunk_seconds)
+
+    @property
+    def engine_id(self) -> str:
+        return getattr(self.base, "engine_id", type(self.base).__name__)
+
+    def transcribe(self, audio_path: str):
+        start_time = time.time()
+        segments = self._wait_for_segments()
+        if not segments:
+            return self.base.transcribe(audio_path)
+
+        pieces = self._plan(segments, self._duration(audio_path))
+        missing = [i for i, piece in enumerate(pieces) if piece[2] is None]
+        texts = [piece[2] for piece in pieces]
+        workers = max(1, min(TRANSCRIBE_MAX_WORKERS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-chunk") as pool:
+            results = pool.map(lambda i: self.base.transcribe_range(audio_path, pieces[i][0], pieces[i][1]), missing)
+            for i, text in zip(missing, results):
+                texts[i] = text
+        logger.info(
+            f"[UPLOAD SESSION] Reutilizados {len(segments)} tramos; transcritos {len(missing)} trozos que faltaban"
+        )
+
+        text = stitch_texts(texts, [piece[3] for piece in pieces])
+        return text, {
+            "engine": getattr(self.base, "ENGINE", "groq-whisper"),
+            "model": getattr(self.base, "MODEL", None) or getattr(self.base, "model_size", None),
+            "transcription_time": time.time() - start_time,
+            "pretranscribed_segments": len(segments),
+            "chunks": len(pieces),
+        }
+
+    def _duration(self, audio_path: str) -> float:
+        try:
+            return probe_duration(audio_path)
+        except Exception as e:
+            # Aproximada por los trozos recibidos; el último trozo llega igualmente hasta el final
+            logger.warning(f"[UPLOAD SESSION] No se pudo obtener la duración de {audio_path}: {e}")
+            return self.session.received_seconds
+
+    def _plan(self, segments: dict, duration: float) -> list:
+        """
+        Trozos (inicio, duración, texto, solapa_con_anterior) en orden; texto es
+        None en los que faltan por transcribir. El último llega hasta el final
+        del audio (duración None).
+        """
+        pieces = []
+        gap_from = 0  # primer tramo del hueco actual
+        for k in sorted(segments) + [None]:
+            gap_start = self.session.segment_bounds(gap_from, self.segment_seconds, self.overlap)[0]
+            gap_end = duration if k is None else k * self.segment_seconds
+            if k is None or k > gap_from:
+                pieces.extend(self._plan_gap(gap_start, gap_end))
+            if k is not None:
+                start, length = self.session.segment_bounds(k, self.segment_seconds, self.overlap)
+                pieces.append((start, length, segments[k], k > 0))
+                gap_from = k + 1
+
+        start, _, text, overlapped = pieces[-1]
+        if text is None:
+            pieces[-1] = (start, None, None, overlapped)
+        return pieces
+
+    def _plan_gap(self, gap_start: float, gap_end: float) -> list:
+        # El hueco solapa con el tramo anterior igual que lo haría el tramo que falta
+        if gap_end <= gap_start:
+            return [(gap_start, gap_end - gap_start, None, gap_start > 0)]
+        chunks = plan_chunks(gap_end - gap_start, self.chunk_seconds, self.overlap)
+        return [
+            (gap_start + start, end - start, None, overlapped or (i == 0 and gap_start > 0))
+            for i, (start, end, overlapped) in enumerate(chunks)
+        ]
+
+    def _wait_for_segments(self) -> dict:
+        """Espera un poco a los tramos que aún se estén transcribiendo; devuelve los terminados."""
+        deadline = time.time() + self.wait_seconds
+        while True:
+            self.session.reload()
+            pending = [k for k, t in self.session.state["segments"].items() if t is None]
+            if not pending or time.time() >= deadline:
+                return {int(k): t for k, t in self.session.state["segments"].items() if t}
+            time.sleep(0.5)
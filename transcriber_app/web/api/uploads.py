@@ -0,0 +1,145 @@
+# transcriber_app/web/api/uploads.py
+"""
+Recepción de audios en streaming.
+
+save_upload copia la subida a disco por bloques de tamaño fijo, calcula su
+SHA-256 y comprueba el tamaño máximo sobre la marcha, así la memoria por
+petición no depende del tamaño del fichero.
+
+StreamingDecoder lanza ffmpeg leyendo de stdin para ir convirtiendo el audio
+a FLAC 16 kHz mono mientras la subida aún está llegando. Solo sirve con
+contenedores que se pueden leer secuencialmente (webm, ogg, mp3, wav, flac);
+los mp4/m4a suelen llevar el índice al final y necesitan el fichero entero.
+"""
+import asyncio
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from transcriber_app.config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+from transcriber_app.modules.ai.groq.transcriber import ffmpeg_command
+from transcriber_app.modules.logging.logging_config import setup_logging
+from transcriber_app.modules.metrics import time_stage
+
+# Logging
+logger = setup_logging("transcribeapp")
+
+STREAMABLE_EXTENSIONS = {".webm", ".ogg", ".mp3", ".wav", ".flac"}
+CONTENT_TYPE_EXTENSIONS = {
+    "audio/webm": ".webm",
+    "audio/ogg": ".ogg",
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/flac": ".flac",
+    "audio/mp4": ".m4a",
+    "audio/aac": ".m4a",
+    "video/mp4": ".mp4",
+}
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"El audio supera el tamaño máximo de {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+
+async def upload_file_chunks(upload: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def save_upload(chunks: AsyncIterator[bytes], dest: Path, max_bytes: int = None,
+                      decoder: "StreamingDecoder" = None) -> tuple:
+    """
+    Escribe los bloques en dest y devuelve (bytes, sha256).
+    Se escribe en un .part y se renombra al final: nunca queda un audio a medias.
+    Si se pasa un decoder, cada bloque se le envía también a ffmpeg.
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    tmp = dest.with_name(dest.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with time_stage("upload"), tmp.open("wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+                if decoder is not None:
+                    await decoder.feed(chunk)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        if decoder is not None:
+            await decoder.abort()
+        raise
+
+    return size, digest.hexdigest()
+
+
+class StreamingDecoder:
+    """ffmpeg convirtiendo a FLAC 16 kHz mono lo que se le va escribiendo por stdin."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.proc = None
+        self.failed = False
+
+    @staticmethod
+    def supports(extension: str) -> bool:
+        return extension.lower() in STREAMABLE_EXTENSIONS
+
+    async def start(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        cmd = ffmpeg_command("pipe:0", str(self.output_path), codec="flac")
+        try:
+            self.proc = await asyncio.create_subprocess_exec(
+                *cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            logger.warning(f"[UPLOAD] No se pudo lanzar ffmpeg para la conversión en streaming: {e}")
+            self.failed = True
+        return self
+
+    async def feed(self, chunk: bytes):
+        if self.failed:
+            return
+        try:
+            self.proc.stdin.write(chunk)
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg no entiende el audio: la subida sigue y el job convertirá el original
+            logger.warning("[UPLOAD] ffmpeg cerró la entrada; se descarta la conversión en streaming")
+            self.failed = True
+
+    async def finish(self) -> Optional[Path]:
+        """Espera a ffmpeg y devuelve el fichero convertido, o None si falló."""
+        if self.proc is None:
+            return None
+        if not self.failed:
+            try:
+                self.proc.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                self.failed = True
+        returncode = await self.proc.wait()
+        if self.failed or returncode != 0:
+            self.output_path.unlink(missing_ok=True)
+            return None
+        return self.output_path
+
+    async def abort(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+            await self.proc.wait()
+        self.output_path.unlink(missing_ok=True)
@@ -3,6 +3,7 @@
  * Coordina todos los módulos y configura event listeners
  */
 
+import { fetchModes } from "./modules/api.js";
 import { elements, validateElements } from "./modules/domElements.js";
 import {
     handleSendAudio,
@@ -16,6 +17,7 @@ import {
     setupPrintHandler,
     setupRecordingHandlers
 } from "./modules/eventHandlers.js";
+import { setModeOptions } from "./modules/form.js";
 import { updateRecordingButtonsState } from "./modules/ui.js";
 
 /**
@@ -41,6 +43,11 @@ function init() {
     setupModalHandlers();
     setupCollapsibleHandlers();
 
+    // Modos según los prompts del servidor (el HTML trae los de siempre por si falla)
+    fetchModes()
+        .then(setModeOptions)
+        .catch((error) => console.warn("No se pudieron cargar los modos:", error));
+
     // Asignar manejador principal de envío de audio
     if (elements.sendBtn) {
         elements.sendBtn.onclick = handleSendAudio;
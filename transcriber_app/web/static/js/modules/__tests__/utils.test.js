@@ -6,6 +6,7 @@
 import {
     formatAsHTML,
     generateId,
+    getStageMessage,
     isValidEmail,
     isValidName,
     normalizeText,
@@ -107,4 +108,16 @@ describe("utils.js", () => {
             expect(isValidName("  Juan  ")).toBe(false);
         });
     });
+
+    describe("getStageMessage", () => {
+        it("debe mostrar el avance de los trozos al transcribir", () => {
+            expect(getStageMessage({ stage: "transcribing", chunk: 2, chunks: 5 })).toBe("Transcribiendo (2/5)…");
+            expect(getStageMessage({ stage: "transcribing", chunk: 0, chunks: 1 })).toBe("Transcribiendo…");
+        });
+
+        it("debe usar un mensaje genérico para etapas desconocidas", () => {
+            expect(getStageMessage({ stage: "summarizing" })).toBe("Generando resumen…");
+            expect(getStageMessage({ stage: "otra" })).toBe("Procesando audio…");
+        });
+    });
 });
@@ -6,10 +6,28 @@
 import { hideOverlay, setStatusText, showOverlay } from "./ui.js";
 import { normalizeText } from "./utils.js";
 
+// Marca que añade el servidor cuando falla a mitad de un stream
+const STREAM_ERROR_RE = /\n\[Error en servidor: ([^\]]*)\]$/;
+
 /**
- * Procesa una transcripción existente con un nuevo modo
+ * Lee una respuesta en streaming como trozos de texto
  */
-async function processExistingTranscription(nombre, modo, transcription = null) {
+async function* readTextStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder("utf-8");
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        yield decoder.decode(value, { stream: true });
+    }
+}
+
+/**
+ * Procesa una transcripción existente con un nuevo modo.
+ * El markdown llega en streaming; onPartial recibe el texto acumulado.
+ */
+async function processExistingTranscription(nombre, modo, transcription = null, onPartial = null) {
     const formData = new FormData();
     formData.append("nombre", nombre);
     formData.append("modo", modo);
@@ -21,34 +39,46 @@ async function processExistingTranscription(nombre, modo, transcription = null)
     showOverlay();
 
     try {
-        const response = await fetch("/api/process-existing", {
+        const response = await fetch("/api/process-existing/stream", {
             method: "POST",
             body: formData
         });
 
-        const data = await response.json();
-
-        if (data.status === "done") {
-            // Si el backend no devuelve el contenido directamente, lo buscamos
-            let mdContent = data.content || data.markdown || data.resultado || "";
-
-            if (!mdContent) {
-                console.log("Contenido no recibido en respuesta directa. Fetching explícito...");
-                const fetchedMd = await loadMarkdownResult(nombre, modo);
-                if (fetchedMd) mdContent = fetchedMd;
-            }
-
+        if (!response.ok) {
             return {
-                success: true,
-                mode: data.mode || modo,
-                content: mdContent
+                success: false,
+                error: "Error procesando la transcripción existente."
             };
-        } else {
+        }
+
+        let mdContent = "";
+        for await (const chunk of readTextStream(response)) {
+            // Con el primer trozo se quita el overlay y se muestra el resultado en vivo
+            if (!mdContent) hideOverlay();
+            mdContent += chunk;
+            if (onPartial) onPartial(mdContent);
+        }
+
+        const streamError = mdContent.match(STREAM_ERROR_RE);
+        if (streamError) {
+            console.error("Error del servidor durante el stream:", streamError[1]);
             return {
                 success: false,
                 error: "Error procesando la transcripción existente."
             };
         }
+
+        if (!mdContent) {
+            console.log("Contenido no recibido en respuesta directa. Fetching explícito...");
+            const fetchedMd = await loadMarkdownResult(nombre, modo);
+            if (fetchedMd) mdContent = fetchedMd;
+        }
+
+        return {
+            success: true,
+            mode: modo,
+            content: mdContent
+        };
     } catch (err) {
         console.error("Error:", err);
         return {
@@ -60,6 +90,130 @@ async function processExistingTranscription(nombre, modo, transcription = null)
     }
 }
 
+/**
+ * Sigue el resumen de un job según se genera.
+ * onPartial recibe el markdown acumulado; devuelve el texto final.
+ */
+async function streamJobResult(jobId, onPartial) {
+    const response = await fetch(`/api/jobs/${jobId}/result/stream`);
+    if (!response.ok) {
+        throw new Error(`Error del servidor: ${response.status}`);
+    }
+
+    let mdContent = "";
+    for await (const chunk of readTextStream(response)) {
+        mdContent += chunk;
+        if (!STREAM_ERROR_RE.test(mdContent)) onPartial(mdContent);
+    }
+    return mdContent;
+}
+
+/**
+ * Interpreta la respuesta del servidor al encolar un audio
+ */
+async function readJobResponse(response) {
+    if (response.status === 413) {
+        const tooLarge = await response.json();
+        throw new Error(tooLarge.detail);
+    }
+
+    if (response.status === 503) {
+        // Cola del servidor llena: informar de la espera estimada
+        const busy = await response.json();
+        const minutes = Math.max(1, Math.round((busy.estimated_wait_seconds || 60) / 60));
+        throw new Error(`${busy.message} Espera estimada: ~${minutes} min.`);
+    }
+
+    if (!response.ok) {
+        const errorText = await response.text();
+        console.error("Error del servidor:", response.status, errorText);
+        throw new Error(`Error del servidor: ${response.status} - ${errorText}`);
+    }
+
+    const data = await response.json();
+    console.log("Datos recibidos:", data);
+
+    if (data.job_id) {
+        // NOTA: NO ocultamos el overlay aquí porque empieza el polling
+        return {
+            success: true,
+            jobId: data.job_id
+        };
+    } else if (data.error) {
+        throw new Error(data.error);
+    } else {
+        throw new Error("Respuesta del servidor inválida");
+    }
+}
+
+/**
+ * Abre una subida por trozos; devuelve el session_id.
+ * Con live=true el servidor transcribe en vivo lo que va llegando.
+ */
+async function createUploadSession(mimeType, live = false) {
+    const formData = new FormData();
+    formData.append("mime", mimeType);
+    formData.append("live", live);
+
+    const response = await fetch("/api/uploads", { method: "POST", body: formData });
+    if (!response.ok) {
+        throw new Error(`Error del servidor: ${response.status}`);
+    }
+    return (await response.json()).session_id;
+}
+
+/**
+ * Estado de una subida por trozos (next_index indica por dónde reanudar)
+ */
+async function getUploadSession(sessionId) {
+    const response = await fetch(`/api/uploads/${sessionId}`);
+    if (!response.ok) {
+        throw new Error(`Error del servidor: ${response.status}`);
+    }
+    return response.json();
+}
+
+/**
+ * Envía el trozo index de la grabación (el servidor ignora los repetidos)
+ */
+function putUploadChunk(sessionId, index, blob) {
+    return fetch(`/api/uploads/${sessionId}/chunks/${index}`, {
+        method: "PUT",
+        headers: { "Content-Type": "application/octet-stream" },
+        body: blob
+    });
+}
+
+/**
+ * Cierra la subida por trozos y encola el job.
+ * Devuelve null si la sesión ya no existe en el servidor (hay que subir el audio entero).
+ */
+async function finalizeUploadSession(sessionId, nombre, modo, email) {
+    const formData = new FormData();
+    formData.append("nombre", nombre);
+    formData.append("modo", modo);
+    formData.append("email", email);
+
+    setStatusText("Procesando audio…");
+    showOverlay();
+
+    try {
+        const response = await fetch(`/api/uploads/${sessionId}/finalize`, {
+            method: "POST",
+            body: formData
+        });
+        if (response.status === 404) return null;
+        return await readJobResponse(response);
+    } catch (err) {
+        console.error("Error finalizando la subida por trozos:", err);
+        hideOverlay();
+        return {
+            success: false,
+            error: err.message || "Error al enviar el audio."
+        };
+    }
+}
+
 /**
  * Envía un nuevo archivo de audio al servidor
  */
@@ -71,7 +225,6 @@ async function uploadAudio(audioBlob, nombre, modo, email) {
         };
     }
 
-    const formData = new FormData();
     // Determinar extensión según MIME type
     let extension = "webm";
     if (audioBlob.type.includes("mp4") || audioBlob.type.includes("aac")) {
@@ -80,10 +233,13 @@ async function uploadAudio(audioBlob, nombre, modo, email) {
         extension = "ogg";
     }
 
-    formData.append("audio", audioBlob, `${nombre}.${extension}`);
-    formData.append("nombre", nombre);
-    formData.append("modo", modo);
-    formData.append("email", email);
+    // El audio va como cuerpo crudo: el servidor lo guarda y lo convierte según llega
+    const params = new URLSearchParams({
+        nombre,
+        modo,
+        email,
+        filename: `${nombre}.${extension}`
+    });
 
     setStatusText("Procesando audio…");
     showOverlay();
@@ -91,33 +247,14 @@ async function uploadAudio(audioBlob, nombre, modo, email) {
     try {
         console.log("Enviando audio al servidor...");
 
-        const response = await fetch("/api/upload-audio", {
+        const response = await fetch(`/api/upload-audio/stream?${params}`, {
             method: "POST",
-            body: formData
+            headers: { "Content-Type": audioBlob.type || "application/octet-stream" },
+            body: audioBlob
         });
 
         console.log("Respuesta recibida, status:", response.status);
-
-        if (!response.ok) {
-            const errorText = await response.text();
-            console.error("Error del servidor:", response.status, errorText);
-            throw new Error(`Error del servidor: ${response.status} - ${errorText}`);
-        }
-
-        const data = await response.json();
-        console.log("Datos recibidos:", data);
-
-        if (data.job_id) {
-            // NOTA: NO ocultamos el overlay aquí porque empieza el polling
-            return {
-                success: true,
-                jobId: data.job_id
-            };
-        } else if (data.error) {
-            throw new Error(data.error);
-        } else {
-            throw new Error("Respuesta del servidor inválida");
-        }
+        return await readJobResponse(response);
     } catch (err) {
         console.error("Error completo al enviar audio:", err);
         hideOverlay(); // Ocultar si hay error inicial
@@ -194,6 +331,17 @@ async function loadTranscriptionFile(nombre) {
     }
 }
 
+/**
+ * Modos de resumen disponibles en el servidor: [{mode, label}]
+ */
+async function fetchModes() {
+    const response = await fetch("/api/modes");
+    if (!response.ok) {
+        throw new Error(`Error del servidor: ${response.status}`);
+    }
+    return (await response.json()).modes;
+}
+
 /**
  * Stream de chat desde el servidor
  */
@@ -209,22 +357,19 @@ async function* chatStream(message, mode, transcripcion, resumen) {
         body: JSON.stringify(payload)
     });
 
-    const reader = response.body.getReader();
-    const decoder = new TextDecoder("utf-8");
-
-    let buffer = "";
-    while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-        const chunk = decoder.decode(value);
-        yield chunk;
-    }
+    yield* readTextStream(response);
 }
 
 export {
     chatStream, checkJobStatus,
+    createUploadSession,
+    fetchModes,
+    finalizeUploadSession,
+    getUploadSession,
     loadMarkdownResult,
     loadTranscriptionFile, processExistingTranscription,
+    putUploadChunk,
+    streamJobResult,
     uploadAudio
 };
 
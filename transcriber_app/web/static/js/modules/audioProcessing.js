@@ -1,21 +1,24 @@
 /**
  * Módulo de procesamiento de audio
- * Gestiona el flujo de grabación, envío y polling
+ * Gestiona el flujo de grabación, envío y seguimiento del job (SSE o polling)
  */
 
 import {
     checkJobStatus,
+    finalizeUploadSession,
     loadMarkdownResult,
     loadTranscriptionFile,
+    streamJobResult,
     uploadAudio
 } from "./api.js";
+import { takeUploadSession } from "./chunkUploader.js";
 import { elements } from "./domElements.js";
 import {
     hideOverlay,
     setStatusText,
     toggleTranscriptionSection
 } from "./ui.js";
-import { getStatusMessage, parseMarkdown } from "./utils.js";
+import { getStageMessage, getStatusMessage, parseMarkdown } from "./utils.js";
 
 /**
  * Inicia el polling del estado de un job
@@ -27,7 +30,7 @@ function startJobPolling(jobId, onComplete, onError) {
 
             setStatusText(getStatusMessage(data.status));
 
-            if (data.status === "processing" || data.status === "running") {
+            if (data.status === "queued" || data.status === "processing" || data.status === "running") {
                 setTimeout(checkStatus, 3000);
                 return;
             }
@@ -54,6 +57,58 @@ function startJobPolling(jobId, onComplete, onError) {
     checkStatus();
 }
 
+/**
+ * Sigue el job por Server-Sent Events (/api/jobs/{id}/events).
+ * Si el navegador no soporta EventSource o la conexión falla antes del
+ * final, se vuelve al polling.
+ */
+function watchJob(jobId, onComplete, onError) {
+    if (!window.EventSource) {
+        startJobPolling(jobId, onComplete, onError);
+        return;
+    }
+
+    const source = new EventSource(`/api/jobs/${jobId}/events`);
+    let finished = false;
+
+    const finish = () => {
+        finished = true;
+        source.close();
+        hideOverlay();
+    };
+
+    source.addEventListener("stage", (e) => {
+        setStatusText(getStageMessage(JSON.parse(e.data)));
+    });
+
+    source.addEventListener("done", (e) => {
+        finish();
+        handleJobCompletion(JSON.parse(e.data), onComplete);
+    });
+
+    source.addEventListener("bad_audio", () => {
+        finish();
+        alert("La grabación tiene mala calidad y no se ha podido transcribir.");
+        if (onError) onError("bad_audio");
+    });
+
+    // "error" llega como evento con datos o como fallo de la conexión
+    source.addEventListener("error", (e) => {
+        if (finished) return;
+        source.close();
+
+        if (e.data) {
+            finish();
+            setStatusText(getStatusMessage("error"));
+            if (onError) onError(JSON.parse(e.data).error);
+            return;
+        }
+
+        console.warn("Canal de eventos caído, se continúa con polling");
+        startJobPolling(jobId, onComplete, onError);
+    });
+}
+
 /**
  * Maneja la finalización de un job
  */
@@ -95,11 +150,33 @@ async function handleJobCompletion(data, onComplete) {
     }
 }
 
+/**
+ * Muestra el resumen del job según se genera (el polling sigue marcando el final)
+ */
+function followJobResult(jobId, onPartial) {
+    let overlayHidden = false;
+
+    streamJobResult(jobId, (markdown) => {
+        if (!overlayHidden) {
+            hideOverlay();
+            overlayHidden = true;
+        }
+        onPartial(markdown);
+    }).catch((error) => {
+        console.warn("No se pudo seguir el resumen en streaming:", error);
+    });
+}
+
 /**
  * Procesa un nuevo archivo de grabación
  */
-async function processNewRecording(audioBlob, nombre, email, modo, onJobStarted, onJobCompleted, onError) {
-    const result = await uploadAudio(audioBlob, nombre, modo, email);
+async function processNewRecording(audioBlob, nombre, email, modo, onJobStarted, onJobCompleted, onError, onPartial = null) {
+    // Si la grabación se fue subiendo por trozos solo hay que cerrar la sesión
+    const sessionId = await takeUploadSession(audioBlob);
+    let result = sessionId ? await finalizeUploadSession(sessionId, nombre, modo, email) : null;
+    if (!result) {
+        result = await uploadAudio(audioBlob, nombre, modo, email);
+    }
 
     if (!result.success) {
         hideOverlay();
@@ -111,12 +188,14 @@ async function processNewRecording(audioBlob, nombre, email, modo, onJobStarted,
 
     if (result.jobId) {
         if (onJobStarted) onJobStarted();
-        startJobPolling(result.jobId, onJobCompleted, onError);
+        if (onPartial) followJobResult(result.jobId, onPartial);
+        watchJob(result.jobId, onJobCompleted, onError);
     }
 }
 
 export {
     handleJobCompletion,
-    processNewRecording, startJobPolling
+    processNewRecording, startJobPolling,
+    watchJob
 };
 
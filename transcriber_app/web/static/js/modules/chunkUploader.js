@@ -0,0 +1,136 @@
+/**
+ * Módulo de subida por trozos
+ * Envía cada trozo del MediaRecorder mientras se graba, así el servidor
+ * transcribe los tramos completos antes de que termine la grabación.
+ * Si algo falla, la grabación se sube entera al final como siempre.
+ * Con onLiveText se recibe además la transcripción provisional por SSE.
+ */
+
+import { createUploadSession, getUploadSession, putUploadChunk } from "./api.js";
+
+const MAX_CHUNK_ATTEMPTS = 4;
+
+let current = null;
+// Sesión de subida asociada a cada blob grabado (promesa del session_id o null)
+const blobSessions = new WeakMap();
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Abre una sesión de subida para una grabación nueva.
+ * onLiveText(texto) recibe la transcripción provisional mientras se graba.
+ */
+function startChunkedUpload(mimeType, onLiveText = null) {
+    const live = !!onLiveText && !!window.EventSource;
+    const upload = {
+        session: createUploadSession(mimeType, live).catch((error) => {
+            console.warn("No se pudo abrir la subida por trozos:", error);
+            return null;
+        }),
+        queue: Promise.resolve(),
+        nextIndex: 0,
+        failed: false,
+        liveSource: null
+    };
+
+    if (live) {
+        upload.session.then((sessionId) => {
+            if (sessionId) upload.liveSource = followLiveTranscript(sessionId, onLiveText);
+        });
+    }
+    current = upload;
+}
+
+/**
+ * Escucha la transcripción en vivo; el servidor cierra con 'closed' al finalizar
+ */
+function followLiveTranscript(sessionId, onLiveText) {
+    const source = new EventSource(`/api/uploads/${sessionId}/live`);
+
+    source.addEventListener("partial", (e) => {
+        onLiveText(JSON.parse(e.data).text);
+    });
+    source.addEventListener("closed", () => source.close());
+    return source;
+}
+
+/**
+ * Encola un trozo; se envían de uno en uno y en orden
+ */
+function enqueueChunk(blob) {
+    if (!current) return;
+    const upload = current;
+    const index = upload.nextIndex++;
+    upload.queue = upload.queue.then(() => sendChunk(upload, index, blob));
+}
+
+async function sendChunk(upload, index, blob) {
+    const sessionId = await upload.session;
+    if (!sessionId || upload.failed) return;
+
+    for (let attempt = 1; attempt <= MAX_CHUNK_ATTEMPTS; attempt++) {
+        try {
+            const response = await putUploadChunk(sessionId, index, blob);
+            if (response.ok) return;
+
+            if (response.status === 409) {
+                // El servidor indica por dónde va: si ya tiene este trozo, seguimos
+                const { next_index: nextIndex } = await response.json();
+                if (nextIndex > index) return;
+                break;
+            }
+        } catch (error) {
+            console.warn(`Fallo enviando el trozo ${index} (intento ${attempt}):`, error);
+        }
+
+        await sleep(500 * 2 ** (attempt - 1));
+
+        // Tras un corte, comprobar si el trozo llegó aunque no recibiéramos la respuesta
+        const state = await getUploadSession(sessionId).catch(() => null);
+        if (state && state.next_index > index) return;
+    }
+
+    console.warn(`Subida por trozos abandonada en el trozo ${index}; se enviará la grabación completa`);
+    upload.failed = true;
+}
+
+/**
+ * Espera a que se envíen los trozos pendientes.
+ * Devuelve una promesa con el session_id, o null si la subida no está completa.
+ */
+function finishChunkedUpload() {
+    if (!current) return Promise.resolve(null);
+    const upload = current;
+    current = null;
+    return upload.queue.then(() => {
+        if (!upload.failed) return upload.session;
+        // La sesión no se finalizará: dejar de escuchar su transcripción en vivo
+        if (upload.liveSource) upload.liveSource.close();
+        return null;
+    });
+}
+
+/**
+ * Asocia una sesión de subida (promesa) al blob final de la grabación
+ */
+function attachUploadSession(blob, sessionPromise) {
+    if (blob && sessionPromise) blobSessions.set(blob, sessionPromise);
+}
+
+/**
+ * Devuelve el session_id del blob y lo olvida (una sesión solo se finaliza una vez)
+ */
+async function takeUploadSession(blob) {
+    const sessionPromise = blob ? blobSessions.get(blob) : null;
+    if (!sessionPromise) return null;
+    blobSessions.delete(blob);
+    return sessionPromise;
+}
+
+export {
+    attachUploadSession,
+    enqueueChunk,
+    finishChunkedUpload,
+    startChunkedUpload,
+    takeUploadSession
+};
@@ -178,15 +178,20 @@ async function handleSendAudio() {
     if (getHasTranscript() && getLastRecordingName() === nombre) {
         // Intentar obtener el texto de la transcripción actual para mandarlo al back (si ya no hay archivos)
         const currentTranscript = elements.transcripcionTexto?.innerText || "";
-        const result = await processExistingTranscription(nombre, modo, currentTranscript);
+        // El resultado se va pintando según llegan los tokens
+        let liveBox = null;
+        const result = await processExistingTranscription(nombre, modo, currentTranscript, (partial) => {
+            if (liveBox) liveBox.update(partial);
+            else liveBox = addResultBox(modo, partial);
+        });
 
         if (result.success) {
-            // Actualizar UI principal
             // Actualizar UI principal
             // (La visibilidad ahora se gestiona dentro de addResultBox)
 
             // Añadir a la lista de resultados múltiples
-            addResultBox(result.mode, result.content);
+            if (liveBox) liveBox.update(result.content);
+            else addResultBox(result.mode, result.content);
             addProcessedMode(result.mode);
 
             updateSendButtonState(
@@ -214,6 +219,7 @@ async function handleSendAudio() {
     }
 
     // CASO 2: Primera vez → enviar audio
+    let liveBox = null;
     await processNewRecording(
         getLastRecordingBlob(),
         nombre,
@@ -235,8 +241,9 @@ async function handleSendAudio() {
             const mdContent = data?.markdown || data?.resultado || "";
             const currentMode = elements.modo?.value || "default";
 
-            // Renderizar inmediatamente
-            addResultBox(currentMode, mdContent);
+            // Renderizar inmediatamente (o completar el resultado mostrado en streaming)
+            if (liveBox) liveBox.update(mdContent);
+            else addResultBox(currentMode, mdContent);
             addProcessedMode(currentMode);
 
             await saveToHistoryIfComplete(mdContent, currentMode);
@@ -248,6 +255,12 @@ async function handleSendAudio() {
                     resultSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
                 }
             }, 100);
+        },
+        null,
+        (partial) => {
+            // onPartial: resumen según se genera en el servidor
+            if (liveBox) liveBox.update(partial);
+            else liveBox = addResultBox(modo, partial);
         }
     );
 }
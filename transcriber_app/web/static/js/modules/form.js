@@ -91,6 +91,22 @@ function getFormName() {
     return elements.nombre?.value?.trim() || "";
 }
 
+/**
+ * Rellena el selector de modo con los modos del servidor (salen de los
+ * prompts, así que un modo nuevo aparece sin tocar el HTML).
+ * Conserva la selección si el modo sigue existiendo.
+ */
+function setModeOptions(modes) {
+    const select = elements.modo;
+    if (!select || !modes?.length) return;
+
+    const selected = select.value;
+    select.replaceChildren(...modes.map(({ mode, label }) => new Option(label, mode)));
+    if (modes.some(({ mode }) => mode === selected)) {
+        select.value = selected;
+    }
+}
+
 /**
  * Obtiene el modo actual del formulario
  */
@@ -99,7 +115,7 @@ function getFormMode() {
 }
 
 export {
-    clearFormFields, getFormMode, getFormName, getFormValues, setFormName, validateForm,
+    clearFormFields, getFormMode, getFormName, getFormValues, setFormName, setModeOptions, validateForm,
     validateSessionName
 };
 
@@ -355,6 +355,15 @@ function addResultBox(mode, content, initiallyExpanded = null) {
             };
         }
     }
+
+    // Permite ir actualizando el contenido mientras llega en streaming
+    return {
+        update(newContent) {
+            content = newContent;
+            const contentDiv = document.getElementById(contentId);
+            if (contentDiv) contentDiv.innerHTML = parseMarkdown(newContent);
+        }
+    };
 }
 
 /**
@@ -3,18 +3,26 @@
  * Gestión del micrófono y grabación de audio
  */
 
+import {
+    attachUploadSession,
+    enqueueChunk,
+    finishChunkedUpload,
+    startChunkedUpload
+} from "./chunkUploader.js";
 import { elements } from "./domElements.js";
-import { setRecordingButtonState, setStatusText } from "./ui.js";
+import { setRecordingButtonState, setStatusText, toggleTranscriptionSection } from "./ui.js";
 
 let mediaRecorder;
 let audioChunks = [];
 let recordedMimeType = "audio/mp3"; // Default fallback
+let uploadSession = null; // Promesa del session_id de la subida por trozos
 
 /**
  * Inicia una nueva grabación de audio
  */
 async function startRecording() {
     audioChunks = [];
+    uploadSession = null;
 
     try {
         const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
@@ -33,9 +41,13 @@ async function startRecording() {
 
         mediaRecorder = new MediaRecorder(stream, { mimeType: recordedMimeType });
 
+        // Los trozos se van subiendo mientras se graba y el servidor los transcribe en vivo
+        startChunkedUpload(recordedMimeType, showLiveTranscript);
+
         mediaRecorder.ondataavailable = e => {
             if (e.data && e.data.size > 0) {
                 audioChunks.push(e.data);
+                enqueueChunk(e.data);
                 console.log(`📦 Chunk recibido: ${e.data.size} bytes`);
             } else {
                 console.warn("⚠️ Chunk de audio vacío recibido");
@@ -62,6 +74,15 @@ async function startRecording() {
     }
 }
 
+/**
+ * Muestra la transcripción provisional mientras se graba
+ */
+function showLiveTranscript(text) {
+    if (!elements.transcripcionTexto) return;
+    elements.transcripcionTexto.textContent = text;
+    toggleTranscriptionSection(true);
+}
+
 /**
  * Detiene la grabación actual y espera a que el MediaRecorder termine
  * @returns {Promise<void>}
@@ -72,6 +93,7 @@ async function stopRecording() {
     return new Promise((resolve) => {
         mediaRecorder.onstop = () => {
             console.log("⏹️ MediaRecorder detenido y chunks finalizados");
+            uploadSession = finishChunkedUpload();
             setStatusText("Grabación finalizada.");
             if (elements.recordBtn) setRecordingButtonState(false);
             if (elements.stopBtn) elements.stopBtn.disabled = true;
@@ -93,6 +115,7 @@ function getRecordingBlob() {
     }
     const blob = new Blob(audioChunks, { type: recordedMimeType });
     console.log(`📊 Blob final generado: ${blob.size} bytes (${blob.type})`);
+    attachUploadSession(blob, uploadSession);
 
     if (blob.size === 0) {
         console.error("❌ ERROR CRÍTICO: El blob de grabación está vacío. Posible incompatibilidad de hardware con el MIME type.");
@@ -107,6 +130,7 @@ function getRecordingBlob() {
  */
 function clearAudioChunks() {
     audioChunks = [];
+    uploadSession = null;
 }
 
 /**
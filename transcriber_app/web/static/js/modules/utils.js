@@ -83,6 +83,7 @@ function isValidName(name) {
  */
 function getStatusMessage(status) {
     const messages = {
+        queued: "En cola…",
         processing: "Procesando audio…",
         running: "Procesando audio…",
         done: "Transcripción enviada por email.",
@@ -92,6 +93,27 @@ function getStatusMessage(status) {
     return messages[status] || "Estado desconocido.";
 }
 
+/**
+ * Mensaje de estado para una etapa recibida por /api/jobs/{id}/events
+ */
+function getStageMessage(event) {
+    const messages = {
+        received: "Audio recibido…",
+        queued: "En cola…",
+        converting: "Convirtiendo audio…",
+        summarizing: "Generando resumen…",
+        done: "Transcripción enviada por email.",
+        error: "Error durante el procesamiento."
+    };
+
+    if (event.stage === "transcribing") {
+        if (event.cached) return "Transcripción recuperada de caché…";
+        if (event.chunks > 1) return `Transcribiendo (${event.chunk}/${event.chunks})…`;
+        return "Transcribiendo…";
+    }
+    return messages[event.stage] || "Procesando audio…";
+}
+
 /**
  * Reconstrúye un Blob desde diferentes formatos de almacenamiento
  */
@@ -116,7 +138,7 @@ function reconstructBlob(stored) {
 }
 
 export {
-    formatAsHTML, generateId, getStatusMessage, isValidEmail,
+    formatAsHTML, generateId, getStageMessage, getStatusMessage, isValidEmail,
     isValidName, normalizeText, parseMarkdown, reconstructBlob
 };
 
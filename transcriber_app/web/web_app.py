@@ -1,17 +1,38 @@
 # transcriber_app/web/web_app.py
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
 from .api.routes import router as api_router
+from .api.scheduler import scheduler
+from transcriber_app.modules.ai.http_pool import close_pools
+from transcriber_app.modules.ai.ai_manager import AIManager
+from transcriber_app.modules import metrics
+from transcriber_app.config import TRANSCRIBER_BACKEND, ROUTER_BACKENDS, AI_WARM_UP
 
 print(">>> CARGANDO WEB_APP.PY REAL <<<")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if TRANSCRIBER_BACKEND == "local" or (TRANSCRIBER_BACKEND == "router" and "local" in ROUTER_BACKENDS):
+        # Cargar el modelo antes del primer job para no pagarlo en su latencia
+        await asyncio.to_thread(AIManager.get_transcriber("local").warm_up)
+    warm_up = asyncio.create_task(asyncio.to_thread(AIManager.warm_up)) if AI_WARM_UP else None
+    yield
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    # Dejar terminar los jobs en curso antes de parar el worker
+    scheduler.shutdown(wait=True)
+    await close_pools()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="TranscriberApp Web")
+    app = FastAPI(title="TranscriberApp Web", lifespan=lifespan)
 
     # CORS
     app.add_middleware(
@@ -48,6 +69,11 @@ def create_app() -> FastAPI:
     # Servir archivos .txt de transcripciones
     app.mount("/api/transcripciones", StaticFiles(directory=TRANSCRIPTS_DIR), name="transcripciones")
 
+    # Métricas para Prometheus (fuera de /api: es la ruta que espera el scraper)
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
     # Ruta explícita para /
     @app.get("/")
     async def root():